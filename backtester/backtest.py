@@ -15,6 +15,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from bot.strategy import compute_features, build_signals
 from bot.ml_scorer import MLScorer
+from bot.candle_store import load_candles
+from backtester.intrabar import align_subcandles, bars_from_frame, load_sub_candles, protective_exit
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -105,25 +107,31 @@ class Backtester:
         """Calcular equity total"""
         return self.usdt + (self.btc * current_price)
     
-    def run(self, df, use_ml=True):
+    def run(self, df, use_ml=True, stop_loss_pct=None, take_profit_pct=None, intrabar=False, sub_candles=None):
         """
         Ejecutar backtest sobre datos históricos
         
         Args:
             df: DataFrame con OHLCV data
             use_ml: Si usar ML scorer
+            stop_loss_pct: Stop loss sobre el precio de entrada (0.01 = 1%, None = sin stop)
+            take_profit_pct: Take profit sobre el precio de entrada (None = sin take profit)
+            intrabar: Stops y take profits contra high/low de cada vela (ver backtester/intrabar.py)
+            sub_candles: DataFrame de sub-velas (ej. 1m) para ordenar los toques dentro de la vela
         
         Returns:
             dict con resultados
         """
         self.reset()
         
+        # Features una sola vez: las usan el ML scorer y build_signals
+        feats = compute_features(df)
+
         # Cargar ML scorer si está habilitado
         ml_scores = None
         if use_ml:
             try:
                 ml = MLScorer(os.getenv("MODEL_PATH", "./models/model.pkl"))
-                feats = compute_features(df.copy())
                 if len(feats) > 0:
                     ml_scores = ml.predict(feats)
                 else:
@@ -134,7 +142,7 @@ class Backtester:
                 use_ml = False
         
         # Generar señales
-        sig_df = build_signals(df.copy(), ml_scores=ml_scores)
+        sig_df = build_signals(df, ml_scores=ml_scores, features=feats)
         
         # Simular trading
         print(f"[DEBUG] sig_df shape: {sig_df.shape}")
@@ -155,35 +163,100 @@ class Backtester:
         print(f"[DEBUG] ML scores >0.5: {len(sig_df[sig_df['ml_score'] > 0.5])}")
         print(f"[DEBUG] ML scores >0.6: {len(sig_df[sig_df['ml_score'] > 0.6])}")
         
-        for i, row in sig_df.iterrows():
-            price = float(row['close'])
-            timestamp = df.iloc[i]['open_time'] if 'open_time' in df.columns else i
-            sig = int(row['final'])
-            
-            # Ejecutar trades
-            if sig == 1:
-                self.execute_buy(price, timestamp)
-            elif sig == -1:
-                self.execute_sell(price, timestamp)
-            
-            # Guardar equity
-            equity = self.get_equity(price)
-            self.equity_curve.append({
-                'timestamp': timestamp,
-                'price': price,
-                'equity': equity,
-                'usdt': self.usdt,
-                'btc': self.btc
-            })
-        
-        # Cerrar posición final si existe
-        if self.btc > 0:
-            final_price = float(sig_df.iloc[-1]['close'])
-            final_timestamp = df.iloc[-1]['open_time'] if 'open_time' in df.columns else len(df)-1
-            self.execute_sell(final_price, final_timestamp)
+        close = sig_df['close'].to_numpy(dtype=float)
+        signal = sig_df['final'].to_numpy(dtype=np.int64)
+        # open_time de la misma fila de sig_df (df.iloc[i] quedaba corrido tras el dropna)
+        timestamps = sig_df['open_time'].array if 'open_time' in sig_df.columns else np.arange(len(sig_df))
+        bars = sub_bars = None
+        if intrabar:
+            bars = bars_from_frame(sig_df)
+            if sub_candles is not None:
+                sub_bars = align_subcandles(sig_df['open_time'], sub_candles)
+        self.simulate(close, signal, timestamps, stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+                      bars=bars, sub_bars=sub_bars)
         
         return self.calculate_metrics()
     
+    def simulate(self, close, signal, timestamps, stop_loss_pct=None, take_profit_pct=None, bars=None, sub_bars=None):
+        """Máquina de estados de la posición sobre arrays NumPy
+
+        Mismo resultado que recorrer vela por vela con execute_buy / execute_sell,
+        pero solo se itera sobre los trades: la próxima entrada es la primera
+        señal 1 estando afuera y la salida la primera señal -1 (o el stop) estando
+        adentro, que se buscan con searchsorted. El equity se escribe por tramos
+        en arrays preasignados.
+
+        Args:
+            close: Precios de cierre (float64)
+            signal: Señal final por vela (1 compra, -1 venta, 0 nada)
+            timestamps: open_time de cada vela (para los trades)
+            stop_loss_pct: Vende en la primera vela posterior a la entrada con
+                close <= entrada * (1 - stop_loss_pct); re-entrada desde la siguiente
+            take_profit_pct: Ídem con close >= entrada * (1 + take_profit_pct)
+            bars: OHLC de cada vela (bars_from_frame): stop y take profit se
+                disparan con low/high, también en la vela de la señal de venta
+                (antes de su close), y se ejecutan al precio del nivel
+            sub_bars: Sub-velas alineadas (align_subcandles) para decidir qué se
+                tocó primero cuando una vela toca stop y take profit
+        """
+        n = len(close)
+        usdt = np.empty(n)
+        btc = np.zeros(n)
+        buys = np.flatnonzero(signal == 1)
+        sells = np.flatnonzero(signal == -1)
+
+        cursor = 0  # primera vela sin estado asignado
+        search_from = 0  # primera vela donde se puede volver a entrar
+        while True:
+            k = np.searchsorted(buys, search_from)
+            if k == len(buys):
+                break
+            b = int(buys[k])
+            usdt[cursor:b] = self.usdt
+            if self.execute_buy(float(close[b]), timestamps[b]) is None:
+                break  # sin posición el balance no cambia: ninguna compra posterior pasa el mínimo
+            j = np.searchsorted(sells, b + 1)
+            exit_at = int(sells[j]) if j < len(sells) else n
+            exit_price = None
+            stop_price = self.entry_price * (1 - stop_loss_pct) if stop_loss_pct is not None else None
+            tp_price = self.entry_price * (1 + take_profit_pct) if take_profit_pct is not None else None
+            if bars is not None:
+                hit = protective_exit(bars, b + 1, min(exit_at + 1, n), stop_price, tp_price, sub_bars)
+                if hit is not None:
+                    exit_at, exit_price = hit
+            elif stop_price is not None or tp_price is not None:
+                window = close[b + 1:exit_at]
+                hit = np.zeros(len(window), dtype=bool)
+                if stop_price is not None:
+                    hit |= window <= stop_price
+                if tp_price is not None:
+                    hit |= window >= tp_price
+                hit = np.flatnonzero(hit)
+                if len(hit):
+                    exit_at = b + 1 + int(hit[0])
+            usdt[b:exit_at] = self.usdt
+            btc[b:exit_at] = self.btc
+            cursor = exit_at
+            if exit_at == n:
+                break
+            self.execute_sell(float(close[exit_at]) if exit_price is None else exit_price, timestamps[exit_at])
+            search_from = exit_at + 1
+        usdt[cursor:] = self.usdt
+        btc[cursor:] = self.btc
+
+        self.equity_curve = {
+            'timestamp': timestamps,
+            'price': close,
+            'equity': usdt + btc * close,
+            'usdt': usdt,
+            'btc': btc,
+        }
+
+        # Cerrar posición final si existe
+        if self.btc > 0:
+            self.execute_sell(float(close[-1]), timestamps[-1])
+        return self.equity_curve
+
     def calculate_metrics(self):
         """Calcular métricas de performance"""
         if len(self.trades) == 0:
@@ -284,20 +357,13 @@ class Backtester:
         }
 
 
-def load_historical_data(csv_path, start_date=None, end_date=None):
-    """Cargar datos históricos con filtro opcional de fechas"""
-    df = pd.read_csv(csv_path)
-    
-    # Convertir open_time a datetime si existe
-    if 'open_time' in df.columns:
-        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-        
-        if start_date:
-            df = df[df['open_time'] >= start_date]
-        if end_date:
-            df = df[df['open_time'] <= end_date]
-    
-    return df
+def load_historical_data(csv_path, start_date=None, end_date=None, symbol='BTCUSDT', interval='5m'):
+    """Cargar datos históricos con filtro opcional de fechas
+
+    csv_path puede ser un CSV o el directorio del CandleStore (ej. data/store):
+    en ese caso solo se leen los meses del rango pedido.
+    """
+    return load_candles(csv_path, symbol, interval, start_date, end_date)
 
 
 def print_report(metrics):
@@ -346,17 +412,24 @@ if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='Backtester de estrategia de trading')
-    parser.add_argument('--data', default='data/raw/klines.csv', help='Path al CSV de datos')
+    parser.add_argument('--data', default='data/raw/klines.csv', help='Path al CSV de datos o directorio del store (data/store)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Símbolo (solo con store)')
+    parser.add_argument('--interval', default='5m', help='Intervalo (solo con store)')
     parser.add_argument('--capital', type=float, default=1000.0, help='Capital inicial')
     parser.add_argument('--start', help='Fecha inicio (YYYY-MM-DD)')
     parser.add_argument('--end', help='Fecha fin (YYYY-MM-DD)')
     parser.add_argument('--no-ml', action='store_true', help='Deshabilitar ML scorer')
+    parser.add_argument('--stop-loss', type=float, help='Stop loss sobre la entrada (0.01 = 1%%, default: sin stop)')
+    parser.add_argument('--take-profit', type=float, help='Take profit sobre la entrada (0.02 = 2%%, default: sin take profit)')
+    parser.add_argument('--intrabar', action='store_true', help='Stops/take profits contra high/low de cada vela')
+    parser.add_argument('--sub-interval', help='Sub-velas del store para el orden intravela (ej. 1m, implica --intrabar)')
     parser.add_argument('--save', action='store_true', help='Guardar resultados a archivos')
     
     args = parser.parse_args()
     
     print(f"\n🚀 Cargando datos desde: {args.data}")
-    df = load_historical_data(args.data, start_date=args.start, end_date=args.end)
+    df = load_historical_data(args.data, start_date=args.start, end_date=args.end,
+                              symbol=args.symbol, interval=args.interval)
     print(f"✓ Cargados {len(df)} períodos")
     
     if 'open_time' in df.columns:
@@ -374,7 +447,12 @@ if __name__ == '__main__':
         trade_percent=float(os.getenv('TRADE_PERCENT', 0.01))
     )
     
-    metrics = backtester.run(df, use_ml=not args.no_ml)
+    sub_candles = None
+    if args.sub_interval:
+        sub_candles = load_sub_candles(args.data, args.symbol, args.sub_interval, args.start, args.end)
+        print(f"✓ Cargadas {len(sub_candles)} sub-velas {args.sub_interval}")
+    metrics = backtester.run(df, use_ml=not args.no_ml, stop_loss_pct=args.stop_loss, take_profit_pct=args.take_profit,
+                             intrabar=args.intrabar or sub_candles is not None, sub_candles=sub_candles)
     print_report(metrics)
     
     if args.save:
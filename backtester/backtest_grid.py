@@ -12,6 +12,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from bot.strategies.grid_trading import GridStrategy, create_grid_from_current_price
+from bot.candle_store import load_candles
+from backtester.intrabar import align_subcandles, bars_from_frame, level_crossings, load_sub_candles
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,8 +28,12 @@ class GridBacktester:
         self.trades = []
         self.equity_curve = []
         
-    def run(self, df, grid_range_pct=0.05, num_grids=10, investment_per_level=10.0):
-        """Ejecutar backtest de grid trading"""
+    def run(self, df, grid_range_pct=0.05, num_grids=10, investment_per_level=10.0, intrabar=False, sub_candles=None):
+        """Ejecutar backtest de grid trading
+
+        Con intrabar los niveles se tocan con el rango OHLC de cada vela (o de
+        sus sub_candles, ej. 1m) en vez de solo con el close.
+        """
         
         # Crear grid basado en primer precio
         first_price = float(df.iloc[0]['close'])
@@ -39,22 +45,63 @@ class GridBacktester:
         print(f"  Step: ${grid.grid_step:.2f}")
         print(f"  Investment por nivel: ${investment_per_level:.2f}")
         
-        # Simular sobre cada precio
-        for i, row in df.iterrows():
-            price = float(row['close'])
-            timestamp = row['open_time'] if 'open_time' in row else i
-            
-            signal, target_level, reason = grid.get_signal(price)
-            
-            if signal == 1:  # BUY
+        close = df['close'].to_numpy(dtype=float)
+        timestamps = df['open_time'].array if 'open_time' in df.columns else df.index
+        bars = sub_bars = None
+        if intrabar:
+            bars = bars_from_frame(df)
+            if sub_candles is not None:
+                sub_bars = align_subcandles(df['open_time'], sub_candles)
+        self.simulate(grid, close, timestamps, investment_per_level, bars=bars, sub_bars=sub_bars)
+        return self.calculate_metrics(grid)
+
+    def simulate(self, grid, close, timestamps, investment_per_level=10.0, bars=None, sub_bars=None):
+        """Recorre el grid sobre arrays NumPy
+
+        Mismo resultado que llamar grid.get_signal vela por vela: las velas que
+        tocan un nivel se calculan de una vez con grid.touches (searchsorted) y
+        solo se itera sobre esos eventos, con el inventario por nivel en un
+        array. El equity se escribe por tramos entre eventos.
+
+        Args:
+            grid: GridStrategy (se actualizan sus positions al final)
+            close: Precios de cierre (float64)
+            timestamps: open_time de cada vela (para los trades)
+            investment_per_level: USDT por compra
+            bars: OHLC de cada vela (bars_from_frame): cada nivel que cruza el
+                camino de precios de la vela es un toque, ejecutado al precio
+                del nivel (ver backtester/intrabar.py)
+            sub_bars: Sub-velas alineadas (align_subcandles) para el camino
+        """
+        n = len(close)
+        levels = grid.grid_levels
+        sellable = grid.sellable_levels()
+        holding = np.array([grid.positions[level] for level in levels], dtype=bool)
+        active = int(holding.sum())
+
+        if bars is None:
+            touched = grid.touches(close)
+            events = np.flatnonzero(touched >= 0)
+            event_levels = touched[events]
+            fills = close[events]
+        else:
+            events, event_levels, fills = level_crossings(levels, bars, sub_bars)
+        # Balance después de cada evento; state[k] rige desde la vela de events[k - 1]
+        state_usdt = np.empty(len(events) + 1)
+        state_btc = np.empty(len(events) + 1)
+        state_usdt[0], state_btc[0] = self.usdt, self.btc
+
+        for k, (i, lvl, price) in enumerate(zip(events.tolist(), event_levels.tolist(), fills.tolist()), start=1):
+            target_level = levels[lvl]
+            if not holding[lvl]:  # BUY
                 if self.usdt >= investment_per_level:
                     qty = (investment_per_level * (1 - self.fee_rate)) / price
                     self.btc += qty
                     self.usdt -= investment_per_level
-                    grid.execute_buy(target_level)
-                    
+                    holding[lvl] = True
+                    active += 1
                     self.trades.append({
-                        'timestamp': timestamp,
+                        'timestamp': timestamps[i],
                         'type': 'BUY',
                         'price': price,
                         'qty': qty,
@@ -62,56 +109,56 @@ class GridBacktester:
                         'grid_level': target_level,
                         'fee': investment_per_level * self.fee_rate
                     })
-            
-            elif signal == -1:  # SELL
-                # Vender porción del grid level
-                active_positions = sum(1 for v in grid.positions.values() if v)
-                if active_positions > 0 and self.btc > 0:
-                    qty_to_sell = self.btc / active_positions
-                    usdt_gain = qty_to_sell * price * (1 - self.fee_rate)
-                    
-                    self.usdt += usdt_gain
-                    self.btc -= qty_to_sell
-                    grid.execute_sell(target_level)
-                    
-                    self.trades.append({
-                        'timestamp': timestamp,
-                        'type': 'SELL',
-                        'price': price,
-                        'qty': qty_to_sell,
-                        'usdt': usdt_gain,
-                        'grid_level': target_level,
-                        'fee': qty_to_sell * price * self.fee_rate
-                    })
-            
-            # Registrar equity
-            equity = self.usdt + (self.btc * price)
-            self.equity_curve.append({
-                'timestamp': timestamp,
-                'price': price,
-                'equity': equity,
-                'usdt': self.usdt,
-                'btc': self.btc
-            })
-        
-        return self.calculate_metrics(grid)
-    
+            elif sellable[lvl] and self.btc > 0:  # SELL (hay al menos esta posición activa)
+                qty_to_sell = self.btc / active
+                usdt_gain = qty_to_sell * price * (1 - self.fee_rate)
+                self.usdt += usdt_gain
+                self.btc -= qty_to_sell
+                holding[lvl] = False
+                active -= 1
+                self.trades.append({
+                    'timestamp': timestamps[i],
+                    'type': 'SELL',
+                    'price': price,
+                    'qty': qty_to_sell,
+                    'usdt': usdt_gain,
+                    'grid_level': target_level,
+                    'fee': qty_to_sell * price * self.fee_rate
+                })
+            state_usdt[k], state_btc[k] = self.usdt, self.btc
+
+        for level, held in zip(levels, holding.tolist()):
+            grid.positions[level] = held
+
+        # Cada estado rige hasta el próximo evento (el inicial hasta el primero);
+        # con varios eventos en una vela solo el último llega a su close
+        lengths = np.diff(np.concatenate(([0], events, [n])))
+        usdt = np.repeat(state_usdt, lengths)
+        btc = np.repeat(state_btc, lengths)
+        self.equity_curve = {
+            'timestamp': timestamps,
+            'price': close,
+            'equity': usdt + (btc * close),
+            'usdt': usdt,
+            'btc': btc,
+        }
+        return self.equity_curve
+
     def calculate_metrics(self, grid):
         """Calcular métricas de performance"""
         
-        final_equity = self.usdt + (self.btc * float(self.equity_curve[-1]['price']))
+        final_equity = self.usdt + (self.btc * float(self.equity_curve['price'][-1]))
         total_return = ((final_equity - self.initial_capital) / self.initial_capital) * 100
         
         buys = [t for t in self.trades if t['type'] == 'BUY']
         sells = [t for t in self.trades if t['type'] == 'SELL']
         
-        # Profit por trade completado
+        # Profit por trade completado: cada venta contra la última compra del mismo nivel
+        last_buy = {b['grid_level']: b for b in buys}
         completed_profits = []
         for sell in sells:
-            # Buscar compra previa en mismo nivel
-            matching_buys = [b for b in buys if b['grid_level'] == sell['grid_level']]
-            if matching_buys:
-                buy = matching_buys[-1]
+            buy = last_buy.get(sell['grid_level'])
+            if buy is not None:
                 profit = sell['usdt'] - buy['usdt']
                 profit_pct = (profit / buy['usdt']) * 100
                 completed_profits.append(profit_pct)
@@ -119,13 +166,12 @@ class GridBacktester:
         avg_profit_per_trade = np.mean(completed_profits) if completed_profits else 0
         
         # Max drawdown
-        equity_df = pd.DataFrame(self.equity_curve)
-        equity_df['peak'] = equity_df['equity'].cummax()
-        equity_df['drawdown'] = (equity_df['equity'] - equity_df['peak']) / equity_df['peak'] * 100
-        max_drawdown = equity_df['drawdown'].min()
+        equity = pd.Series(self.equity_curve['equity'], dtype=float)
+        peak = equity.cummax()
+        max_drawdown = ((equity - peak) / peak * 100).min()
         
         # Sharpe
-        returns = equity_df['equity'].pct_change().dropna()
+        returns = equity.pct_change().dropna()
         sharpe = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() > 0 else 0
         
         total_fees = sum([t['fee'] for t in self.trades])
@@ -179,30 +225,32 @@ if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='Grid Trading Backtester')
-    parser.add_argument('--data', default='data/raw/klines.csv')
+    parser.add_argument('--data', default='data/raw/klines.csv', help='CSV o directorio del store (data/store)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Símbolo (solo con store)')
+    parser.add_argument('--interval', default='5m', help='Intervalo (solo con store)')
     parser.add_argument('--capital', type=float, default=1000.0)
     parser.add_argument('--range', type=float, default=0.05, help='Grid range % (0.05 = 5%)')
     parser.add_argument('--levels', type=int, default=10)
     parser.add_argument('--invest', type=float, default=10.0, help='USDT per level')
     parser.add_argument('--start', help='Start date YYYY-MM-DD')
     parser.add_argument('--end', help='End date YYYY-MM-DD')
+    parser.add_argument('--intrabar', action='store_true', help='Touch levels with each candle high/low, not only close')
+    parser.add_argument('--sub-interval', help='Store sub-candles for the intrabar path (e.g. 1m, implies --intrabar)')
     
     args = parser.parse_args()
     
     print(f"🚀 Loading data: {args.data}")
-    df = pd.read_csv(args.data)
-    
-    if 'open_time' in df.columns:
-        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-        if args.start:
-            df = df[df['open_time'] >= args.start]
-        if args.end:
-            df = df[df['open_time'] <= args.end]
+    df = load_candles(args.data, args.symbol, args.interval, args.start, args.end)
     
     print(f"✓ Loaded {len(df)} periods")
     if 'open_time' in df.columns:
         print(f"  Range: {df['open_time'].min()} - {df['open_time'].max()}")
     
+    sub_candles = None
+    if args.sub_interval:
+        sub_candles = load_sub_candles(args.data, args.symbol, args.sub_interval, args.start, args.end)
+        print(f"✓ Loaded {len(sub_candles)} {args.sub_interval} sub-candles")
+    
     print(f"\n⚙️  Configuration:")
     print(f"  Capital: ${args.capital:,.2f}")
     print(f"  Grid range: ±{args.range*100:.1f}%")
@@ -220,7 +268,9 @@ if __name__ == '__main__':
         df,
         grid_range_pct=args.range,
         num_grids=args.levels,
-        investment_per_level=args.invest
+        investment_per_level=args.invest,
+        intrabar=args.intrabar or sub_candles is not None,
+        sub_candles=sub_candles
     )
     
     print_grid_report(metrics)
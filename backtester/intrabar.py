@@ -0,0 +1,154 @@
+"""
+Modelo de ejecución intravela (OHLC) para los backtesters
+Con solo el close se pierden niveles del grid, stops y take-profits que la vela
+tocó con su mínimo o máximo. Acá se decide, con arrays NumPy y sin loops por
+vela, qué precios tocó cada vela y en qué orden:
+
+- Camino dentro de la vela: open -> low -> high -> close si cerró al alza
+  (close >= open), open -> high -> low -> close si cerró a la baja.
+- Con sub-velas (ej. 1m del candle store) el camino se arma con ellas y el
+  orden dentro de la vela padre sale de los datos.
+- Si una vela toca stop y take-profit y no hay sub-velas que lo resuelvan,
+  se asume el stop primero (supuesto pesimista).
+- Un nivel que el precio saltó con un gap (close anterior -> open) se llena
+  al open, no al precio del nivel.
+"""
+
+import numpy as np
+
+from bot.candle_store import is_store_path, load_candles
+
+BAR_COLUMNS = ("open", "high", "low", "close")
+
+
+def bars_from_frame(df) -> dict:
+    """dict open/high/low/close -> array float64 de un DataFrame de velas"""
+    return {c: df[c].to_numpy(dtype=float) for c in BAR_COLUMNS}
+
+
+def load_sub_candles(data, symbol, interval, start=None, end=None):
+    """Sub-velas (ej. 1m) del candle store para el mismo rango del backtest"""
+    if not is_store_path(data):
+        raise ValueError("Las sub-velas se leen del candle store: --data debe ser su directorio")
+    return load_candles(data, symbol, interval, start, end)
+
+
+def align_subcandles(parent_times, sub_df) -> dict:
+    """Asigna cada sub-vela a la vela padre que la contiene
+
+    Args:
+        parent_times: open_time de las velas padre (ordenado)
+        sub_df: DataFrame de sub-velas con open_time y OHLC
+
+    Returns:
+        bars_from_frame de las sub-velas dentro del rango más 'owner' (índice
+        de la vela padre); las sub-velas fuera del rango se descartan
+    """
+    parent = np.asarray(parent_times, dtype="datetime64[ms]").astype(np.int64)
+    sub_times = np.asarray(sub_df["open_time"], dtype="datetime64[ms]").astype(np.int64)
+    owner = np.searchsorted(parent, sub_times, side="right") - 1
+    # fin de cada vela padre: open de la siguiente (la última dura lo mismo que la anterior)
+    step = parent[-1] - parent[-2] if len(parent) > 1 else 0
+    parent_end = np.append(parent[1:], parent[-1] + step)
+    inside = (owner >= 0) & (sub_times < parent_end[np.maximum(owner, 0)])
+    sub = {c: arr[inside] for c, arr in bars_from_frame(sub_df).items()}
+    sub["owner"] = owner[inside]
+    return sub
+
+
+def price_path(bars: dict, sub_bars: dict = None):
+    """Secuencia de precios que recorrió cada vela, en orden temporal
+
+    Returns:
+        (path, owner, is_open): precio de cada punto, vela padre a la que
+        pertenece y si es el open de una (sub-)vela (el tramo que llega a él
+        es un gap desde el close anterior)
+    """
+    n = len(bars["close"])
+    parts = [(bars, np.arange(n))]
+    if sub_bars is not None and len(sub_bars["owner"]):
+        covered = np.zeros(n, dtype=bool)
+        covered[sub_bars["owner"]] = True
+        rest = np.flatnonzero(~covered)
+        parts = [({c: bars[c][rest] for c in BAR_COLUMNS}, rest), (sub_bars, sub_bars["owner"])]
+
+    points, owners = [], []
+    for b, own in parts:
+        up = b["close"] >= b["open"]
+        points.append(np.column_stack((
+            b["open"],
+            np.where(up, b["low"], b["high"]),
+            np.where(up, b["high"], b["low"]),
+            b["close"],
+        )))
+        owners.append(own)
+    points = np.concatenate(points)
+    owner = np.concatenate(owners)
+    order = np.argsort(owner, kind="stable")  # las sub-velas ya vienen en orden dentro de su padre
+    path = points[order].ravel()
+    owner = np.repeat(owner[order], 4)
+    is_open = np.zeros(len(path), dtype=bool)
+    is_open[::4] = True
+    return path, owner, is_open
+
+
+def level_crossings(levels, bars: dict, sub_bars: dict = None):
+    """Niveles que tocó el camino de precios, en el orden en que se tocaron
+
+    Un tramo a -> b toca los niveles L con a < L <= b (subiendo) o b <= L < a
+    (bajando): un nivel donde el camino da la vuelta se cuenta una sola vez.
+
+    Returns:
+        (owner, level_idx, fill_price): vela padre del toque, índice del nivel
+        en levels (ordenado) y precio de ejecución (el nivel, o el open si se
+        cruzó con un gap)
+    """
+    levels = np.asarray(levels, dtype=float)
+    path, owner, is_open = price_path(bars, sub_bars)
+    a, b = path[:-1], path[1:]
+    rising = b > a
+    lo = np.where(rising, np.searchsorted(levels, a, side="right"), np.searchsorted(levels, b, side="left"))
+    hi = np.where(rising, np.searchsorted(levels, b, side="right"), np.searchsorted(levels, a, side="left"))
+    count = hi - lo
+
+    leg = np.repeat(np.arange(len(a)), count)
+    offset = np.arange(len(leg)) - np.repeat(np.cumsum(count) - count, count)
+    level_idx = np.where(rising[leg], lo[leg] + offset, hi[leg] - 1 - offset)
+    fill_price = np.where(is_open[1:][leg], b[leg], levels[level_idx])
+    return owner[1:][leg], level_idx, fill_price
+
+
+def protective_exit(bars: dict, start: int, end: int, stop_price=None, take_profit_price=None, sub_bars=None):
+    """Primera vela en [start, end) cuyo rango toca el stop o el take-profit
+
+    Returns:
+        (vela, precio de ejecución) o None si no se tocó ninguno. El stop se
+        llena a min(open, stop) y el take-profit a max(open, take_profit).
+    """
+    low = bars["low"][start:end]
+    high = bars["high"][start:end]
+    hit_stop = low <= stop_price if stop_price is not None else np.zeros(len(low), dtype=bool)
+    hit_tp = high >= take_profit_price if take_profit_price is not None else np.zeros(len(high), dtype=bool)
+    hits = np.flatnonzero(hit_stop | hit_tp)
+    if not len(hits):
+        return None
+    k = int(hits[0])
+    bar = start + k
+    open_price = float(bars["open"][bar])
+    stop_first = bool(hit_stop[k])
+    if hit_stop[k] and hit_tp[k] and take_profit_price is not None and open_price >= take_profit_price:
+        stop_first = False  # abrió con gap por encima del take-profit
+    elif hit_stop[k] and hit_tp[k] and open_price > stop_price and sub_bars is not None:
+        # ambos dentro de la vela: la primera sub-vela que toca alguno decide
+        owner = sub_bars["owner"]
+        first, last = np.searchsorted(owner, bar, side="left"), np.searchsorted(owner, bar, side="right")
+        sub_stop = sub_bars["low"][first:last] <= stop_price
+        sub_tp = sub_bars["high"][first:last] >= take_profit_price
+        sub_hits = np.flatnonzero(sub_stop | sub_tp)
+        if len(sub_hits):
+            s = int(sub_hits[0])
+            stop_first = bool(sub_stop[s])
+            open_price = float(sub_bars["open"][first + s])
+    if stop_first:
+        return bar, min(open_price, stop_price)
+    return bar, max(open_price, take_profit_price)
@@ -0,0 +1,198 @@
+"""
+Barrido de parámetros (grid search) de la estrategia RSI(2) en varios procesos
+Las velas, features y scores ML se calculan una sola vez; la matriz que usan
+las reglas (close, sma200, rsi2, ml_score) se comparte con los workers por
+memoria compartida, sin picklear DataFrames. Cada worker solo arma las
+señales de su combinación y corre Backtester.simulate.
+
+Uso:
+    python backtester/sweep.py --data data/store --rsi2-buy 5 10 15 --rsi2-sell 85 90 95 \\
+        --trend true false --stop-loss 0 0.01 0.02 --ml-threshold 0.5 0.6
+"""
+
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtester.backtest import Backtester, load_historical_data
+from bot.ml_scorer import MLScorer
+from bot.strategy import RuleConfig, compute_features, rule_signals
+
+# Columnas que necesitan rule_signals y la simulación
+SWEEP_COLUMNS = ("close", "sma200", "rsi2", "ml_score")
+RESULT_METRICS = (
+    "total_return", "total_trades", "completed_trades", "win_rate",
+    "profit_factor", "max_drawdown_pct", "sharpe_ratio", "total_fees",
+)
+
+# Estado de cada proceso worker (ver _attach)
+_worker = {}
+
+
+def sweep_inputs(df, use_ml=False) -> dict:
+    """Features (y scores ML) una sola vez -> dict columna -> array float64"""
+    feats = compute_features(df)
+    ml_scores = np.zeros(len(feats))
+    if use_ml and len(feats):
+        ml = MLScorer(os.getenv("MODEL_PATH", "./models/model.pkl"))
+        ml_scores = np.asarray(ml.predict(feats), dtype=float)
+    columns = {c: feats[c].to_numpy(dtype=float) for c in SWEEP_COLUMNS if c != "ml_score"}
+    columns["ml_score"] = ml_scores
+    return columns
+
+
+def param_grid(rsi2_buy, rsi2_sell, trend, ml_threshold=(None,), stop_loss=(None,)) -> list:
+    """Producto cartesiano de los rangos (ml_threshold None = sin filtro ML, stop_loss None = sin stop)"""
+    return [
+        {"rsi2_buy_level": b, "rsi2_sell_level": s, "use_trend_filter": t, "ml_threshold": m, "stop_loss_pct": sl}
+        for b, s, t, m, sl in itertools.product(rsi2_buy, rsi2_sell, trend, ml_threshold, stop_loss)
+    ]
+
+
+def evaluate(columns: dict, params: dict, bt_kwargs: dict = None) -> dict:
+    """Backtest de una combinación sobre arrays ya calculados"""
+    config = RuleConfig(
+        use_trend_filter=params["use_trend_filter"],
+        use_ml_filter=params["ml_threshold"] is not None,
+        ml_threshold=params["ml_threshold"] if params["ml_threshold"] is not None else 0.5,
+        rsi2_buy_level=params["rsi2_buy_level"],
+        rsi2_sell_level=params["rsi2_sell_level"],
+    )
+    close = columns["close"]
+    bt = Backtester(**(bt_kwargs or {}))
+    bt.simulate(close, rule_signals(columns, config), np.arange(len(close)), stop_loss_pct=params["stop_loss_pct"])
+    metrics = bt.calculate_metrics()
+    result = dict(params)
+    result.update({k: metrics.get(k) for k in RESULT_METRICS})
+    result["error"] = metrics.get("error")
+    return result
+
+
+def _attach(name, shape, bt_kwargs):
+    """Initializer del worker: vista sobre la matriz compartida (sin copia)"""
+    shm = SharedMemory(name=name)
+    matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker["shm"] = shm  # mantener vivo el mapeo mientras viva el proceso
+    _worker["columns"] = {c: matrix[i] for i, c in enumerate(SWEEP_COLUMNS)}
+    _worker["bt_kwargs"] = bt_kwargs
+
+
+def _evaluate_batch(batch):
+    return [evaluate(_worker["columns"], params, _worker["bt_kwargs"]) for params in batch]
+
+
+def run_sweep(columns: dict, grid: list, workers=None, batch_size=4, bt_kwargs=None, on_result=None) -> list:
+    """Evalúa todas las combinaciones en un pool de procesos
+
+    Args:
+        columns: Salida de sweep_inputs
+        grid: Salida de param_grid
+        workers: Procesos (default: todos los cores)
+        batch_size: Combinaciones por tarea enviada a un worker
+        on_result: Callback por resultado, en orden de llegada
+
+    Returns:
+        Resultados (en orden de llegada)
+    """
+    matrix_shape = (len(SWEEP_COLUMNS), len(columns["close"]))
+    shm = SharedMemory(create=True, size=max(1, int(np.prod(matrix_shape)) * 8))
+    try:
+        matrix = np.ndarray(matrix_shape, dtype=np.float64, buffer=shm.buf)
+        for i, c in enumerate(SWEEP_COLUMNS):
+            matrix[i] = columns[c]
+        results = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(shm.name, matrix_shape, bt_kwargs)) as pool:
+            futures = [pool.submit(_evaluate_batch, grid[i:i + batch_size]) for i in range(0, len(grid), batch_size)]
+            for future in as_completed(futures):
+                for result in future.result():
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+        del matrix
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def rank(results: list, by: str = "total_return") -> pd.DataFrame:
+    """Tabla ordenada de mejor a peor (las combinaciones sin trades al final)"""
+    table = pd.DataFrame(results)
+    return table.sort_values(by, ascending=False, na_position="last").reset_index(drop=True)
+
+
+def _parse_bool(value):
+    return str(value).lower() in ("true", "1", "yes", "si", "sí")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Barrido de parámetros RSI(2)')
+    parser.add_argument('--data', default='data/raw/klines.csv', help='CSV o directorio del store (data/store)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Símbolo (solo con store)')
+    parser.add_argument('--interval', default='5m', help='Intervalo (solo con store)')
+    parser.add_argument('--start', help='Fecha inicio (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Fecha fin (YYYY-MM-DD)')
+    parser.add_argument('--capital', type=float, default=1000.0)
+    parser.add_argument('--rsi2-buy', type=float, nargs='+', default=[5.0, 10.0, 15.0])
+    parser.add_argument('--rsi2-sell', type=float, nargs='+', default=[85.0, 90.0, 95.0])
+    parser.add_argument('--trend', type=_parse_bool, nargs='+', default=[True, False])
+    parser.add_argument('--ml-threshold', type=float, nargs='*', default=[],
+                        help='Umbrales del filtro ML (sin valores = sin filtro ML)')
+    parser.add_argument('--stop-loss', type=float, nargs='+', default=[0.0], help='0 = sin stop loss')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--rank-by', default='total_return')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--out-dir', default='backtester/results')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = load_historical_data(args.data, args.start, args.end, symbol=args.symbol, interval=args.interval)
+    columns = sweep_inputs(df, use_ml=bool(args.ml_threshold))
+    grid = param_grid(
+        args.rsi2_buy, args.rsi2_sell, args.trend,
+        args.ml_threshold or [None],
+        [sl if sl > 0 else None for sl in args.stop_loss],
+    )
+    print(f"✓ {len(columns['close'])} velas, features en {time.perf_counter() - t0:.1f}s")
+    print(f"📊 {len(grid)} combinaciones en {args.workers} procesos")
+
+    best = {}
+    progress = {'done': 0}
+
+    def report(result):
+        progress['done'] += 1
+        done = progress['done']
+        value = result.get(args.rank_by)
+        if value is not None and (not best or value > best[args.rank_by]):
+            best.clear()
+            best.update(result)
+        if best and (done % 10 == 0 or done == len(grid)):
+            params = {k: best[k] for k in ('rsi2_buy_level', 'rsi2_sell_level', 'use_trend_filter',
+                                           'ml_threshold', 'stop_loss_pct')}
+            print(f"[SWEEP] {done}/{len(grid)} | mejor {args.rank_by}={best[args.rank_by]:.3f} {params}")
+
+    t1 = time.perf_counter()
+    results = run_sweep(columns, grid, workers=args.workers, bt_kwargs={'initial_capital': args.capital},
+                        on_result=report)
+    elapsed = time.perf_counter() - t1
+    print(f"✓ {len(results)} backtests en {elapsed:.1f}s ({len(results) / elapsed:.1f}/s)")
+
+    table = rank(results, args.rank_by)
+    print("\n" + table.head(args.top).to_string())
+    os.makedirs(args.out_dir, exist_ok=True)
+    out = f"{args.out_dir}/sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    table.to_csv(out, index=False)
+    print(f"\n💾 Resultados: {out}")
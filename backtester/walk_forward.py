@@ -0,0 +1,294 @@
+"""
+Walk-forward: reentrenamiento y evaluación fuera de muestra
+Desliza ventanas train/test sobre el histórico. En cada fold se entrena el
+modelo LightGBM con la primera parte del train, se re-ajustan los umbrales
+de las reglas sobre el resto (validación, que el modelo no vio) y se opera el
+test con el modelo y la configuración elegidos. Los folds corren en procesos
+en paralelo; las curvas de equity de los tests se encadenan (el capital final
+de un fold es el inicial del siguiente) en una sola curva fuera de muestra.
+
+Las features se calculan una sola vez y se cachean en disco (.npy); cada fold
+lee su porción por memory-map, y el resultado de cada fold también queda
+cacheado para no reentrenar al repetir la corrida. Las claves cubren velas,
+label, grilla y parámetros de LightGBM, no el código de las features: al
+cambiar su cálculo se sube FEATURES_VERSION.
+
+Uso:
+    python backtester/walk_forward.py --data data/store --train-days 90 --test-days 30
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtester.backtest import Backtester, load_historical_data
+from backtester.sweep import evaluate, param_grid
+from bot.feature_schema import FeatureSchema, SCHEMA_VERSION
+from bot.market_stream import INTERVAL_MS
+from bot.strategy import RuleConfig, compute_features, rule_signals
+from models.features import add_advanced_features
+from models.train_model import EARLY_STOPPING_ROUNDS, LGB_PARAMS, NUM_BOOST_ROUND
+
+CACHE_DIR = "backtester/cache/walk_forward"
+# Versión del cálculo de features (compute_features / add_advanced_features): entra en
+# la clave del dataset cacheado. SCHEMA_VERSION solo cubre qué columnas y en qué orden;
+# si cambia la fórmula de una feature hay que subir este número (o borrar el cache)
+FEATURES_VERSION = 1
+RULE_COLUMNS = ("close", "sma200", "rsi2")
+
+
+# -----------------------------
+# DATASET (features una sola vez, cacheadas)
+# -----------------------------
+def _dataset_key(df, horizon, thresh) -> str:
+    close = df["close"].to_numpy(dtype=float)
+    first = str(df["open_time"].iloc[0]) if "open_time" in df.columns and len(df) else ""
+    last = str(df["open_time"].iloc[-1]) if "open_time" in df.columns and len(df) else ""
+    raw = json.dumps([len(df), first, last, float(close.sum()), horizon, thresh,
+                      SCHEMA_VERSION, FEATURES_VERSION])
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def build_dataset(df, horizon=5, thresh=0.002, cache_dir=CACHE_DIR) -> Path:
+    """Features, labels y columnas de las reglas en <cache_dir>/<hash>/*.npy
+
+    Si ya existen para las mismas velas y parámetros de label, no se recalculan.
+
+    Returns:
+        Directorio del dataset
+    """
+    path = Path(cache_dir) / _dataset_key(df, horizon, thresh)
+    if (path / "schema.json").exists():
+        print(f"[WALK] Features cacheadas: {path}")
+        return path
+
+    feats = add_advanced_features(compute_features(df))
+    schema = FeatureSchema.for_frame(feats)
+    close = feats["close"].to_numpy(dtype=float)
+    future = np.full(len(close), np.nan)
+    future[:len(close) - horizon] = close[horizon:]
+    # -1 = sin label (las últimas `horizon` velas)
+    y = np.where(np.isnan(future), -1, ((future - close) / close > thresh).astype(np.int64))
+
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "X.npy", schema.matrix(feats))
+    np.save(tmp / "y.npy", y)
+    for col in RULE_COLUMNS:
+        np.save(tmp / f"{col}.npy", feats[col].to_numpy(dtype=float))
+    if "open_time" in feats.columns:
+        np.save(tmp / "open_time.npy", feats["open_time"].to_numpy().astype("datetime64[ms]"))
+    (tmp / "meta.json").write_text(json.dumps({"horizon": horizon, "thresh": thresh, "rows": len(close)}))
+    schema.save(tmp / "schema.json")  # último: marca el dataset como completo
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def load_dataset(path, mmap_mode="r") -> dict:
+    path = Path(path)
+    data = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in ("X", "y") + RULE_COLUMNS}
+    if (path / "open_time.npy").exists():
+        data["open_time"] = np.load(path / "open_time.npy", mmap_mode=mmap_mode)
+    data.update(json.loads((path / "meta.json").read_text()))
+    return data
+
+
+def make_folds(n_rows, train_rows, test_rows, step=None) -> list:
+    """[(inicio train, inicio test, fin test)] en filas; el test avanza de a `step` (default: test_rows)"""
+    step = step or test_rows
+    return [(a, a + train_rows, min(a + train_rows + test_rows, n_rows))
+            for a in range(0, n_rows - train_rows, step)]
+
+
+# -----------------------------
+# FOLD (corre en un worker)
+# -----------------------------
+def _best(results, rank_by):
+    scored = [r for r in results if r.get(rank_by) is not None]
+    return max(scored, key=lambda r: r[rank_by]) if scored else None
+
+
+def run_fold(dataset_path, fold, grid, val_frac=0.25, bt_kwargs=None, rank_by="total_return") -> dict:
+    """Entrena, ajusta umbrales en validación y puntúa el test de un fold
+
+    Train [a, v) -> modelo; validación [v, b) -> early stopping y umbrales;
+    test [b, c) -> scores ML. Se purgan las últimas `horizon` filas antes de b
+    para que ningún label mire precios del test.
+    """
+    a, b, c = fold
+    # el modelo del fold también depende de los parámetros de entrenamiento
+    raw = json.dumps([grid, val_frac, bt_kwargs, rank_by, LGB_PARAMS, NUM_BOOST_ROUND, EARLY_STOPPING_ROUNDS])
+    key = hashlib.sha1(raw.encode()).hexdigest()[:8]
+    cache = Path(dataset_path) / "folds" / f"{a}_{b}_{c}_{key}.json"
+    if cache.exists():
+        result = json.loads(cache.read_text())
+        result["test_scores"] = np.asarray(result["test_scores"])
+        return result
+
+    data = load_dataset(dataset_path)
+    X, y = data["X"], data["y"]
+    label_end = b - data["horizon"]
+    v = a + int((label_end - a) * (1 - val_frac))
+
+    params = {**LGB_PARAMS, "num_threads": 1}  # un thread por worker: el paralelismo lo dan los folds
+    model = lgb.train(
+        params,
+        lgb.Dataset(np.asarray(X[a:v]), label=np.asarray(y[a:v])),
+        valid_sets=[lgb.Dataset(np.asarray(X[v:label_end]), label=np.asarray(y[v:label_end]))],
+        num_boost_round=NUM_BOOST_ROUND,
+        callbacks=[lgb.early_stopping(stopping_rounds=EARLY_STOPPING_ROUNDS, verbose=False)],
+    )
+
+    val_columns = {col: np.asarray(data[col][v:b]) for col in RULE_COLUMNS}
+    val_columns["ml_score"] = model.predict(np.asarray(X[v:b]))
+    tuned = [evaluate(val_columns, p, bt_kwargs) for p in grid]
+    best = _best(tuned, rank_by) or dict(grid[0], **{rank_by: None})
+
+    result = {
+        "fold": [a, b, c],
+        "auc": model.best_score.get("valid_0", {}).get("auc"),
+        "best_iteration": model.best_iteration,
+        "params": {k: best[k] for k in grid[0]},
+        "val_" + rank_by: best[rank_by],
+        "test_scores": model.predict(np.asarray(X[b:c])),
+    }
+    cache.parent.mkdir(exist_ok=True)
+    tmp = cache.with_suffix(".tmp")
+    tmp.write_text(json.dumps({**result, "test_scores": result["test_scores"].tolist()}))
+    os.replace(tmp, cache)
+    return result
+
+
+# -----------------------------
+# ORQUESTACIÓN
+# -----------------------------
+def walk_forward(dataset_path, folds, grid, workers=None, val_frac=0.25, initial_capital=1000.0,
+                 rank_by="total_return"):
+    """Corre los folds en paralelo y encadena los tests fuera de muestra
+
+    Returns:
+        (tabla por fold, curva de equity fuera de muestra, métricas globales)
+    """
+    bt_kwargs = {"initial_capital": initial_capital}
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_fold, str(dataset_path), fold, grid, val_frac, bt_kwargs, rank_by) for fold in folds]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[WALK] fold {len(results)}/{len(folds)} filas {result['fold']} auc={result['auc']} "
+                  f"params={result['params']}")
+    results.sort(key=lambda r: r["fold"][0])
+
+    # simulación de los tests en orden, con el capital encadenado (es barata: ver Backtester.simulate)
+    data = load_dataset(dataset_path)
+    capital = initial_capital
+    rows, curves = [], []
+    for result in results:
+        _, b, c = result["fold"]
+        p = result["params"]
+        columns = {col: np.asarray(data[col][b:c]) for col in RULE_COLUMNS}
+        columns["ml_score"] = result["test_scores"]
+        config = RuleConfig(
+            use_trend_filter=p["use_trend_filter"],
+            use_ml_filter=p["ml_threshold"] is not None,
+            ml_threshold=p["ml_threshold"] if p["ml_threshold"] is not None else 0.5,
+            rsi2_buy_level=p["rsi2_buy_level"],
+            rsi2_sell_level=p["rsi2_sell_level"],
+        )
+        timestamps = data["open_time"][b:c] if "open_time" in data else np.arange(b, c)
+        bt = Backtester(initial_capital=capital)
+        curve = bt.simulate(columns["close"], rule_signals(columns, config), timestamps, stop_loss_pct=p["stop_loss_pct"])
+        metrics = bt.calculate_metrics()
+        curves.append(pd.DataFrame({"timestamp": timestamps, "equity": curve["equity"], "fold": len(curves)}))
+        rows.append({
+            "train_start": result["fold"][0], "test_start": b, "test_end": c,
+            "auc": result["auc"], "best_iteration": result["best_iteration"], **p,
+            "val_" + rank_by: result["val_" + rank_by],
+            "capital_start": capital, "capital_end": bt.usdt,
+            "test_return_pct": (bt.usdt - capital) / capital * 100,
+            "test_trades": len(bt.trades), "test_win_rate": metrics.get("win_rate"),
+        })
+        capital = bt.usdt
+
+    folds_df = pd.DataFrame(rows)
+    equity = pd.concat(curves, ignore_index=True) if curves else pd.DataFrame(columns=["timestamp", "equity", "fold"])
+    summary = {
+        "folds": len(rows),
+        "initial_capital": initial_capital,
+        "final_capital": capital,
+        "oos_return_pct": (capital - initial_capital) / initial_capital * 100,
+        "oos_trades": int(folds_df["test_trades"].sum()) if rows else 0,
+        "positive_folds": int((folds_df["test_return_pct"] > 0).sum()) if rows else 0,
+    }
+    if len(equity):
+        peak = equity["equity"].cummax()
+        summary["max_drawdown_pct"] = float(((equity["equity"] - peak) / peak * 100).min())
+        returns = equity["equity"].pct_change().dropna()
+        summary["sharpe_ratio"] = float((returns.mean() / returns.std()) * np.sqrt(252)) if returns.std() > 0 else 0.0
+    return folds_df, equity, summary
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Walk-forward con reentrenamiento por fold')
+    parser.add_argument('--data', default='data/raw/klines.csv', help='CSV o directorio del store (data/store)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Símbolo (solo con store)')
+    parser.add_argument('--interval', default='5m')
+    parser.add_argument('--start', help='Fecha inicio (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Fecha fin (YYYY-MM-DD)')
+    parser.add_argument('--train-days', type=float, default=90)
+    parser.add_argument('--test-days', type=float, default=30)
+    parser.add_argument('--val-frac', type=float, default=0.25, help='Parte final del train para early stopping y umbrales')
+    parser.add_argument('--horizon', type=int, default=5)
+    parser.add_argument('--thresh', type=float, default=0.002)
+    parser.add_argument('--capital', type=float, default=1000.0)
+    parser.add_argument('--rsi2-buy', type=float, nargs='+', default=[5.0, 10.0, 15.0])
+    parser.add_argument('--rsi2-sell', type=float, nargs='+', default=[85.0, 90.0, 95.0])
+    parser.add_argument('--ml-threshold', type=float, nargs='*', default=[0.5, 0.6],
+                        help='Umbrales ML a probar (además de sin filtro ML)')
+    parser.add_argument('--stop-loss', type=float, nargs='+', default=[0.0], help='0 = sin stop loss')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--out-dir', default='backtester/results')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = load_historical_data(args.data, args.start, args.end, symbol=args.symbol, interval=args.interval)
+    dataset = build_dataset(df, args.horizon, args.thresh, args.cache_dir)
+    n_rows = json.loads((dataset / "meta.json").read_text())["rows"]
+    per_day = 86_400_000 // INTERVAL_MS[args.interval]
+    folds = make_folds(n_rows, int(args.train_days * per_day), int(args.test_days * per_day))
+    grid = param_grid(args.rsi2_buy, args.rsi2_sell, [True, False], [None] + args.ml_threshold,
+                      [sl if sl > 0 else None for sl in args.stop_loss])
+    print(f"✓ {n_rows} velas, {len(folds)} folds, {len(grid)} combinaciones por fold ({time.perf_counter() - t0:.1f}s)")
+    if not folds:
+        sys.exit("Histórico demasiado corto para una ventana train + test")
+
+    folds_df, equity, summary = walk_forward(dataset, folds, grid, args.workers, args.val_frac, args.capital)
+
+    print("\n" + folds_df.to_string())
+    print("\n📊 FUERA DE MUESTRA")
+    for k, v in summary.items():
+        print(f"  {k}: {v:,.2f}" if isinstance(v, float) else f"  {k}: {v}")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    folds_df.to_csv(f"{args.out_dir}/walk_forward_folds_{stamp}.csv", index=False)
+    equity.to_csv(f"{args.out_dir}/walk_forward_equity_{stamp}.csv", index=False)
+    print(f"\n💾 Resultados: {args.out_dir}/walk_forward_*_{stamp}.csv ({time.perf_counter() - t0:.1f}s)")
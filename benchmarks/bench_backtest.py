@@ -0,0 +1,68 @@
+"""Simulación de posiciones del backtester: loop con iterrows vs Backtester.simulate
+Solo mide la parte de trading (las señales se generan una vez, con densidad
+parecida a la estrategia RSI(2)); el loop es el de Backtester.run anterior.
+Uso:
+  python benchmarks/bench_backtest.py --years 1
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtester.backtest import Backtester
+
+
+def make_signals(n, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        'open_time': pd.date_range('2021-01-01', periods=n, freq='5min'),
+        'close': close,
+        'final': rng.choice([0, 1, -1], size=n, p=[0.97, 0.015, 0.015]),
+    })
+
+
+def legacy_loop(bt, df, sig_df):
+    for i, row in sig_df.iterrows():
+        price = float(row['close'])
+        timestamp = df.iloc[i]['open_time']
+        sig = int(row['final'])
+        if sig == 1:
+            bt.execute_buy(price, timestamp)
+        elif sig == -1:
+            bt.execute_sell(price, timestamp)
+        bt.equity_curve.append({'timestamp': timestamp, 'price': price,
+                                'equity': bt.get_equity(price), 'usdt': bt.usdt, 'btc': bt.btc})
+    if bt.btc > 0:
+        bt.execute_sell(float(sig_df.iloc[-1]['close']), df.iloc[-1]['open_time'])
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--years', type=float, default=1.0)
+    args = p.parse_args()
+
+    n = int(args.years * 365 * 288)
+    sig_df = make_signals(n)
+
+    bt_loop = Backtester()
+    t0 = time.perf_counter()
+    legacy_loop(bt_loop, sig_df, sig_df)
+    m_loop = bt_loop.calculate_metrics()
+    t_loop = time.perf_counter() - t0
+
+    bt_vec = Backtester()
+    t0 = time.perf_counter()
+    bt_vec.simulate(sig_df['close'].to_numpy(), sig_df['final'].to_numpy(), sig_df['open_time'].array)
+    m_vec = bt_vec.calculate_metrics()
+    t_vec = time.perf_counter() - t0
+
+    assert m_loop == m_vec and len(bt_loop.trades) == len(bt_vec.trades)
+    print(f"{n} velas, {len(bt_vec.trades)} trades")
+    print(f"loop:      {t_loop:8.3f} s  ({n / t_loop:12,.0f} velas/s)")
+    print(f"vectorial: {t_vec:8.3f} s  ({n / t_vec:12,.0f} velas/s)  x{t_loop / t_vec:.0f}")
@@ -0,0 +1,66 @@
+"""Carga de un año de velas de 5m: CSV (load_historical_data) vs CandleStore
+Mide la lectura completa y un rango de un mes (--start/--end del backtester).
+Uso:
+  python benchmarks/bench_candle_store.py --days 365 --repeat 5
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.candle_store import CandleStore, load_candles, migrate_csv
+
+STEP = 300_000
+START = 1704067200000  # 2024-01-01 UTC
+
+
+def make_csv(path, n, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 20, n))
+    ot = START + np.arange(n) * STEP
+    pd.DataFrame({
+        'open_time': ot, 'open': close, 'high': close + 5, 'low': close - 5, 'close': close,
+        'volume': rng.uniform(1, 100, n), 'close_time': ot + STEP - 1, 'qav': rng.uniform(1e3, 1e5, n),
+        'num_trades': rng.integers(10, 1000, n), 'taker_base_vol': rng.uniform(0, 50, n),
+        'taker_quote_vol': rng.uniform(1e3, 5e4, n), 'ignore': 0,
+    }).to_csv(path, index=False)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        df = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, len(df)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--days', type=int, default=365)
+    p.add_argument('--repeat', type=int, default=5)
+    args = p.parse_args()
+
+    n = args.days * 288
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / 'klines.csv'
+        make_csv(csv, n)
+        store_dir = Path(tmp) / 'store'
+        t0 = time.perf_counter()
+        migrate_csv(csv, CandleStore(store_dir), 'BTCUSDT', '5m')
+        print(f"{n} velas ({args.days} días), CSV {csv.stat().st_size / 1e6:.1f} MB, "
+              f"migración {time.perf_counter() - t0:.2f}s")
+
+        cases = [('completo', None, None), ('un mes', '2024-06-01', '2024-07-01')]
+        for label, start, end in cases:
+            t_csv, n_csv = best_of(lambda: load_candles(csv, 'BTCUSDT', '5m', start, end), args.repeat)
+            t_store, n_store = best_of(lambda: load_candles(store_dir, 'BTCUSDT', '5m', start, end), args.repeat)
+            assert n_csv == n_store
+            print(f"{label:>9}: CSV {t_csv * 1e3:8.1f} ms | store {t_store * 1e3:6.2f} ms "
+                  f"({n_store} filas, x{t_csv / t_store:.0f})")
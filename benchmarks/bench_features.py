@@ -0,0 +1,80 @@
+"""Costo de features de un backtest de un año de velas de 5m
+Antes: compute_features para el ML scorer + otra vez dentro de build_signals.
+Ahora: FeaturePipeline una vez y build_signals(features=...).
+Uso:
+  python benchmarks/bench_features.py --days 365
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot import strategy
+from bot.ml_scorer import MLScorer
+
+
+class FeatureTimer:
+    """Envuelve compute_features para contar llamadas y tiempo"""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, df):
+        t0 = time.perf_counter()
+        try:
+            return self.fn(df)
+        finally:
+            self.calls += 1
+            self.seconds += time.perf_counter() - t0
+
+
+def make_candles(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'open_time': pd.date_range('2024-01-01', periods=n, freq='5min'),
+        'close': 60000 * np.exp(np.cumsum(rng.normal(0, 0.002, n))),
+        'volume': rng.uniform(1, 50, n),
+    })
+
+
+def legacy(df, ml):
+    feats = strategy.compute_features(df.copy())
+    return strategy.build_signals(df.copy(), ml_scores=ml.predict(feats))
+
+
+def pipelined(df, ml):
+    feats = strategy.FeaturePipeline()(df)
+    return strategy.build_signals(df, ml_scores=ml.predict(feats), features=feats)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--days', type=int, default=365)
+    args = p.parse_args()
+
+    df = make_candles(args.days * 288)
+    ml = MLScorer()  # sin modelo: scores en 0, se mide solo el flujo de features
+    original = strategy.compute_features
+    print(f'{len(df)} velas de 5m')
+
+    results = {}
+    for label, fn in [('legacy', legacy), ('pipeline', pipelined)]:
+        timer = FeatureTimer(original)
+        strategy.compute_features = timer
+        try:
+            t0 = time.perf_counter()
+            results[label] = fn(df, ml)
+            total = time.perf_counter() - t0
+        finally:
+            strategy.compute_features = original
+        print(f'{label:<9} compute_features x{timer.calls}  features {timer.seconds * 1e3:8.1f} ms  total {total * 1e3:8.1f} ms')
+
+    pd.testing.assert_frame_equal(results['legacy'], results['pipeline'])
+    print('  -> mismas señales')
@@ -0,0 +1,108 @@
+"""Grid backtester: loop con iterrows + get_signal vs GridBacktester.simulate
+Mide un backtest completo (simulación + métricas) con el loop anterior y con
+el vectorizado, cuántas configuraciones (rango x niveles) por segundo
+alcanza el vectorizado para un barrido y cuánto cuesta el modo intravela.
+Uso:
+  python benchmarks/bench_grid_backtest.py --years 1 --configs 200
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtester.backtest_grid import GridBacktester
+from backtester.intrabar import bars_from_frame
+from bot.strategies.grid_trading import create_grid_from_current_price
+
+
+def make_candles(n, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.001, (2, n)))
+    return pd.DataFrame({'open_time': pd.date_range('2021-01-01', periods=n, freq='5min'), 'open': open_,
+                         'high': np.maximum(open_, close) * (1 + wick[0]),
+                         'low': np.minimum(open_, close) * (1 - wick[1]), 'close': close})
+
+
+def legacy_run(bt, df, grid_range_pct, num_grids, invest):
+    grid = create_grid_from_current_price(float(df.iloc[0]['close']), grid_range_pct, num_grids)
+    for i, row in df.iterrows():
+        price = float(row['close'])
+        timestamp = row['open_time']
+        signal, level, _ = grid.get_signal(price)
+        if signal == 1 and bt.usdt >= invest:
+            qty = (invest * (1 - bt.fee_rate)) / price
+            bt.btc += qty
+            bt.usdt -= invest
+            grid.execute_buy(level)
+            bt.trades.append({'timestamp': timestamp, 'type': 'BUY', 'price': price, 'qty': qty,
+                              'usdt': invest, 'grid_level': level, 'fee': invest * bt.fee_rate})
+        elif signal == -1:
+            active = sum(1 for v in grid.positions.values() if v)
+            if active > 0 and bt.btc > 0:
+                qty = bt.btc / active
+                gain = qty * price * (1 - bt.fee_rate)
+                bt.usdt += gain
+                bt.btc -= qty
+                grid.execute_sell(level)
+                bt.trades.append({'timestamp': timestamp, 'type': 'SELL', 'price': price, 'qty': qty,
+                                  'usdt': gain, 'grid_level': level, 'fee': qty * price * bt.fee_rate})
+        bt.equity_curve.append({'timestamp': timestamp, 'price': price, 'equity': bt.usdt + bt.btc * price,
+                                'usdt': bt.usdt, 'btc': bt.btc})
+    bt.equity_curve = {k: [e[k] for e in bt.equity_curve] for k in bt.equity_curve[0]}
+    return bt.calculate_metrics(grid)
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--years', type=float, default=1.0)
+    p.add_argument('--configs', type=int, default=200)
+    args = p.parse_args()
+
+    n = int(args.years * 365 * 288)
+    df = make_candles(n)
+
+    t0 = time.perf_counter()
+    m_loop = legacy_run(GridBacktester(), df, 0.3, 40, 10.0)
+    t_loop = time.perf_counter() - t0
+
+    bt = GridBacktester()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        m_vec = bt.run(df, grid_range_pct=0.3, num_grids=40, investment_per_level=10.0)
+    t_vec = time.perf_counter() - t0
+
+    assert m_loop == m_vec
+    print(f"{n} velas, {len(bt.trades)} órdenes")
+    print(f"loop:      {t_loop:8.3f} s")
+    print(f"vectorial: {t_vec:8.3f} s  x{t_loop / t_vec:.0f}")
+
+    close = df['close'].to_numpy()
+    timestamps = df['open_time'].array
+    configs = list(itertools.product(np.linspace(0.05, 0.5, 20), range(5, 105, 5)))[:args.configs]
+    t0 = time.perf_counter()
+    for range_pct, levels in configs:
+        bt = GridBacktester()
+        grid = create_grid_from_current_price(float(close[0]), range_pct, levels)
+        bt.simulate(grid, close, timestamps, 10.0)
+        bt.calculate_metrics(grid)
+    t_sweep = time.perf_counter() - t0
+    print(f"barrido:   {len(configs)} configuraciones en {t_sweep:.2f} s ({len(configs) / t_sweep:.1f}/s)")
+
+    bars = bars_from_frame(df)
+    bt = GridBacktester()
+    grid = create_grid_from_current_price(float(close[0]), 0.3, 40)
+    t0 = time.perf_counter()
+    bt.simulate(grid, close, timestamps, 10.0, bars=bars)
+    bt.calculate_metrics(grid)
+    t_intra = time.perf_counter() - t0
+    print(f"intravela: {t_intra:8.3f} s  ({len(bt.trades)} órdenes)")
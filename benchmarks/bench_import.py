@@ -0,0 +1,53 @@
+"""Tiempo de import de los módulos del bot (proceso nuevo por medición)
+Reporta además si el import cargó el SDK de Binance o creó logs/ en el cwd.
+Uso:
+  python benchmarks/bench_import.py --repeat 5
+  python benchmarks/bench_import.py --root /ruta/a/otro/checkout   # comparar
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+MODULES = ['bot.logger', 'bot.exchange', 'bot.data_source', 'bot.runner', 'backtester.backtest']
+
+PROBE = '''
+import json, os, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "sdk": "binance" in sys.modules, "logs_dir": os.path.isdir("logs")}}))
+'''
+
+
+def measure(root, module, repeat):
+    samples, last = [], None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            out = subprocess.run(
+                [sys.executable, '-c', PROBE.format(module=module)],
+                cwd=cwd, env={'PYTHONPATH': str(root), 'PATH': ''},
+                capture_output=True, text=True,
+            )
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        last = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(last['seconds'])
+    return min(samples), last
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--root', default=str(Path(__file__).parent.parent))
+    args = p.parse_args()
+
+    print(f'{"módulo":<22} {"import (ms)":>12}  sdk   logs/')
+    for module in MODULES:
+        best, info = measure(args.root, module, args.repeat)
+        if best is None:
+            print(f'{module:<22} {"error":>12}  {info}')
+            continue
+        print(f'{module:<22} {best * 1000:12.1f}  {str(info["sdk"]):<5} {info["logs_dir"]}')
@@ -0,0 +1,56 @@
+"""Costo por vela cerrada: compute_features sobre 500 velas vs IndicatorEngine.update
+Uso:
+  python benchmarks/bench_indicators.py --ticks 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.indicators import IndicatorEngine
+from bot.strategy import compute_features
+
+WINDOW = 500
+
+
+def make_candles(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'open_time': pd.date_range('2024-01-01', periods=n, freq='5min'),
+        'close': 60000 * np.exp(np.cumsum(rng.normal(0, 0.002, n))),
+        'volume': rng.uniform(1, 50, n),
+    })
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--ticks', type=int, default=500)
+    args = p.parse_args()
+
+    df = make_candles(WINDOW + args.ticks)
+    records = df.to_dict('records')
+
+    compute_features(df.iloc[:WINDOW])  # warm-up
+    t0 = time.perf_counter()
+    for i in range(args.ticks):
+        batch = compute_features(df.iloc[i + 1:i + 1 + WINDOW])
+    t_batch = (time.perf_counter() - t0) / args.ticks
+
+    engine = IndicatorEngine()
+    engine.warmup(df.iloc[:WINDOW])
+    t0 = time.perf_counter()
+    for rec in records[WINDOW:]:
+        row = engine.update(rec)
+    t_engine = (time.perf_counter() - t0) / args.ticks
+
+    # la última fila coincide con el cálculo batch de la misma ventana
+    last = batch.iloc[-1]
+    diff = max(abs(row[c] - last[c]) / max(abs(last[c]), 1e-12) for c in batch.columns if c not in ('open_time',))
+    print(f'compute_features   {t_batch * 1e6:10.1f} us/vela')
+    print(f'IndicatorEngine    {t_engine * 1e6:10.1f} us/vela')
+    print(f'  -> x{t_batch / t_engine:.0f} más rápido, diferencia relativa máx {diff:.1e}')
@@ -0,0 +1,82 @@
+"""Costo por tick de obtener las últimas 500 velas: refetch completo vs KlineStore
+Uso:
+  python benchmarks/bench_kline_store.py --ticks 200
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.kline_store import KlineStore
+
+STEP = 300_000
+COLUMNS = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+           'quote_asset_volume', 'num_trades', 'taker_buy_base', 'taker_buy_quote', 'ignore']
+
+
+def make_rows(n):
+    return [[i * STEP, f'{100 + i:.2f}', f'{101 + i:.2f}', f'{99 + i:.2f}', f'{100 + i:.2f}',
+             '1.50000000', i * STEP + STEP - 1, '150.0', 42, '0.7', '70.0', '0'] for i in range(n)]
+
+
+class FakeAPI:
+    """Simula la respuesta JSON (se mide también el costo de decodificarla)"""
+
+    def __init__(self, n):
+        self.rows = make_rows(n)
+        self.bytes = 0
+
+    def fetch(self, symbol, interval, startTime=None, limit=500):
+        rows = self.rows[-limit:] if startTime is None else [r for r in self.rows[-2:] if r[0] >= startTime]
+        payload = json.dumps(rows)
+        self.bytes += len(payload)
+        return json.loads(payload)
+
+
+def legacy_tick(api):
+    df = pd.DataFrame(api.fetch('BTCUSDT', '5m', limit=500), columns=COLUMNS)
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = df[col].astype(float)
+    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+    return df
+
+
+def run(label, tick, api, ticks):
+    tick()  # warm-up (caches de pandas)
+    api.bytes = 0
+    t0 = time.perf_counter()
+    for i in range(ticks):
+        api.rows[-1][4] = f'{100 + i:.2f}'  # la vela abierta cambia en cada tick
+        tick()
+    elapsed = time.perf_counter() - t0
+    sent = api.bytes
+
+    tracemalloc.start()
+    tick()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<12} {elapsed / ticks * 1e6:10.1f} us/tick  {sent / ticks:10.0f} B/tick  alloc_peak={peak / 1024:.1f} KiB')
+    return elapsed / ticks, sent / ticks, peak
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--ticks', type=int, default=200)
+    args = p.parse_args()
+
+    api = FakeAPI(1000)
+    t_old, b_old, m_old = run('refetch-500', lambda: legacy_tick(api), api, args.ticks)
+
+    for label, read in [('store+frame', 'frame'), ('store+view', 'view')]:
+        api = FakeAPI(1000)
+        store = KlineStore('BTCUSDT', '5m', capacity=500, fetch=api.fetch)
+        store.update()
+        fn = getattr(store, read)
+        t_new, b_new, m_new = run(label, lambda: (store.update(), fn()), api, args.ticks)
+        print(f'  -> tiempo x{t_old / t_new:.0f}  bytes x{b_old / b_new:.0f}  alloc x{m_old / m_new:.0f}')
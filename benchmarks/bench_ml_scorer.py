@@ -0,0 +1,59 @@
+"""Latencia de inferencia live: MLScorer.predict sobre el frame completo vs última fila
+Uso:
+  python benchmarks/bench_ml_scorer.py --model models/model.pkl --ticks 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.indicators import IndicatorEngine
+from bot.ml_scorer import MLScorer
+from bot.strategy import compute_features
+
+
+def make_candles(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'close': 60000 * np.exp(np.cumsum(rng.normal(0, 0.002, n))),
+        'volume': rng.uniform(1, 50, n),
+    })
+
+
+def timed(label, fn, ticks):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        out = fn()
+    per_call = (time.perf_counter() - t0) / ticks
+    print(f'{label:<24} {per_call * 1e6:10.1f} us/tick')
+    return per_call, out
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--model', default='models/model.pkl')
+    p.add_argument('--ticks', type=int, default=200)
+    args = p.parse_args()
+
+    df = make_candles(500)
+    feats = compute_features(df)  # ~300 filas, como en el runner
+    row = IndicatorEngine().warmup(df)
+    ml = MLScorer(args.model)
+    if ml.model is None:
+        sys.exit(f'No se pudo cargar el modelo {args.model}')
+    print(f'{len(feats)} filas de features, modelo {args.model}')
+
+    t_full, full = timed('predict (frame completo)', lambda: ml.predict(feats), args.ticks)
+    t_last, last = timed('predict_last', lambda: ml.predict_last(feats), args.ticks)
+    t_row, score = timed('score_row', lambda: ml.score_row(row), args.ticks)
+    assert abs(full[-1] - last[0]) < 1e-12 and abs(full[-1] - score) < 1e-9
+
+    print(f'  -> predict_last x{t_full / t_last:.1f}, score_row x{t_full / t_row:.1f}')
+    for name, s in ml.latency.summary().items():
+        print(f'  {name:<18} p50={s["p50_ms"]:.3f}ms p95={s["p95_ms"]:.3f}ms')
@@ -0,0 +1,102 @@
+"""Microbenchmark del cuantizado de órdenes (costo por orden, antes vs después)
+Uso:
+  python benchmarks/bench_quantizer.py --orders 20000
+"""
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal, ROUND_UP
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.quantizer import OrderQuantizer
+from bot.symbol_info import SymbolFilters
+
+SAFETY_MARGIN = 1.02
+STEP = '0.00001000'
+TICK = '0.01000000'
+MIN_NOTIONAL = 5.0
+
+
+def legacy_market_buy_qty(usdt_amount, usdt_balance, price, step_size_str=STEP, min_notional=MIN_NOTIONAL):
+    """Bloque de cantidad de market_buy tal como estaba antes de OrderQuantizer"""
+    step_size = Decimal(step_size_str)
+    usdt_with_margin = Decimal(str(usdt_amount)) * Decimal(str(SAFETY_MARGIN))
+    usdt_with_margin = min(usdt_with_margin, Decimal(str(usdt_balance)))
+    price_d = Decimal(str(price))
+    qty = usdt_with_margin / price_d
+    qty_adjusted = (qty // step_size) * step_size
+    if qty_adjusted <= Decimal("0"):
+        qty_adjusted = step_size
+    if "." in step_size_str:
+        step_decimals = len(step_size_str.rstrip("0").split(".")[1])
+    else:
+        step_decimals = 0
+    qty_str = format(qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f")
+    if "." in qty_str:
+        qty_str = qty_str.rstrip("0").rstrip(".")
+    order_value = float(Decimal(qty_str) * price_d)
+    if order_value < min_notional:
+        min_qty = Decimal(str(min_notional)) / price_d
+        times = (min_qty / step_size).to_integral_value(rounding=ROUND_UP)
+        qty_adjusted = times * step_size
+        qty_str = format(qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f")
+        if "." in qty_str:
+            qty_str = qty_str.rstrip("0").rstrip(".")
+        order_value = float(Decimal(qty_str) * price_d)
+    return qty_str, order_value
+
+
+def quantizer_market_buy_qty(q, usdt_amount, usdt_balance, price):
+    """Mismo cálculo con OrderQuantizer (como en Exchange.market_buy)"""
+    units = q.floor_qty_for_quote(usdt_amount, price, margin=SAFETY_MARGIN, cap=usdt_balance)
+    if units <= 0:
+        units = q.step_units
+    order_value = q.notional(units, price)
+    if order_value < q.min_notional:
+        units = q.min_notional_qty(price)
+        order_value = q.notional(units, price)
+    return q.render_qty(units), order_value
+
+
+def bench(fn, cases, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for args in cases:
+            fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(cases) * 1e6
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--orders', type=int, default=20000)
+    p.add_argument('--repeat', type=int, default=5)
+    args = p.parse_args()
+
+    rng = random.Random(42)
+    cases = [
+        (round(rng.uniform(1, 200), 2), round(rng.uniform(50, 5000), 2), round(rng.uniform(20000, 90000), 2))
+        for _ in range(args.orders)
+    ]
+
+    filters = SymbolFilters.from_symbol_info({'symbol': 'BTCUSDT', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'tickSize': TICK},
+        {'filterType': 'LOT_SIZE', 'stepSize': STEP, 'minQty': STEP},
+        {'filterType': 'NOTIONAL', 'minNotional': str(MIN_NOTIONAL)},
+    ]})
+    q = OrderQuantizer(filters)
+
+    mismatches = sum(
+        legacy_market_buy_qty(*c)[0] != quantizer_market_buy_qty(q, *c)[0] for c in cases
+    )
+    legacy_us = bench(legacy_market_buy_qty, cases, args.repeat)
+    new_us = bench(lambda *c: quantizer_market_buy_qty(q, *c), cases, args.repeat)
+
+    print(f"Órdenes: {args.orders} | qty distintas: {mismatches}")
+    print(f"  Decimal (antes):        {legacy_us:8.2f} µs/orden")
+    print(f"  OrderQuantizer (ahora): {new_us:8.2f} µs/orden")
+    print(f"  Speedup:                {legacy_us / new_us:8.1f}x")
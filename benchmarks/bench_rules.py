@@ -0,0 +1,51 @@
+"""Throughput de las reglas de señal: df.apply(rule_signal, axis=1) vs rule_signals
+Uso:
+  python benchmarks/bench_rules.py --rows 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.strategy import RuleConfig, rule_signal, rule_signals
+
+
+def make_frame(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'rsi2': rng.uniform(0, 100, n),
+        'close': rng.uniform(90, 110, n),
+        'sma200': rng.uniform(90, 110, n),
+        'ml_score': rng.uniform(0, 1, n),
+    })
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--rows', type=int, default=100_000)
+    args = p.parse_args()
+
+    df = make_frame(args.rows)
+    cfg = RuleConfig.from_env()
+
+    t_apply, old = timed(lambda: df.apply(rule_signal, axis=1).to_numpy(), 1)
+    t_vec, new = timed(lambda: rule_signals(df, cfg), 5)
+    assert np.array_equal(old, new)
+
+    print(f'apply(rule_signal)  {args.rows / t_apply:14,.0f} filas/s')
+    print(f'rule_signals        {args.rows / t_vec:14,.0f} filas/s')
+    print(f'  -> x{t_apply / t_vec:.0f}, mismas señales')
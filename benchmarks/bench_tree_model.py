@@ -0,0 +1,56 @@
+"""Inferencia: Booster.predict de LightGBM vs CompiledTrees (NumPy)
+Uso:
+  python benchmarks/bench_tree_model.py --model models/model.pkl --rows 1000000
+"""
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.strategy import compute_features
+from bot.tree_model import CompiledTrees
+
+
+def make_features(n, names, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'close': 60000 * np.exp(np.cumsum(rng.normal(0, 0.002, n + 300))),
+        'volume': rng.uniform(1, 50, n + 300),
+    })
+    return compute_features(df)[names].to_numpy()[:n]
+
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - t0) / repeat, out
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--model', default='models/model.pkl')
+    p.add_argument('--rows', type=int, default=1_000_000)
+    args = p.parse_args()
+
+    with open(args.model, 'rb') as f:
+        booster = pickle.load(f)
+    compiled = CompiledTrees.from_booster(booster)
+    X = make_features(args.rows, booster.feature_name())
+    print(f'{len(X):,} filas, {compiled.num_trees} árboles (max_depth={compiled.max_depth})')
+
+    t_lgb, ref = timed(lambda: booster.predict(X))
+    t_np, out = timed(lambda: compiled.predict(X))
+    print(f'Booster.predict      {len(X) / t_lgb:14,.0f} filas/s')
+    print(f'CompiledTrees        {len(X) / t_np:14,.0f} filas/s   (diferencia máx {np.abs(out - ref).max():.1e})')
+
+    row = X[-1:]
+    t_lgb, _ = timed(lambda: booster.predict(row), 200)
+    t_np, _ = timed(lambda: compiled.predict(row), 200)
+    print(f'1 fila: Booster {t_lgb * 1e6:.0f} us, CompiledTrees {t_np * 1e6:.0f} us')
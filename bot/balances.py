@@ -0,0 +1,162 @@
+"""Cache de balances de la cuenta compartido por runner, monitor y Exchange
+Un solo GET /api/v3/account (endpoint firmado y pesado) sirve a todos los
+lectores mientras esté fresco. Se invalida con nuestros propios fills y se
+mantiene al día con los eventos de cuenta del user data stream.
+"""
+
+import asyncio
+import os
+import time
+
+# Segundos que un snapshot REST se considera fresco (sin stream conectado)
+BALANCE_CACHE_TTL = float(os.getenv("BALANCE_CACHE_TTL", 30))
+
+
+def order_time(order):
+    """Hora (ms) de una respuesta de orden: transactTime (new_order / cancel) o
+    updateTime (get_order / user stream); None si no hay respuesta"""
+    if not order:
+        return None
+    return order.get("transactTime", order.get("updateTime"))
+
+
+class BalanceCache:
+    """Balances libres por asset con TTL e invalidación por eventos
+
+    - `get(max_age)` devuelve el snapshot cacheado si es fresco; si no, un único
+      fetch aunque haya varios lectores concurrentes.
+    - `invalidate(after)` fuerza el fetch en el próximo `get` (ej. tras un fill propio).
+    - Con un UserDataStream conectado (`attach`), los eventos outboundAccountPosition
+      / balanceUpdate actualizan el snapshot y no hace falta volver a consultar REST;
+      tras un invalidate solo revalida un evento posterior al fill (u >= after).
+    - `stats()` expone edad del snapshot y contadores para monitoreo.
+    """
+
+    def __init__(self, fetch, ttl: float = BALANCE_CACHE_TTL, latency=None):
+        """
+        Args:
+            fetch: coroutine fetch() -> respuesta de GET /api/v3/account
+            ttl: Segundos de validez de un snapshot REST
+            latency: LatencyStats opcional (registra balances.age y balances.fetch)
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self.latency = latency
+        self._balances = None  # asset -> free
+        self._updated_at = float("-inf")
+        self._valid = False
+        self._valid_after = float("-inf")  # ms: un evento de cuenta anterior no refleja nuestros fills
+        self._lock = asyncio.Lock()
+        self._stream = None
+        self._stream_epoch = None  # conexión del stream vigente al último snapshot
+
+        self.fetches = 0
+        self.hits = 0
+        self.events = 0
+        self.invalidations = 0
+
+    # -----------------------------
+    # STREAM
+    # -----------------------------
+    def attach(self, stream):
+        """Suscribe el cache a los eventos de cuenta de un UserDataStream"""
+        self._stream = stream
+        stream.subscribe(self._on_event)
+
+    @property
+    def streaming(self) -> bool:
+        """True si el stream está conectado desde antes del snapshot actual
+        (tras una reconexión pudieron perderse eventos: se vuelve a consultar REST)"""
+        s = self._stream
+        return s is not None and s.connected.is_set() and s.connections == self._stream_epoch
+
+    def _on_event(self, event: dict):
+        etype = event.get("e")
+        if self._balances is None or etype not in ("outboundAccountPosition", "balanceUpdate"):
+            return
+        if etype == "outboundAccountPosition":
+            if event.get("u", float("-inf")) < self._valid_after:
+                return  # anterior al último fill propio: llegó tarde, sus balances ya no valen
+            # solo trae los assets que cambiaron
+            for b in event.get("B", []):
+                self._balances[b["a"]] = float(b["f"])
+        elif self._valid:
+            # delta por depósito/retiro: solo aplicable sobre un snapshot válido
+            self._balances[event["a"]] = self._balances.get(event["a"], 0.0) + float(event["d"])
+        else:
+            return
+        self.events += 1
+        self._updated_at = time.monotonic()
+        self._valid = True
+
+    # -----------------------------
+    # LECTURA
+    # -----------------------------
+    def age(self) -> float:
+        """Segundos desde la última actualización (REST o evento)"""
+        return time.monotonic() - self._updated_at
+
+    def _fresh(self, max_age):
+        if self._balances is None or not self._valid:
+            return None
+        if self.streaming:
+            return self._balances
+        if self.age() > (self.ttl if max_age is None else max_age):
+            return None
+        return self._balances
+
+    async def get(self, max_age: float = None) -> dict:
+        """Copia de los balances libres (asset -> float)
+
+        Args:
+            max_age: Edad máxima aceptada en segundos (default: ttl)
+        """
+        balances = self._fresh(max_age)
+        if balances is None:
+            async with self._lock:
+                # otro lector pudo haberlo refrescado mientras esperábamos el lock
+                balances = self._fresh(max_age)
+                if balances is None:
+                    return dict(await self._refresh())
+        self.hits += 1
+        if self.latency is not None:
+            self.latency.record("balances.age", self.age())
+        return dict(balances)
+
+    async def _refresh(self):
+        epoch = self._stream.connections if self._stream is not None else None
+        t0 = time.perf_counter()
+        acct = await self._fetch()
+        self.fetches += 1
+        if self.latency is not None:
+            self.latency.record("balances.fetch", time.perf_counter() - t0)
+        self._balances = {b["asset"]: float(b["free"]) for b in acct.get("balances", [])}
+        self._updated_at = time.monotonic()
+        self._valid = True
+        self._valid_after = float("-inf")
+        self._stream_epoch = epoch
+        return self._balances
+
+    def invalidate(self, after: int = None):
+        """Marca el snapshot como vencido (el próximo get consulta REST salvo
+        que antes llegue un evento de cuenta del stream posterior al fill)
+
+        Args:
+            after: transactTime (ms) de la orden; solo un outboundAccountPosition
+                con u >= after revalida el snapshot. None (ej. la orden falló y no
+                hay hora) = solo un fetch REST lo revalida
+        """
+        self._valid = False
+        self._valid_after = max(self._valid_after, float("inf") if after is None else after)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "age_s": self.age() if self._balances is not None else None,
+            "valid": self._valid,
+            "streaming": self.streaming,
+            "fetches": self.fetches,
+            "hits": self.hits,
+            "events": self.events,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,321 @@
+"""Store columnar en disco para velas históricas
+Una partición por (símbolo, intervalo, mes) con un .npy tipado por columna
+(mismas columnas que KlineStore). Las lecturas usan memory-map y solo abren
+las particiones que tocan el rango pedido, en lugar de parsear un CSV entero.
+
+    data/store/BTCUSDT/5m/2024-01/open_time.npy
+                                  /close.npy ...
+"""
+
+import mmap
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from bot.kline_store import KLINE_COLUMNS
+
+STORE_DIR = os.getenv("CANDLE_STORE_DIR", "data/store")
+
+COLUMN_NAMES = [name for name, _ in KLINE_COLUMNS]
+COLUMN_DTYPES = dict(KLINE_COLUMNS)
+
+# Columnas del CSV de scripts/download_klines.py (mismo orden que la API) -> nombres del store
+CSV_COLUMNS = {
+    "open_time": "open_time", "open": "open", "high": "high", "low": "low", "close": "close",
+    "volume": "volume", "close_time": "close_time", "qav": "quote_asset_volume",
+    "num_trades": "num_trades", "taker_base_vol": "taker_buy_base", "taker_quote_vol": "taker_buy_quote",
+}
+
+
+def to_ms(value) -> int:
+    """ms epoch (UTC) desde int, 'YYYY-MM-DD[ HH:MM]', datetime o Timestamp"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if hasattr(value, "to_datetime64"):
+        value = value.to_datetime64()
+    return int(np.datetime64(value, "ms").astype(np.int64))
+
+
+def format_ms(ms) -> str:
+    """ms epoch -> 'YYYY-MM-DDTHH:MM:SS' (UTC)"""
+    return str(np.datetime64(int(ms), "ms").astype("datetime64[s]"))
+
+
+def month_key(ms) -> str:
+    """ms epoch -> 'YYYY-MM' (nombre de la partición)"""
+    return str(np.datetime64(int(ms), "ms").astype("datetime64[M]"))
+
+
+def _map_npy(path, dtype) -> np.ndarray:
+    """Vista de solo lectura sobre un .npy propio vía mmap
+
+    Equivale a np.load(path, mmap_mode='r') para los archivos que escribe el store
+    (dtype fijo, 1-D, C-order) pero sin parsear el header con ast ni crear un
+    np.memmap: con ~12 columnas x 12 meses eso dominaba la lectura de un año.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(12)
+        if prefix[:6] != b"\x93NUMPY":
+            raise ValueError(f"No es un archivo .npy: {path}")
+        if prefix[6] == 1:
+            offset = 10 + int.from_bytes(prefix[8:10], "little")
+        else:
+            offset = 12 + int.from_bytes(prefix[8:12], "little")
+        if os.fstat(f.fileno()).st_size <= offset:
+            return np.empty(0, dtype=dtype)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return np.frombuffer(buf, dtype=dtype, offset=offset)
+
+
+def _normalize(data) -> dict:
+    """DataFrame / dict / filas crudas de klines -> dict de arrays tipados, ordenado y sin duplicados"""
+    if isinstance(data, list):
+        cols = {name: [row[j] for row in data] for j, name in enumerate(COLUMN_NAMES)}
+    else:
+        cols = {name: data[name] for name in COLUMN_NAMES}
+    out = {}
+    for name, dtype in KLINE_COLUMNS:
+        values = np.asarray(cols[name])
+        if np.issubdtype(values.dtype, np.datetime64):
+            values = values.astype("datetime64[ms]").astype(np.int64)
+        out[name] = values.astype(dtype)  # las filas crudas de la API traen precios como str
+    return _dedupe(out)
+
+
+def _dedupe(cols: dict) -> dict:
+    """Ordena por open_time; ante open_time repetido gana la última fila"""
+    ot = cols["open_time"]
+    order = np.argsort(ot, kind="stable")
+    ot = ot[order]
+    keep = np.ones(len(ot), dtype=bool)
+    keep[:-1] = ot[1:] != ot[:-1]
+    idx = order[keep]
+    return {name: arr[idx] for name, arr in cols.items()}
+
+
+class CandleStore:
+    """Velas por símbolo/intervalo en particiones mensuales de columnas .npy"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / symbol.upper() / interval
+
+    def partitions(self, symbol: str, interval: str) -> list:
+        """Meses con datos ('YYYY-MM'), ordenados"""
+        base = self._dir(symbol, interval)
+        if not base.is_dir():
+            return []
+        return sorted(p.name for p in base.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    def _open(self, symbol, interval, key, columns):
+        part = self._dir(symbol, interval) / key
+        return {name: _map_npy(part / f"{name}.npy", COLUMN_DTYPES[name]) for name in columns}
+
+    # -----------------------------
+    # ESCRITURA
+    # -----------------------------
+    def _write_partition(self, symbol, interval, key, cols):
+        """Escribe la partición completa en un directorio temporal y la reemplaza"""
+        base = self._dir(symbol, interval)
+        base.mkdir(parents=True, exist_ok=True)
+        final = base / key
+        tmp = base / f".{key}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        for name in COLUMN_NAMES:
+            np.save(tmp / f"{name}.npy", cols[name])
+        if final.exists():
+            old = base / f".{key}.old-{os.getpid()}"
+            os.replace(final, old)
+            os.replace(tmp, final)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, final)
+
+    def write(self, symbol: str, interval: str, data) -> int:
+        """Agrega / reemplaza velas (por open_time) y reescribe solo los meses afectados
+
+        Args:
+            data: DataFrame o dict con las columnas del store (open_time en ms o datetime),
+                  o filas crudas de GET /api/v3/klines
+
+        Returns:
+            Velas recibidas (ya sin duplicados)
+        """
+        cols = _normalize(data)
+        if not len(cols["open_time"]):
+            return 0
+        months = np.asarray(cols["open_time"]).astype("datetime64[ms]").astype("datetime64[M]")
+        existing = set(self.partitions(symbol, interval))
+        for month in np.unique(months):
+            key = str(month)
+            mask = months == month
+            part = {name: arr[mask] for name, arr in cols.items()}
+            if key in existing:
+                old = self._open(symbol, interval, key, COLUMN_NAMES)
+                part = _dedupe({name: np.concatenate([old[name], part[name]]) for name in COLUMN_NAMES})
+                del old  # soltar el mmap antes de reemplazar la partición
+            self._write_partition(symbol, interval, key, part)
+        return len(cols["open_time"])
+
+    # -----------------------------
+    # LECTURA
+    # -----------------------------
+    def read_arrays(self, symbol: str, interval: str, start=None, end=None, columns=None) -> dict:
+        """dict columna -> array del rango [start, end] (ambos inclusive, sobre open_time)
+
+        Solo se abren las particiones de los meses del rango; dentro de cada una
+        el recorte se hace con búsqueda binaria sobre open_time (memory-map).
+        """
+        columns = list(columns or COLUMN_NAMES)
+        start_ms = to_ms(start) if start is not None else None
+        end_ms = to_ms(end) if end is not None else None
+        first = month_key(start_ms) if start_ms is not None else None
+        last = month_key(end_ms) if end_ms is not None else None
+
+        chunks = {name: [] for name in columns}
+        for key in self.partitions(symbol, interval):
+            if (first and key < first) or (last and key > last):
+                continue
+            ot = _map_npy(self._dir(symbol, interval) / key / "open_time.npy", np.int64)
+            a = int(np.searchsorted(ot, start_ms, "left")) if start_ms is not None else 0
+            b = int(np.searchsorted(ot, end_ms, "right")) if end_ms is not None else len(ot)
+            if a >= b:
+                continue
+            part = self._open(symbol, interval, key, columns)
+            for name in columns:
+                chunks[name].append(part[name][a:b])
+
+        out = {}
+        for name in columns:
+            parts = chunks[name]
+            if len(parts) == 1:
+                out[name] = parts[0]  # vista sobre el memmap, sin copia
+            elif parts:
+                out[name] = np.concatenate(parts)
+            else:
+                out[name] = np.empty(0, dtype=COLUMN_DTYPES[name])
+        return out
+
+    def read(self, symbol: str, interval: str, start=None, end=None, columns=None):
+        """DataFrame del rango (open_time como datetime64[ms], índice 0..n-1)"""
+        import pandas as pd  # solo quien pide DataFrames paga el import
+
+        arrays = self.read_arrays(symbol, interval, start, end, columns)
+        for name, arr in arrays.items():
+            if name == "open_time":
+                arrays[name] = arr.astype("datetime64[ms]")
+            elif not arr.flags.writeable:
+                arrays[name] = arr.copy()  # las vistas del mmap son de solo lectura
+        # un bloque por columna: sin consolidar (copiar) todo en una matriz 2-D
+        return pd.DataFrame(arrays, copy=False)
+
+    # -----------------------------
+    # CONTINUIDAD
+    # -----------------------------
+    def check(self, symbol: str, interval: str, step_ms: int) -> dict:
+        """Verifica que open_time avance de a un intervalo
+
+        Returns:
+            {"rows": n, "duplicates": filas con open_time repetido,
+             "gaps": [(primer faltante, último faltante)] en ms}
+        """
+        ot = self.read_arrays(symbol, interval, columns=["open_time"])["open_time"]
+        unique = np.unique(ot)
+        idx = np.flatnonzero(np.diff(unique) > step_ms)
+        return {
+            "rows": len(ot),
+            "duplicates": len(ot) - len(unique),
+            "gaps": [(int(unique[i]) + step_ms, int(unique[i + 1]) - step_ms) for i in idx],
+        }
+
+    def dedupe(self, symbol: str, interval: str) -> int:
+        """Reescribe ordenadas y sin duplicados las particiones que lo necesiten
+
+        Returns:
+            Filas eliminadas
+        """
+        removed = 0
+        for key in self.partitions(symbol, interval):
+            cols = self._open(symbol, interval, key, COLUMN_NAMES)
+            if (np.diff(cols["open_time"]) > 0).all():
+                continue
+            fixed = _dedupe({name: np.array(arr) for name, arr in cols.items()})
+            del cols
+            removed += self._count(symbol, interval, key) - len(fixed["open_time"])
+            self._write_partition(symbol, interval, key, fixed)
+        return removed
+
+    def _count(self, symbol, interval, key):
+        return len(_map_npy(self._dir(symbol, interval) / key / "open_time.npy", np.int64))
+
+    def first_open_time(self, symbol: str, interval: str):
+        """open_time (ms) de la primera vela guardada, o None"""
+        parts = self.partitions(symbol, interval)
+        if not parts:
+            return None
+        ot = _map_npy(self._dir(symbol, interval) / parts[0] / "open_time.npy", np.int64)
+        return int(ot[0]) if len(ot) else None
+
+    def last_open_time(self, symbol: str, interval: str):
+        """open_time (ms) de la última vela guardada, o None"""
+        parts = self.partitions(symbol, interval)
+        if not parts:
+            return None
+        ot = _map_npy(self._dir(symbol, interval) / parts[-1] / "open_time.npy", np.int64)
+        return int(ot[-1]) if len(ot) else None
+
+    def head_checked_from(self, symbol: str, interval: str):
+        """Inicio (ms) más temprano ya verificado contra el exchange: entre él y la
+        primera vela guardada el exchange no tiene datos (ver download_range), o None"""
+        try:
+            return int((self._dir(symbol, interval) / ".head_checked").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def mark_head_checked(self, symbol: str, interval: str, start_ms: int):
+        base = self._dir(symbol, interval)
+        base.mkdir(parents=True, exist_ok=True)
+        tmp = base / ".head_checked.tmp"
+        tmp.write_text(str(int(start_ms)))
+        os.replace(tmp, base / ".head_checked")
+
+
+def migrate_csv(csv_path, store: CandleStore, symbol: str, interval: str) -> int:
+    """Importa un CSV de scripts/download_klines.py (open_time en ms) al store"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    df = df.rename(columns=CSV_COLUMNS)
+    if not np.issubdtype(df["open_time"].dtype, np.integer):
+        df["open_time"] = pd.to_datetime(df["open_time"])
+    return store.write(symbol, interval, df)
+
+
+def is_store_path(path) -> bool:
+    """True si --data apunta al store (directorio) y no a un CSV"""
+    return not str(path).endswith(".csv")
+
+
+def load_candles(path, symbol: str, interval: str, start=None, end=None):
+    """Velas desde el store o desde un CSV legado, con open_time como datetime
+
+    Mismo filtro de fechas que backtester.load_historical_data (ambos extremos inclusive).
+    """
+    if is_store_path(path):
+        return CandleStore(path).read(symbol, interval, start, end)
+
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if "open_time" in df.columns:
+        df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
+        if start:
+            df = df[df["open_time"] >= start]
+        if end:
+            df = df[df["open_time"] <= end]
+    return df
@@ -1,7 +1,7 @@
-from binance.spot import Spot as BinanceClient
-import pandas as pd
 import os
 from datetime import datetime
+from bot.rate_limit import LIMITER, endpoint_weight
+from bot.kline_store import KlineStore
 
 MODE = os.getenv("MODE", "dev")
 API_SECRET = (
@@ -14,34 +14,57 @@ API_KEY = (
 )
 TESTNET_URL = "https://testnet.binance.vision"
 
-if MODE == "dev":
-    client = BinanceClient(API_KEY, API_SECRET, base_url=TESTNET_URL)
-else:
-    client = BinanceClient(API_KEY, API_SECRET)
+_client = None
+
+
+def get_client():
+    """Cliente del SDK, creado (e importado) en el primer request"""
+    global _client
+    if _client is None:
+        from bot.exchange import load_sdk
+
+        BinanceClient = load_sdk()
+        # show_limit_usage: el SDK devuelve los headers X-MBX-USED-WEIGHT-* junto a los datos
+        if MODE == "dev":
+            _client = BinanceClient(API_KEY, API_SECRET, base_url=TESTNET_URL, show_limit_usage=True)
+        else:
+            _client = BinanceClient(API_KEY, API_SECRET, show_limit_usage=True)
+    return _client
+
+
+# (symbol, interval) -> KlineStore
+_stores = {}
+
+
+def fetch_klines(symbol, interval, **params):
+    """GET /api/v3/klines (filas crudas) respetando el rate limiter del proceso"""
+    LIMITER.wait_sync(endpoint_weight("GET", "/api/v3/klines"))
+    try:
+        response = get_client().klines(symbol=symbol, interval=interval, **params)
+    except Exception as e:
+        LIMITER.observe(getattr(e, "status_code", None), getattr(e, "header", None))
+        raise
+    LIMITER.update(response["limit_usage"])
+    return response["data"]
+
+
+def get_kline_store(symbol="BTCUSDT", interval="5m", capacity=500):
+    """Store incremental compartido para (symbol, interval)"""
+    key = (symbol, interval)
+    store = _stores.get(key)
+    if store is None or store.capacity < capacity:
+        store = KlineStore(symbol, interval, capacity=capacity, fetch=fetch_klines)
+        _stores[key] = store
+    return store
 
 
 def get_latest_klines(symbol="BTCUSDT", interval="5m", limit=500):
-    # Llamar al método correcto
-    response = client.klines(symbol=symbol, interval=interval, limit=limit)
-    df = pd.DataFrame(
-        response,
-        columns=[
-            "open_time",
-            "open",
-            "high",
-            "low",
-            "close",
-            "volume",
-            "close_time",
-            "quote_asset_volume",
-            "num_trades",
-            "taker_buy_base",
-            "taker_buy_quote",
-            "ignore",
-        ],
-    )
-    # convertir columnas numéricas
-    for col in ["open", "high", "low", "close", "volume"]:
-        df[col] = df[col].astype(float)
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-    return df
+    """Últimas `limit` velas como DataFrame.
+
+    La primera llamada hace el backfill; las siguientes solo traen las velas
+    nuevas (normalmente 1-2) y el DataFrame es una vista sin copia del store:
+    no modificarlo y copiarlo si se guarda entre ticks.
+    """
+    store = get_kline_store(symbol, interval, capacity=limit)
+    store.update()
+    return store.frame(last=limit)
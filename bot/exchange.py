@@ -1,20 +1,16 @@
 # === file: exchange.py ===
 import os
 import asyncio
-import math
-from decimal import Decimal, getcontext, ROUND_UP
+import inspect
+from decimal import getcontext
 from dotenv import load_dotenv
+from bot.symbol_info import SymbolRegistry, is_filter_error
+from bot.balances import BalanceCache, order_time
+from bot.rate_limit import LIMITER, SDK_METHOD_ENDPOINTS, endpoint_weight
+from bot.metrics import LatencyStats, PhaseTimer
 
 load_dotenv()
 
-try:
-    # SDK oficial reciente de Binance
-    from binance.spot import Spot as BinanceClient
-except ImportError as e:
-    raise RuntimeError(
-        "Binance SDK no encontrado. Instalá con: pip install binance-connector"
-    ) from e
-
 # -----------------------------
 # CONFIGURACIÓN GLOBAL
 # -----------------------------
@@ -28,6 +24,10 @@ API_KEY = (
     os.getenv("BINANCE_API_KEY_DEV") if MODE == "dev" else os.getenv("BINANCE_API_KEY")
 )
 TESTNET_URL = "https://testnet.binance.vision"
+MAINNET_URL = "https://api.binance.com"
+
+# Backend REST: "aiohttp" (async nativo, sesión keep-alive) o "sdk" (binance-connector en thread pool)
+EXCHANGE_TRANSPORT = os.getenv("EXCHANGE_TRANSPORT", "aiohttp").lower()
 
 # Parámetros ajustables por environment
 TRADE_PERCENT = float(os.getenv("TRADE_PERCENT", 0.01))  # 1% por defecto
@@ -39,40 +39,211 @@ USE_MAKER_ORDERS = os.getenv("USE_MAKER_ORDERS", "true").lower() == "true"
 MAKER_WAIT_SECONDS = float(os.getenv("MAKER_WAIT_SECONDS", 5.0))
 MAKER_PRICE_OFFSET = float(os.getenv("MAKER_PRICE_OFFSET", 0.0005))  # 0.05% mejor que mercado
 
-# Aumentar precisión decimal para cálculos con Decimal
+# Precisión decimal para el path exacto del cuantizador (ver bot/quantizer.py)
 getcontext().prec = 28
 
 
+def load_sdk():
+    """Importa el SDK oficial recién cuando se necesita (backtests y tests no lo requieren)"""
+    try:
+        from binance.spot import Spot as BinanceClient
+    except ImportError as e:
+        raise RuntimeError(
+            "Binance SDK no encontrado. Instalá con: pip install binance-connector"
+        ) from e
+    return BinanceClient
+
+
+def build_client(transport=None, base_url=None):
+    """Crea el cliente REST según EXCHANGE_TRANSPORT (o `transport`)"""
+    transport = (transport or EXCHANGE_TRANSPORT).lower()
+    base_url = base_url or (TESTNET_URL if MODE == "dev" else MAINNET_URL)
+    if transport == "aiohttp":
+        from bot.transport import AsyncSpotClient
+
+        return AsyncSpotClient(API_KEY, API_SECRET, base_url=base_url)
+    if transport == "sdk":
+        # show_limit_usage: cada respuesta trae los headers X-MBX-USED-WEIGHT-* (ver _call_sync)
+        return load_sdk()(API_KEY, API_SECRET, base_url=base_url, show_limit_usage=True)
+    raise ValueError(f"EXCHANGE_TRANSPORT inválido: {transport!r} (usar 'aiohttp' o 'sdk')")
+
+
 class Exchange:
-    def __init__(self, dry="off"):
+    def __init__(self, dry="off", client=None):
         """
         dry puede ser:
             - "off": ejecutar órdenes reales
             - "log": solo imprimir
             - "sim": simulación sin enviar órdenes
+        client: cliente REST ya construido (por defecto build_client())
         """
         self.dry = dry
         self.entry_prices = {}
-
-        if MODE == "dev":
-            self.client = BinanceClient(API_KEY, API_SECRET, base_url=TESTNET_URL)
-        else:
-            self.client = BinanceClient(API_KEY, API_SECRET)
+        self._client = client
+
+        # filtros de símbolos compartidos por todos los métodos (ver load_symbols)
+        self.symbols = SymbolRegistry(self._fetch_exchange_info)
+        # latencias por fase de cada orden (prepare / quantize / place / fill)
+        self.latency = LatencyStats()
+        # stream de ejecuciones (ver start_user_stream); None = esperar y consultar por REST
+        self.user_stream = None
+        # balances compartidos por runner/monitor/órdenes (un GET account por snapshot)
+        self.balances = BalanceCache(self._fetch_account, latency=self.latency)
+
+    @property
+    def client(self):
+        """Cliente REST; se construye en el primer uso (no al crear el Exchange)"""
+        if self._client is None:
+            self._client = build_client()
+        return self._client
 
     async def _run(self, func, *args, **kwargs):
-        """Ejecuta funciones del cliente en un thread async-safe."""
+        """Ejecuta funciones del cliente: await directo si es async (AsyncSpotClient),
+        o en un thread async-safe si es el SDK sincrónico."""
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+        return await loop.run_in_executor(None, lambda: self._call_sync(func, *args, **kwargs))
+
+    @staticmethod
+    def _call_sync(func, *args, **kwargs):
+        """Llamada al SDK sincrónico (en thread) respetando el rate limiter del proceso
+
+        Con show_limit_usage el SDK devuelve {"limit_usage", "data"}: el peso
+        usado se pasa al limiter en cada respuesta y se devuelve solo "data".
+        """
+        name = getattr(func, "__name__", "")
+        method, path = SDK_METHOD_ENDPOINTS.get(name, ("GET", ""))
+        LIMITER.wait_sync(endpoint_weight(method, path, kwargs), orders=1 if name == "new_order" else 0)
+        try:
+            response = func(*args, **kwargs)
+        except Exception as e:
+            LIMITER.observe(getattr(e, "status_code", None), getattr(e, "header", None))
+            raise
+        if isinstance(response, dict) and "limit_usage" in response and "data" in response:
+            LIMITER.update(response["limit_usage"])
+            return response["data"]
+        return response
+
+    async def start_user_stream(self, ws_url=None):
+        """Abre el user data stream para detectar fills de órdenes LIMIT al instante"""
+        from bot.user_stream import UserDataStream
+
+        self.user_stream = await UserDataStream(self, ws_url=ws_url).start()
+        self.balances.attach(self.user_stream)
+        return self.user_stream
+
+    async def close(self):
+        """Cierra el user stream y libera las conexiones del cliente REST"""
+        if self.user_stream is not None:
+            await self.user_stream.stop()
+            self.user_stream = None
+        if self._client is None:
+            return
+        close = getattr(self._client, "close", None)
+        if close is not None and inspect.iscoroutinefunction(close):
+            await close()
+
+    # -----------------------------
+    # METADATA DE SÍMBOLOS
+    # -----------------------------
+    async def _fetch_exchange_info(self, symbols):
+        if len(symbols) == 1:
+            return await self._run(self.client.exchange_info, symbol=symbols[0])
+        return await self._run(self.client.exchange_info, symbols=symbols)
+
+    async def load_symbols(self, symbols):
+        """Precarga los filtros de los símbolos operados (llamar una vez al inicio)"""
+        return await self.symbols.load(symbols)
+
+    # -----------------------------
+    # PREPARACIÓN DE ÓRDENES
+    # -----------------------------
+    async def _ticker_price(self, symbol):
+        pr = await self._run(self.client.ticker_price, symbol)
+        return float(pr["price"]) if isinstance(pr, dict) else float(pr)
+
+    async def _prepare_order(self, symbol):
+        """Balances, precio y cuantizador en paralelo: un RTT en lugar de tres.
+
+        Si alguna consulta falla se cancelan las demás y se re-lanza el primer error.
+        Retorna (balances, price, quantizer).
+        """
+        tasks = [
+            asyncio.ensure_future(self.get_balances()),
+            asyncio.ensure_future(self._ticker_price(symbol)),
+            asyncio.ensure_future(self.symbols.quantizer(symbol)),
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _place_order(self, **params):
+        """new_order + invalidación del cache de balances (incluso si falla:
+        un timeout no garantiza que la orden no haya llegado al exchange)"""
+        order = None
+        try:
+            order = await self._run(self.client.new_order, **params)
+            return order
+        finally:
+            self.balances.invalidate(after=order_time(order))
+
+    async def _wait_limit_order(self, symbol, order_id):
+        """Espera el fill de una orden LIMIT hasta MAKER_WAIT_SECONDS.
+
+        Con user stream retorna apenas llega el fill; sin stream duerme y consulta.
+        Si vence sin llenarse la cancela. Retorna el último estado de la orden
+        (en caso de cancel, executedQty/cummulativeQuoteQty indican lo ya llenado).
+        """
+        status = None
+        try:
+            status = await self._wait_or_cancel(symbol, order_id)
+            return status
+        finally:
+            # fill (total o parcial) o cancel: los balances libres cambiaron
+            self.balances.invalidate(after=order_time(status))
+
+    async def _wait_or_cancel(self, symbol, order_id):
+        status = None
+        if self.user_stream is not None:
+            status = await self.user_stream.wait_for_fill(order_id, MAKER_WAIT_SECONDS)
+        else:
+            await asyncio.sleep(MAKER_WAIT_SECONDS)
+
+        if status is None or status["status"] != "FILLED":
+            # confirmar por REST: el stream pudo perder eventos durante una reconexión
+            status = await self._run(self.client.get_order, symbol=symbol, orderId=order_id)
+        if status["status"] in ("FILLED", "CANCELED", "REJECTED", "EXPIRED"):
+            return status
+
+        try:
+            return await self._run(self.client.cancel_order, symbol=symbol, orderId=order_id)
+        except Exception as e:
+            # típicamente -2011: se llenó entre el último chequeo y el cancel
+            print(f"[WARN] cancel_order {order_id} falló ({e}), re-consultando estado")
+            return await self._run(self.client.get_order, symbol=symbol, orderId=order_id)
 
     # -----------------------------
     # BALANCES
     # -----------------------------
-    async def get_balances(self):
-        acct = await self._run(self.client.account)
-        bal = {b["asset"]: float(b["free"]) for b in acct.get("balances", [])}
+    async def _fetch_account(self):
+        return await self._run(self.client.account)
+
+    async def get_balances(self, max_age: float = None):
+        """Balances libres desde el cache compartido (ver bot/balances.py)
+
+        Args:
+            max_age: Edad máxima aceptada en segundos (default BALANCE_CACHE_TTL)
+        """
+        bal = await self.balances.get(max_age)
         return {
             "USDT": bal.get("USDT", 0.0),
             "BTC": bal.get("BTC", 0.0),
+            **bal,
         }
 
     # -----------------------------
@@ -128,9 +299,8 @@ class Exchange:
                     )
 
             # Verificar min_notional del símbolo
-            info = await self._run(self.client.exchange_info, symbol=symbol)
-            filters = {f["filterType"]: f for f in info["symbols"][0]["filters"]}
-            min_notional = float(filters["NOTIONAL"]["minNotional"])
+            sf = await self.symbols.get(symbol)
+            min_notional = sf.min_notional
 
             if chosen < min_notional:
                 return None, (
@@ -158,105 +328,61 @@ class Exchange:
         Ajusta automáticamente al stepSize, asegura min_notional,
         y no realiza la compra si no es posible respetar las reglas sin exceder saldo.
         """
+        timer = PhaseTimer(f"market_buy {symbol}", self.latency)
         try:
-            # Si no se pasó monto, calcularlo centralizadamente
+            # saldo real, precio actual y filtros del símbolo en paralelo
+            bals, price, q = await self._prepare_order(symbol)
+            usdt_balance = bals.get("USDT", 0.0)
+            min_notional = q.min_notional
+            timer.mark("prepare")
+
+            # Si no se pasó monto, calcularlo centralizadamente (con el saldo ya obtenido)
             if usdt_amount is None:
-                usdt_amount, reason = await self.compute_buy_usdt(symbol=symbol)
+                usdt_amount, reason = await self.compute_buy_usdt(
+                    symbol=symbol, usdt_balance=usdt_balance
+                )
                 if usdt_amount is None:
                     print(f"[SKIP] market_buy: {reason}")
                     return None
 
-            # obtener saldo real de USDT para no pasarnos (y evitar circularidad con compute)
-            bals = await self.get_balances()
-            usdt_balance = bals.get("USDT", 0.0)
-
             if usdt_amount > usdt_balance:
                 print(
                     f"[SKIP] market_buy: candidate {usdt_amount:.2f} > USDT disponible {usdt_balance:.2f}"
                 )
                 return None
 
-            # precio actual
-            pr = await self._run(self.client.ticker_price, symbol)
-            price = float(pr["price"]) if isinstance(pr, dict) else float(pr)
-
-            # filtros del símbolo
-            info = await self._run(self.client.exchange_info, symbol=symbol)
-            filters = {f["filterType"]: f for f in info["symbols"][0]["filters"]}
-            step_size_str = filters["LOT_SIZE"]["stepSize"]
-            step_size = Decimal(step_size_str)
-            min_notional = float(filters["NOTIONAL"]["minNotional"])
-
             # aplicar safety margin al monto que intentaremos usar para crear qty,
-            # pero NO podemos exceder el balance real.
-            usdt_with_margin = Decimal(str(usdt_amount)) * Decimal(str(SAFETY_MARGIN))
-            usdt_with_margin = min(usdt_with_margin, Decimal(str(usdt_balance)))
-
-            # calcular qty en Decimal para evitar errores de float
-            price_d = Decimal(str(price))
-            qty = usdt_with_margin / price_d
-
-            # ajustar qty al múltiplo de step_size (floor)
-            qty_adjusted = (qty // step_size) * step_size
+            # pero NO podemos exceder el balance real. Floor al múltiplo de step_size.
+            qty_units = q.floor_qty_for_quote(
+                usdt_amount, price, margin=SAFETY_MARGIN, cap=usdt_balance
+            )
 
-            # si por redondeo qty_adjusted queda en 0, intentar elevar al step_size mínimo
-            if qty_adjusted <= Decimal("0"):
-                qty_adjusted = step_size
+            # si por redondeo qty queda en 0, intentar elevar al step_size mínimo
+            if qty_units <= 0:
+                qty_units = q.step_units
 
-            # formatear cantidad según step_size decimal places
-            if "." in step_size_str:
-                step_decimals = len(step_size_str.rstrip("0").split(".")[1])
-            else:
-                step_decimals = 0
-
-            # asegurar que qty_adjusted no exceda lo que compraremos con usdt_balance
-            # (caso borde por min_notional ajuste)
-            # calcular order_value actual
-            qty_str = format(
-                qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f"
-            )
-            if "." in qty_str:
-                qty_str = qty_str.rstrip("0").rstrip(".")
-            order_value = float(Decimal(qty_str) * price_d)
+            order_value = q.notional(qty_units, price)
 
             # si el valor está por debajo del min_notional, forzar al mínimo requerido
             if order_value < min_notional:
-                min_qty = Decimal(str(min_notional)) / price_d
-                times = (min_qty / step_size).to_integral_value(rounding=ROUND_UP)
-                qty_adjusted = times * step_size
-
-                qty_str = format(
-                    qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f"
-                )
-                if "." in qty_str:
-                    qty_str = qty_str.rstrip("0").rstrip(".")
-                order_value = float(Decimal(qty_str) * price_d)
-
+                qty_units = q.min_notional_qty(price)
+                order_value = q.notional(qty_units, price)
                 print(
-                    f"[WARN] Ajustado a min_notional: qty={qty_str} (≈{order_value:.2f} USDT)"
+                    f"[WARN] Ajustado a min_notional: qty={q.render_qty(qty_units)} (≈{order_value:.2f} USDT)"
                 )
 
             # finalmente: si el USDT requerido para esta qty excede el balance -> recortar hacia abajo
-            usdt_needed = Decimal(qty_str) * price_d
-            if usdt_needed > Decimal(str(usdt_balance)):
+            if order_value > usdt_balance:
                 # recortar al máximo que se puede comprar con el saldo disponible
-                max_qty = (
-                    (Decimal(str(usdt_balance)) / price_d) // step_size * step_size
-                )
-                if max_qty <= Decimal("0"):
+                qty_units = q.floor_qty_for_quote(usdt_balance, price)
+                if qty_units <= 0:
                     print(
                         f"[SKIP] No hay suficiente balance para comprar la mínima cantidad (step_size)."
                     )
                     return None
-                qty_adjusted = max_qty
-                qty_str = format(
-                    qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f"
-                )
-                if "." in qty_str:
-                    qty_str = qty_str.rstrip("0").rstrip(".")
-                order_value = float(Decimal(qty_str) * price_d)
+                order_value = q.notional(qty_units, price)
                 print(
-                    f"[INFO] Recortado qty por saldo: qty={qty_str} (≈{order_value:.2f} USDT)"
+                    f"[INFO] Recortado qty por saldo: qty={q.render_qty(qty_units)} (≈{order_value:.2f} USDT)"
                 )
 
             # último chequeo min_notional
@@ -266,8 +392,10 @@ class Exchange:
                 )
                 return None
 
+            qty_str = q.render_qty(qty_units)
+            timer.mark("quantize")
             print(
-                f"[INFO] BUY -> qty={qty_str} (≈{order_value:.2f} USDT) step_size={step_size_str}"
+                f"[INFO] BUY -> qty={qty_str} (≈{order_value:.2f} USDT) step_size={q.filters.step_size_str}"
             )
 
             # dry run
@@ -275,16 +403,18 @@ class Exchange:
                 print(
                     f"[DRY-{self.dry.upper()}] Simulated BUY for {symbol} qty={qty_str} value≈{order_value:.2f} USDT"
                 )
+                print(timer.report())
                 return None
 
             # Ejecutar orden real (usando quantity).
-            order = await self._run(
-                self.client.new_order,
+            order = await self._place_order(
                 symbol=symbol,
                 side="BUY",
                 type="MARKET",
                 quantity=qty_str,
             )
+            timer.mark("place")
+            print(timer.report())
 
             print(f"[TRADE] Market BUY executed: {order}")
             # Solo guardar entry price si la orden fue exitosa
@@ -296,6 +426,8 @@ class Exchange:
 
         except Exception as e:
             print(f"[ERROR] market_buy failed: {e}")
+            if is_filter_error(e):
+                self.symbols.invalidate(symbol)
             return None
 
     # -----------------------------
@@ -307,94 +439,73 @@ class Exchange:
         Ajusta automáticamente la cantidad al mínimo permitido y usa
         todo el balance si se pide más del disponible (para asegurar ejecución).
         """
+        timer = PhaseTimer(f"market_sell {symbol}", self.latency)
         try:
-            # obtener precio actual
-            pr = await self._run(self.client.ticker_price, symbol)
-            price = float(pr["price"]) if isinstance(pr, dict) else float(pr)
-
-            # Obtener filtros del exchange info
-            info = await self._run(self.client.exchange_info, symbol=symbol)
-            filters = {f["filterType"]: f for f in info["symbols"][0]["filters"]}
-            step_size_str = filters["LOT_SIZE"]["stepSize"]
-            step_size = Decimal(step_size_str)
-            min_notional = float(filters["NOTIONAL"]["minNotional"])
-
-            # obtener balance real de la moneda base (ej. BTC)
-            bals = await self.get_balances()
-            base_asset = symbol.replace("USDT", "")
-            available_qty = Decimal(str(bals.get(base_asset, 0.0)))
+            # balance real, precio actual y filtros del símbolo en paralelo
+            bals, price, q = await self._prepare_order(symbol)
+            min_notional = q.min_notional
+            timer.mark("prepare")
 
-            qty_d = Decimal(str(qty))
+            # balance real de la moneda base (ej. BTC)
+            base_asset = symbol.replace("USDT", "")
+            available_qty = bals.get(base_asset, 0.0)
+            available_units = q.floor_qty(available_qty)
 
             # si piden vender más de lo disponible, usar lo disponible
-            if qty_d > available_qty:
-                qty_d = available_qty
+            if qty > available_qty:
+                qty = available_qty
 
             # ajustar cantidad al múltiplo del step_size (floor)
-            qty_adjusted = (qty_d // step_size) * step_size
+            qty_units = q.floor_qty(qty)
 
             # si tras floor queda 0, intentar usar step_size si hay suficiente balance
-            if qty_adjusted <= Decimal("0"):
-                if available_qty >= step_size:
-                    qty_adjusted = step_size
+            if qty_units <= 0:
+                if available_units >= q.step_units:
+                    qty_units = q.step_units
                 else:
                     print(
                         f"[SKIP] No hay suficiente {base_asset} para vender la mínima cantidad (step_size)."
                     )
                     return None
 
-            # formatear qty
-            if "." in step_size_str:
-                step_decimals = len(step_size_str.rstrip("0").split(".")[1])
-            else:
-                step_decimals = 0
-
-            qty_str = format(
-                qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f"
-            )
-            if "." in qty_str:
-                qty_str = qty_str.rstrip("0").rstrip(".")
-
-            order_value = float(qty_adjusted * Decimal(str(price)))
+            order_value = q.notional(qty_units, price)
 
             # Si el valor total < min_notional, intentar elevar qty al mínimo notional
             if order_value < min_notional:
-                min_qty = Decimal(str(min_notional)) / Decimal(str(price))
-                times = (min_qty / step_size).to_integral_value(rounding=ROUND_UP)
-                needed_qty = times * step_size
+                needed_units = q.min_notional_qty(price)
 
                 # si no tenemos suficiente balance para el needed_qty -> skip
-                if needed_qty > available_qty:
+                if needed_units > available_units:
                     print(
-                        f"[SKIP] Necesitaríamos {needed_qty} {base_asset} para alcanzar min_notional, disponible {available_qty}."
+                        f"[SKIP] Necesitaríamos {q.render_qty(needed_units)} {base_asset} para alcanzar min_notional, disponible {available_qty}."
                     )
                     return None
 
-                qty_adjusted = needed_qty
-                qty_str = format(
-                    qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f"
-                )
-                if "." in qty_str:
-                    qty_str = qty_str.rstrip("0").rstrip(".")
-                order_value = float(qty_adjusted * Decimal(str(price)))
+                qty_units = needed_units
+                order_value = q.notional(qty_units, price)
                 print(
-                    f"[WARN] SELL ajustado a min_notional: qty={qty_str} (≈{order_value:.2f} USDT)"
+                    f"[WARN] SELL ajustado a min_notional: qty={q.render_qty(qty_units)} (≈{order_value:.2f} USDT)"
                 )
 
+            qty_str = q.render_qty(qty_units)
+            timer.mark("quantize")
+
             # dry run
             if self.dry in ["log", "sim"]:
                 print(
                     f"[DRY-{self.dry.upper()}] Simulated SELL for {symbol} qty={qty_str} value≈{order_value:.2f} USDT"
                 )
+                print(timer.report())
                 return None
 
-            order = await self._run(
-                self.client.new_order,
+            order = await self._place_order(
                 symbol=symbol,
                 side="SELL",
                 type="MARKET",
-                quantity=str(qty_adjusted),
+                quantity=qty_str,
             )
+            timer.mark("place")
+            print(timer.report())
 
             print(f"[TRADE] Market SELL executed: {order}")
             # Solo limpiar entry price si la orden fue exitosa
@@ -406,6 +517,8 @@ class Exchange:
 
         except Exception as e:
             print(f"[ERROR] market_sell failed: {e}")
+            if is_filter_error(e):
+                self.symbols.invalidate(symbol)
             return None
 
     
@@ -417,92 +530,88 @@ class Exchange:
         if not USE_MAKER_ORDERS:
             return await self.market_buy(symbol, usdt_amount)
         
+        timer = PhaseTimer(f"limit_buy {symbol}", self.latency)
         try:
+            # saldo, precio actual y filtros en paralelo
+            bals, market_price, q = await self._prepare_order(symbol)
+            usdt_balance = bals.get("USDT", 0.0)
+            timer.mark("prepare")
+            
             if usdt_amount is None:
-                usdt_amount, reason = await self.compute_buy_usdt(symbol=symbol)
+                usdt_amount, reason = await self.compute_buy_usdt(
+                    symbol=symbol, usdt_balance=usdt_balance
+                )
                 if usdt_amount is None:
                     print(f"[SKIP] limit_buy: {reason}")
                     return None
             
-            # Precio actual y precio limit (0.05% mejor para ser maker)
-            pr = await self._run(self.client.ticker_price, symbol)
-            market_price = float(pr["price"]) if isinstance(pr, dict) else float(pr)
+            # Precio limit (0.05% mejor para ser maker)
             limit_price = market_price * (1 - MAKER_PRICE_OFFSET)
             
             # Calcular qty igual que market_buy
-            bals = await self.get_balances()
-            usdt_balance = bals.get("USDT", 0.0)
             if usdt_amount > usdt_balance:
                 print(f"[SKIP] limit_buy: {usdt_amount:.2f} > balance {usdt_balance:.2f}")
                 return None
             
-            info = await self._run(self.client.exchange_info, symbol=symbol)
-            filters = {f["filterType"]: f for f in info["symbols"][0]["filters"]}
-            step_size_str = filters["LOT_SIZE"]["stepSize"]
-            step_size = Decimal(step_size_str)
-            price_filter = filters["PRICE_FILTER"]
-            tick_size = Decimal(price_filter["tickSize"])
-            
             # Ajustar limit_price al tick_size
-            limit_price_d = Decimal(str(limit_price))
-            limit_price_d = (limit_price_d // tick_size) * tick_size
-            limit_price = float(limit_price_d)
+            price_units = q.floor_price(limit_price)
+            limit_price = q.price_float(price_units)
             
-            usdt_with_margin = Decimal(str(usdt_amount)) * Decimal(str(SAFETY_MARGIN))
-            usdt_with_margin = min(usdt_with_margin, Decimal(str(usdt_balance)))
-            qty = usdt_with_margin / Decimal(str(limit_price))
-            qty_adjusted = (qty // step_size) * step_size
-            
-            if qty_adjusted <= Decimal("0"):
-                qty_adjusted = step_size
+            qty_units = q.floor_qty_for_quote(
+                usdt_amount, limit_price, margin=SAFETY_MARGIN, cap=usdt_balance
+            )
             
-            if "." in step_size_str:
-                step_decimals = len(step_size_str.rstrip("0").split(".")[1])
-            else:
-                step_decimals = 0
+            if qty_units <= 0:
+                qty_units = q.step_units
             
-            qty_str = format(qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f")
-            if "." in qty_str:
-                qty_str = qty_str.rstrip("0").rstrip(".")
+            qty_str = q.render_qty(qty_units)
+            price_str = q.render_price(price_units)
+            timer.mark("quantize")
             
             if self.dry in ["log", "sim"]:
                 print(f"[DRY-{self.dry.upper()}] Simulated LIMIT BUY {symbol} qty={qty_str} price={limit_price:.2f}")
+                print(timer.report())
                 return None
             
             # Enviar orden LIMIT
             print(f"[LIMIT] Colocando BUY {symbol} qty={qty_str} @ ${limit_price:.2f}")
-            order = await self._run(
-                self.client.new_order,
+            order = await self._place_order(
                 symbol=symbol,
                 side="BUY",
                 type="LIMIT",
                 timeInForce="GTC",
                 quantity=qty_str,
-                price=str(limit_price)
+                price=price_str
             )
+            timer.mark("place")
             
-            order_id = order["orderId"]
-            
-            # Esperar MAKER_WAIT_SECONDS
-            await asyncio.sleep(MAKER_WAIT_SECONDS)
-            
-            # Verificar estado
-            status = await self._run(self.client.get_order, symbol=symbol, orderId=order_id)
+            # Esperar el fill (hasta MAKER_WAIT_SECONDS); si no llega se cancela
+            status = await self._wait_limit_order(symbol, order["orderId"])
+            timer.mark("fill")
+            print(timer.report())
             
             if status["status"] == "FILLED":
                 print(f"[LIMIT] BUY ejecutada como MAKER: {order}")
-                if status.get("status") in ["FILLED"]:
-                    self.entry_prices[symbol] = limit_price
-                    print(f"[ENTRY] {symbol} entry_price guardado: ${limit_price:.2f}")
+                self.entry_prices[symbol] = limit_price
+                print(f"[ENTRY] {symbol} entry_price guardado: ${limit_price:.2f}")
                 return order
-            else:
-                # Cancelar y usar MARKET
-                print(f"[LIMIT] Orden no llenada, cancelando y usando MARKET")
-                await self._run(self.client.cancel_order, symbol=symbol, orderId=order_id)
-                return await self.market_buy(symbol, usdt_amount)
+            
+            # Cancelada: comprar a MARKET solo lo que no se llenó
+            filled_usdt = float(status.get("cummulativeQuoteQty") or 0.0)
+            if filled_usdt > 0:
+                self.entry_prices[symbol] = limit_price
+                remaining = usdt_amount - filled_usdt
+                print(f"[LIMIT] BUY parcial: {filled_usdt:.2f} USDT llenados, resto {remaining:.2f} USDT a MARKET")
+                if remaining < q.min_notional:
+                    return status
+                return await self.market_buy(symbol, remaining)
+            print(f"[LIMIT] Orden no llenada, cancelada, usando MARKET")
+            return await self.market_buy(symbol, usdt_amount)
                 
         except Exception as e:
             print(f"[ERROR] limit_buy failed: {e}, fallback a MARKET")
+            if is_filter_error(e):
+                self.symbols.invalidate(symbol)
             return await self.market_buy(symbol, usdt_amount)
     
     async def limit_sell(self, symbol, qty):
@@ -510,88 +619,79 @@ class Exchange:
         if not USE_MAKER_ORDERS:
             return await self.market_sell(symbol, qty)
         
+        timer = PhaseTimer(f"limit_sell {symbol}", self.latency)
         try:
-            # Precio actual y precio limit (0.05% mejor para ser maker)
-            pr = await self._run(self.client.ticker_price, symbol)
-            market_price = float(pr["price"]) if isinstance(pr, dict) else float(pr)
+            # balance, precio actual y filtros en paralelo
+            bals, market_price, q = await self._prepare_order(symbol)
+            timer.mark("prepare")
+            
+            # Precio limit (0.05% mejor para ser maker)
             limit_price = market_price * (1 + MAKER_PRICE_OFFSET)
             
-            bals = await self.get_balances()
             base_asset = symbol.replace("USDT", "")
-            available_qty = Decimal(str(bals.get(base_asset, 0.0)))
-            qty_d = Decimal(str(qty))
-            
-            if qty_d > available_qty:
-                qty_d = available_qty
-            
-            info = await self._run(self.client.exchange_info, symbol=symbol)
-            filters = {f["filterType"]: f for f in info["symbols"][0]["filters"]}
-            step_size_str = filters["LOT_SIZE"]["stepSize"]
-            step_size = Decimal(step_size_str)
-            price_filter = filters["PRICE_FILTER"]
-            tick_size = Decimal(price_filter["tickSize"])
+            available_qty = bals.get(base_asset, 0.0)
+            sell_qty = min(qty, available_qty)
             
             # Ajustar limit_price al tick_size
-            limit_price_d = Decimal(str(limit_price))
-            limit_price_d = (limit_price_d // tick_size) * tick_size
-            limit_price = float(limit_price_d)
+            price_units = q.floor_price(limit_price)
+            limit_price = q.price_float(price_units)
             
-            qty_adjusted = (qty_d // step_size) * step_size
+            qty_units = q.floor_qty(sell_qty)
             
-            if qty_adjusted <= Decimal("0"):
-                if available_qty >= step_size:
-                    qty_adjusted = step_size
+            if qty_units <= 0:
+                if q.floor_qty(available_qty) >= q.step_units:
+                    qty_units = q.step_units
                 else:
                     print(f"[SKIP] No hay suficiente {base_asset} para vender")
                     return None
             
-            if "." in step_size_str:
-                step_decimals = len(step_size_str.rstrip("0").split(".")[1])
-            else:
-                step_decimals = 0
-            
-            qty_str = format(qty_adjusted.quantize(Decimal(1).scaleb(-step_decimals)), "f")
-            if "." in qty_str:
-                qty_str = qty_str.rstrip("0").rstrip(".")
+            qty_str = q.render_qty(qty_units)
+            price_str = q.render_price(price_units)
+            timer.mark("quantize")
             
             if self.dry in ["log", "sim"]:
                 print(f"[DRY-{self.dry.upper()}] Simulated LIMIT SELL {symbol} qty={qty_str} price={limit_price:.2f}")
+                print(timer.report())
                 return None
             
             # Enviar orden LIMIT
             print(f"[LIMIT] Colocando SELL {symbol} qty={qty_str} @ ${limit_price:.2f}")
-            order = await self._run(
-                self.client.new_order,
+            order = await self._place_order(
                 symbol=symbol,
                 side="SELL",
                 type="LIMIT",
                 timeInForce="GTC",
                 quantity=qty_str,
-                price=str(limit_price)
+                price=price_str
             )
+            timer.mark("place")
             
-            order_id = order["orderId"]
-            
-            # Esperar MAKER_WAIT_SECONDS
-            await asyncio.sleep(MAKER_WAIT_SECONDS)
-            
-            # Verificar estado
-            status = await self._run(self.client.get_order, symbol=symbol, orderId=order_id)
+            # Esperar el fill (hasta MAKER_WAIT_SECONDS); si no llega se cancela
+            status = await self._wait_limit_order(symbol, order["orderId"])
+            timer.mark("fill")
+            print(timer.report())
             
             if status["status"] == "FILLED":
                 print(f"[LIMIT] SELL ejecutada como MAKER: {order}")
-                if status.get("status") in ["FILLED"]:
-                    self.entry_prices.pop(symbol, None)
-                    print(f"[EXIT] {symbol} entry_price limpiado")
+                self.entry_prices.pop(symbol, None)
+                print(f"[EXIT] {symbol} entry_price limpiado")
                 return order
-            else:
-                # Cancelar y usar MARKET
-                print(f"[LIMIT] Orden no llenada, cancelando y usando MARKET")
-                await self._run(self.client.cancel_order, symbol=symbol, orderId=order_id)
-                return await self.market_sell(symbol, qty)
+            
+            # Cancelada: vender a MARKET solo lo que no se llenó
+            filled_qty = float(status.get("executedQty") or 0.0)
+            if filled_qty > 0:
+                remaining = q.qty_float(qty_units) - filled_qty
+                print(f"[LIMIT] SELL parcial: {filled_qty} {base_asset} llenados, resto {remaining} a MARKET")
+                if remaining * limit_price < q.min_notional:
+                    return status
+                return await self.market_sell(symbol, remaining)
+            print(f"[LIMIT] Orden no llenada, cancelada, usando MARKET")
+            return await self.market_sell(symbol, qty)
                 
         except Exception as e:
             print(f"[ERROR] limit_sell failed: {e}, fallback a MARKET")
+            if is_filter_error(e):
+                self.symbols.invalidate(symbol)
             return await self.market_sell(symbol, qty)
 
     # -----------------------------
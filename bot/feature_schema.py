@@ -0,0 +1,137 @@
+"""Contrato de features entre entrenamiento e inferencia
+Una sola definición del orden de columnas que espera el modelo. Se guarda
+junto al modelo (model.schema.json), se valida al cargarlo y arma la matriz
+contigua de entrada sin listas de columnas repetidas en cada llamada.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Features del modelo en el orden de entrenamiento (models/features.make_X_y)
+BASE_FEATURES = (
+    "ema_diff", "rsi14", "ret_1",
+    "volatility_5", "volatility_20",
+    "roc_5", "roc_10",
+    "price_to_ema9", "price_to_ema21", "price_to_sma50",
+    "rsi_change", "ema_spread_pct",
+    "bb_position",
+)
+# Se agregan al final si los datos tienen volumen
+VOLUME_FEATURES = ("volume_ratio",)
+
+SCHEMA_VERSION = 1
+
+
+def model_num_features(model) -> int:
+    """Cantidad de features de un Booster de LightGBM o de CompiledTrees"""
+    if hasattr(model, "num_feature"):
+        return model.num_feature()
+    return len(model.feature_names)
+
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    """Columnas (en orden), dtype y valor de relleno para NaN de la entrada del modelo"""
+
+    columns: tuple
+    dtype: str = "float64"
+    fill_value: float = 0.0
+
+    @classmethod
+    def default(cls, with_volume: bool = True):
+        return cls(BASE_FEATURES + (VOLUME_FEATURES if with_volume else ()))
+
+    @classmethod
+    def for_frame(cls, df):
+        """Schema de entrenamiento para un frame de features (volumen si está disponible)"""
+        return cls.default(with_volume=all(c in df.columns for c in VOLUME_FEATURES))
+
+    @classmethod
+    def from_model(cls, model):
+        """Schema desde los nombres de features del modelo (None si son genéricos)"""
+        names = getattr(model, "feature_names", None)
+        if names is None and hasattr(model, "feature_name"):
+            names = model.feature_name()
+        if not names or all(n.startswith("Column_") for n in names):
+            return None
+        return cls(tuple(names))
+
+    @property
+    def n_features(self) -> int:
+        return len(self.columns)
+
+    # -----------------------------
+    # MATRIZ DE ENTRADA
+    # -----------------------------
+    def matrix(self, df, last: int = None, out: np.ndarray = None) -> np.ndarray:
+        """Matriz C-contigua (filas, n_features) en el orden del schema, NaN -> fill_value
+
+        Args:
+            df: DataFrame (o dict de arrays) con al menos las columnas del schema
+            last: Solo las últimas N filas
+            out: Matriz preasignada de la forma correcta (se reutiliza)
+        """
+        n = len(df) if last is None else min(last, len(df))
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=self.dtype)
+        for j, col in enumerate(self.columns):
+            values = np.asarray(df[col])
+            out[:, j] = values[len(values) - n:]
+        np.copyto(out, self.fill_value, where=np.isnan(out))
+        return out
+
+    def row(self, mapping, out: np.ndarray = None) -> np.ndarray:
+        """Matriz (1, n_features) desde un dict / Series (ej. IndicatorEngine.update)"""
+        if out is None:
+            out = np.empty((1, self.n_features), dtype=self.dtype)
+        for j, col in enumerate(self.columns):
+            out[0, j] = mapping[col]
+        np.copyto(out, self.fill_value, where=np.isnan(out))
+        return out
+
+    # -----------------------------
+    # VALIDACIÓN / PERSISTENCIA
+    # -----------------------------
+    def validate(self, model):
+        """ValueError si el modelo espera otras columnas (o en otro orden)"""
+        n_model = model_num_features(model)
+        if n_model != self.n_features:
+            raise ValueError(f"El modelo espera {n_model} features y el schema define {self.n_features}")
+        expected = FeatureSchema.from_model(model)
+        if expected is not None and expected.columns != self.columns:
+            diff = [f"{i}: {a} != {b}" for i, (a, b) in enumerate(zip(self.columns, expected.columns)) if a != b]
+            raise ValueError(f"Schema de features no coincide con el modelo ({', '.join(diff)})")
+
+    def to_dict(self) -> dict:
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "columns": list(self.columns),
+            "dtype": self.dtype,
+            "fill_value": self.fill_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        if data.get("schema_version", SCHEMA_VERSION) > SCHEMA_VERSION:
+            raise ValueError(f"Versión de schema no soportada: {data['schema_version']}")
+        return cls(tuple(data["columns"]), data.get("dtype", "float64"), float(data.get("fill_value", 0.0)))
+
+    def save(self, path):
+        """Escritura atómica (tmp + os.replace): quien vigila el modelo nunca lee un JSON a medias"""
+        tmp = Path(f"{path}.tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    @staticmethod
+    def sidecar_path(model_file) -> Path:
+        """models/model.pkl / models/model.npz -> models/model.schema.json"""
+        model_file = Path(model_file)
+        return model_file.with_name(f"{model_file.stem}.schema.json")
@@ -25,6 +25,17 @@ async def grid_trading_loop(args):
     symbol = os.getenv("SYMBOL", "BTCUSDT")
     
     log_info(f"Grid Trading Bot iniciado | Mode: {args.mode} | Dry: {args.dry}", context="grid_startup")
+
+    try:
+        await ex.load_symbols([symbol])
+    except Exception as e:
+        log_error(f"No se pudieron precargar filtros: {str(e)}", context="grid_startup")
+
+    if args.dry == "none":
+        try:
+            await ex.start_user_stream()
+        except Exception as e:
+            log_error(f"User data stream no disponible, se usará polling: {str(e)}", context="grid_startup")
     
     try:
         # Obtener precio actual para crear grid
@@ -140,6 +151,7 @@ async def grid_trading_loop(args):
     finally:
         monitor.cancel()
         await asyncio.gather(monitor, return_exceptions=True)
+        await ex.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+"""Motor incremental de indicadores (mismo resultado que strategy.compute_features)
+Mantiene el estado de cada EWM / ventana rolling y actualiza todas las
+features en O(1) por vela cerrada, en lugar de recalcular la ventana completa.
+"""
+
+import math
+from collections import deque
+
+NAN = float("nan")
+
+# Columnas que agrega compute_features, en el mismo orden
+FEATURE_COLUMNS = [
+    "rsi2", "sma50", "sma200", "atr14", "ema9", "ema21", "rsi14", "ema_diff",
+    "ret_1", "volatility_5", "volatility_20", "roc_5", "roc_10",
+    "price_to_ema9", "price_to_ema21", "price_to_sma50", "rsi_change",
+    "ema_spread_pct", "bb_upper", "bb_lower", "bb_position",
+]
+VOLUME_COLUMNS = ["volume_ma5", "volume_ratio"]
+
+
+class EWM:
+    """ewm(alpha, adjust=False).mean() de pandas, un valor a la vez"""
+
+    __slots__ = ("alpha", "old_wt", "value")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.old_wt = 1.0 - alpha
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if x != x:
+            return self.value
+        w = self.value
+        if w != w:
+            self.value = x
+        elif w != x:
+            # misma expresión que pandas (incluida la normalización) para paridad exacta
+            self.value = (self.old_wt * w + self.alpha * x) / (self.old_wt + self.alpha)
+        return self.value
+
+
+class Rolling:
+    """rolling(window).mean() / .std() de pandas, un valor a la vez
+
+    Replica los kernels de pandas para obtener los mismos bits:
+    - mean: suma de Kahan con compensaciones separadas para altas y bajas;
+      si los últimos `window` valores son iguales devuelve ese valor exacto.
+    - std: Welford (primero se quita el valor que sale, después se agrega el
+      nuevo); si la suma de cuadrados queda negativa se reinicia como pandas.
+    """
+
+    __slots__ = ("window", "values", "sum", "comp_add", "comp_remove",
+                 "mean", "m2", "same", "last")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.sum = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.same = 0  # valores iguales consecutivos
+        self.last = None
+
+    def push(self, x: float):
+        values = self.values
+        if len(values) == self.window:
+            y = values.popleft()
+            n = len(values)
+            # suma (Kahan)
+            t = -y - self.comp_remove
+            total = self.sum + t
+            self.comp_remove = total - self.sum - t
+            self.sum = total
+            # Welford
+            if n:
+                d = y - self.mean
+                self.mean -= d / n
+                self.m2 -= d * (y - self.mean)
+            else:
+                self.mean = self.m2 = 0.0
+
+        values.append(x)
+        n = len(values)
+        t = x - self.comp_add
+        total = self.sum + t
+        self.comp_add = total - self.sum - t
+        self.sum = total
+        d = x - self.mean
+        self.mean += d / n
+        self.m2 += d * (x - self.mean)
+        if self.m2 < 0:
+            # error de redondeo (ventana plana): pandas reinicia la media en el valor
+            self.m2 = 0.0
+            self.mean = x
+
+        self.same = self.same + 1 if x == self.last else 1
+        self.last = x
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean_value(self) -> float:
+        if not self.ready:
+            return NAN
+        if self.same >= self.window:
+            return self.last
+        return self.sum / self.window
+
+    def std_value(self) -> float:
+        if not self.ready:
+            return NAN
+        return math.sqrt(max(self.m2 / (self.window - 1), 0.0))
+
+
+class _RSI:
+    """rsi() de strategy.py: EWM(alpha=1/period) de subidas y bajadas"""
+
+    __slots__ = ("up", "down")
+
+    def __init__(self, period: int):
+        self.up = EWM(1 / period)
+        self.down = EWM(1 / period)
+
+    def update(self, delta: float) -> float:
+        if delta != delta:
+            up = down = NAN
+        else:
+            up = delta if delta > 0 else 0.0
+            down = -delta if delta < 0 else 0.0
+        ma_up = self.up.update(up)
+        ma_down = self.down.update(down)
+        rs = ma_up / (ma_down + 1e-9)
+        return 100 - (100 / (1 + rs))
+
+
+class IndicatorEngine:
+    """Estado de indicadores de un símbolo
+
+    Uso:
+        engine = IndicatorEngine()
+        engine.warmup(df)                 # historia (velas cerradas)
+        row = engine.update(candle)       # cada vela que cierra
+        if engine.ready: ...              # todas las features definidas
+
+    `update` devuelve las columnas de la vela más las de compute_features;
+    durante el warm-up algunas valen NaN (compute_features descarta esas filas).
+    """
+
+    def __init__(self):
+        self.rsi2 = _RSI(2)
+        self.rsi14 = _RSI(14)
+        self.ema9 = EWM(2 / (9 + 1))
+        self.ema21 = EWM(2 / (21 + 1))
+        self.roll5 = Rolling(5)
+        self.roll14 = Rolling(14)
+        self.roll20 = Rolling(20)
+        self.roll50 = Rolling(50)
+        self.roll200 = Rolling(200)
+        self.vol5 = Rolling(5)
+        self.closes = deque(maxlen=11)  # para ret_1 / roc_5 / roc_10
+        self.prev_rsi14 = NAN
+        self.count = 0
+        self.last = None
+
+    @property
+    def ready(self) -> bool:
+        """True si la última fila no tiene NaN (sobrevive al dropna de compute_features)"""
+        return self.last is not None and not any(v != v for v in self.last.values() if isinstance(v, float))
+
+    def warmup(self, df):
+        """Alimenta el motor con todas las filas de un DataFrame de velas"""
+        cols = list(df.columns)
+        for values in df.itertuples(index=False, name=None):
+            self.update(dict(zip(cols, values)))
+        return self.last
+
+    def update(self, candle: dict) -> dict:
+        """Procesa una vela cerrada (dict con al menos 'close'; 'volume' opcional)"""
+        close = float(candle["close"])
+        closes = self.closes
+        prev = closes[-1] if closes else NAN
+        closes.append(close)
+        self.count += 1
+
+        self.roll5.push(close)
+        self.roll14.push(close)
+        self.roll20.push(close)
+        self.roll50.push(close)
+        self.roll200.push(close)
+
+        delta = close - prev
+        ema9 = self.ema9.update(close)
+        ema21 = self.ema21.update(close)
+        rsi14 = self.rsi14.update(delta)
+        sma50 = self.roll50.mean_value()
+        mean20 = self.roll20.mean_value()
+        std20 = self.roll20.std_value()
+        bb_upper = mean20 + 2 * std20
+        bb_lower = mean20 - 2 * std20
+
+        row = dict(candle)
+        row["close"] = close
+        row["rsi2"] = self.rsi2.update(delta)
+        row["sma50"] = sma50
+        row["sma200"] = self.roll200.mean_value()
+        row["atr14"] = self.roll14.std_value() * 1.5
+        row["ema9"] = ema9
+        row["ema21"] = ema21
+        row["rsi14"] = rsi14
+        row["ema_diff"] = ema9 - ema21
+        row["ret_1"] = close / prev - 1
+        row["volatility_5"] = self.roll5.std_value()
+        row["volatility_20"] = std20
+        row["roc_5"] = close / closes[-6] - 1 if len(closes) > 5 else NAN
+        row["roc_10"] = close / closes[-11] - 1 if len(closes) > 10 else NAN
+        row["price_to_ema9"] = (close - ema9) / ema9
+        row["price_to_ema21"] = (close - ema21) / ema21
+        row["price_to_sma50"] = (close - sma50) / sma50
+        row["rsi_change"] = rsi14 - self.prev_rsi14
+        row["ema_spread_pct"] = (ema9 - ema21) / ema21
+        row["bb_upper"] = bb_upper
+        row["bb_lower"] = bb_lower
+        row["bb_position"] = (close - bb_lower) / (bb_upper - bb_lower + 1e-9)
+        if "volume" in candle:
+            volume = float(candle["volume"])
+            self.vol5.push(volume)
+            volume_ma5 = self.vol5.mean_value()
+            row["volume_ma5"] = volume_ma5
+            row["volume_ratio"] = volume / (volume_ma5 + 1e-9)
+
+        self.prev_rsi14 = rsi14
+        self.last = row
+        return row
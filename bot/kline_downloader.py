@@ -0,0 +1,212 @@
+"""Descarga histórica de velas en paralelo y reanudable
+Parte el rango en chunks de MAX_KLINES_LIMIT velas, los pide en paralelo
+(cantidad acotada + presupuesto de peso del RateLimiter) y los persiste en el
+CandleStore en orden a medida que llegan: el store siempre tiene un prefijo
+contiguo del rango, así una descarga cortada se retoma desde la última vela
+guardada en lugar de empezar de nuevo.
+
+El modo update (update_range) baja solo la cola desde la última vela guardada
+y después verifica la continuidad del store, rellenando los huecos.
+"""
+
+import asyncio
+import collections
+import itertools
+import time
+
+import aiohttp
+
+from bot.candle_store import CandleStore, format_ms
+from bot.kline_store import MAX_KLINES_LIMIT
+from bot.market_stream import INTERVAL_MS
+from bot.transport import BinanceAPIError
+
+# Requests de klines en vuelo a la vez (el peso lo limita además el RateLimiter)
+DEFAULT_CONCURRENCY = 8
+FETCH_RETRIES = 5
+
+
+def interval_ms(interval: str) -> int:
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Intervalo no soportado para descarga por rango: {interval}") from None
+
+
+def plan_chunks(start_ms: int, end_ms: int, step_ms: int, limit: int = MAX_KLINES_LIMIT) -> list:
+    """[(desde, hasta)] en ms, ambos inclusive, de a `limit` velas; el primero
+    arranca en la vela que contiene start_ms"""
+    first = start_ms - start_ms % step_ms
+    span = step_ms * limit
+    return [(a, min(a + span, end_ms + 1) - 1) for a in range(first, end_ms + 1, span)]
+
+
+async def fetch_chunk(client, symbol, interval, chunk, limit=MAX_KLINES_LIMIT, retries=FETCH_RETRIES):
+    """Velas de un chunk; reintenta ante 429/418 (el limiter ya pausó) y errores de red"""
+    for attempt in range(retries):
+        try:
+            return await client.klines(symbol, interval, startTime=chunk[0], endTime=chunk[1], limit=limit)
+        except BinanceAPIError as e:
+            if e.status_code not in (418, 429) and (e.status_code or 0) < 500:
+                raise
+            error = e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = e
+        await asyncio.sleep(min(2 ** attempt * 0.5, 10))
+    raise error
+
+
+async def download_range(client, store: CandleStore, symbol, interval, start_ms, end_ms,
+                         concurrency=DEFAULT_CONCURRENCY, semaphore=None, limit=MAX_KLINES_LIMIT,
+                         resume=True) -> int:
+    """Descarga [start_ms, end_ms] de un símbolo/intervalo al store
+
+    Si el store ya tiene velas del rango retoma desde la última guardada
+    (se vuelve a pedir por si estaba abierta). Si además el store empieza
+    después de start_ms, antes se baja la cabeza [start_ms, primera guardada),
+    una sola vez: el store recuerda hasta dónde ya se verificó (head_checked_from).
+
+    Args:
+        semaphore: Límite de requests en vuelo compartido entre varias descargas
+        resume: False para bajar el rango tal cual (relleno de huecos)
+
+    Returns:
+        Velas escritas
+    """
+    step = interval_ms(interval)
+    last = store.last_open_time(symbol, interval) if resume else None
+    head = 0
+    if last is not None and last >= start_ms:
+        first = store.first_open_time(symbol, interval)
+        checked = store.head_checked_from(symbol, interval)
+        if first > start_ms and (checked is None or checked > start_ms):
+            # el store arrancó más tarde (ej. una corrida previa con otro --start)
+            print(f"[DOWNLOAD] {symbol} {interval}: completando desde {format_ms(start_ms)} "
+                  f"hasta {format_ms(first)}")
+            head = await download_range(client, store, symbol, interval, start_ms, min(first - step, end_ms),
+                                        concurrency, semaphore, limit, resume=False)
+            if end_ms >= first - step:
+                # lo que no vino no existe (ej. par listado después de start_ms): no volver a pedirlo
+                store.mark_head_checked(symbol, interval, start_ms)
+        start_ms = last
+        print(f"[DOWNLOAD] {symbol} {interval}: retomando desde {format_ms(last)}")
+    if start_ms > end_ms:
+        return head
+    chunks = plan_chunks(start_ms, end_ms, step, limit)
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+
+    async def fetch(chunk):
+        async with semaphore:
+            return await fetch_chunk(client, symbol, interval, chunk, limit)
+
+    # ventana deslizante: como mucho `concurrency` chunks por delante del último
+    # persistido, así la memoria no crece con el rango aunque uno se demore
+    pending = collections.deque()
+    remaining = iter(chunks)
+
+    def launch():
+        for chunk in itertools.islice(remaining, concurrency - len(pending)):
+            pending.append(asyncio.ensure_future(fetch(chunk)))
+
+    written = 0
+    done = 0
+    t0 = time.monotonic()
+    launch()
+    try:
+        while pending:
+            rows = await pending.popleft()
+            launch()
+            if rows:
+                written += store.write(symbol, interval, rows)
+            done += 1
+            if done % 50 == 0 or done == len(chunks):
+                print(f"[DOWNLOAD] {symbol} {interval}: {done}/{len(chunks)} chunks, "
+                      f"{written} velas ({time.monotonic() - t0:.1f}s)")
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return head + written
+
+
+async def download_many(client, store: CandleStore, symbols, intervals, start_ms, end_ms,
+                        concurrency=DEFAULT_CONCURRENCY) -> dict:
+    """Todas las combinaciones símbolo x intervalo con un límite de requests en vuelo común
+
+    Returns:
+        {(symbol, interval): velas escritas}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    jobs = [(s.upper(), i) for s in symbols for i in intervals]
+    results = await asyncio.gather(*[
+        download_range(client, store, s, i, start_ms, end_ms, concurrency, semaphore) for s, i in jobs
+    ])
+    return dict(zip(jobs, results))
+
+
+async def repair_gaps(client, store: CandleStore, symbol, interval, gaps,
+                      concurrency=DEFAULT_CONCURRENCY, semaphore=None) -> int:
+    """Vuelve a pedir los rangos faltantes que detectó CandleStore.check
+
+    Returns:
+        Velas recuperadas (un hueco real del exchange, ej. mantenimiento, no trae nada)
+    """
+    recovered = 0
+    for a, b in gaps:
+        recovered += await download_range(client, store, symbol, interval, a, b,
+                                          concurrency, semaphore, resume=False)
+    return recovered
+
+
+async def update_range(client, store: CandleStore, symbol, interval, end_ms, start_ms=None,
+                       concurrency=DEFAULT_CONCURRENCY, semaphore=None) -> dict:
+    """Modo update: baja solo la cola desde la última vela guardada, verifica
+    continuidad y repara huecos / duplicados
+
+    Args:
+        start_ms: Inicio del rango: si el store está vacío o empieza después,
+            también se baja desde acá (None = solo la cola)
+
+    Returns:
+        {"appended", "duplicates_removed", "gaps", "recovered", "remaining_gaps"}
+    """
+    last = store.last_open_time(symbol, interval)
+    if last is None and start_ms is None:
+        raise ValueError(f"{symbol} {interval}: store vacío, se necesita una fecha de inicio")
+    begin = last if start_ms is None else start_ms if last is None else min(start_ms, last)
+    appended = await download_range(client, store, symbol, interval, begin, end_ms, concurrency, semaphore)
+
+    step = interval_ms(interval)
+    report = store.check(symbol, interval, step)
+    removed = store.dedupe(symbol, interval) if report["duplicates"] else 0
+    recovered = 0
+    remaining = report["gaps"]
+    if remaining:
+        missing = sum((b - a) // step + 1 for a, b in remaining)
+        print(f"[UPDATE] {symbol} {interval}: {len(remaining)} huecos ({missing} velas), reparando...")
+        recovered = await repair_gaps(client, store, symbol, interval, remaining, concurrency, semaphore)
+        remaining = store.check(symbol, interval, step)["gaps"]
+    print(f"[UPDATE] {symbol} {interval}: +{appended} velas, {removed} duplicados eliminados, "
+          f"{recovered} velas recuperadas, {len(remaining)} huecos sin datos en el exchange")
+    return {
+        "appended": appended,
+        "duplicates_removed": removed,
+        "gaps": len(report["gaps"]),
+        "recovered": recovered,
+        "remaining_gaps": remaining,
+    }
+
+
+async def update_many(client, store: CandleStore, symbols, intervals, end_ms, start_ms=None,
+                      concurrency=DEFAULT_CONCURRENCY) -> dict:
+    """update_range para todas las combinaciones símbolo x intervalo
+
+    Returns:
+        {(symbol, interval): reporte de update_range}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    jobs = [(s.upper(), i) for s in symbols for i in intervals]
+    results = await asyncio.gather(*[
+        update_range(client, store, s, i, end_ms, start_ms, concurrency, semaphore) for s, i in jobs
+    ])
+    return dict(zip(jobs, results))
@@ -0,0 +1,206 @@
+"""Store incremental de velas por (symbol, interval)
+Buffer circular columnar (un array NumPy por columna): se hace backfill una
+sola vez y después cada update trae solo las velas nuevas, reemplazando en
+su lugar la vela todavía abierta. Los consumidores reciben vistas sin copia.
+"""
+
+import time
+import numpy as np
+
+# Columnas de GET /api/v3/klines (se descarta "ignore")
+KLINE_COLUMNS = [
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("close_time", np.int64),
+    ("quote_asset_volume", np.float64),
+    ("num_trades", np.int64),
+    ("taker_buy_base", np.float64),
+    ("taker_buy_quote", np.float64),
+]
+
+# Máximo de velas por request de klines
+MAX_KLINES_LIMIT = 1000
+
+
+class KlineStore:
+    """Últimas `capacity` velas de un símbolo/intervalo
+
+    Internamente cada columna usa un array de 2*capacity: las velas se escriben
+    en forma lineal y, al llegar al final, la ventana actual se mueve al
+    inicio (una copia cada `capacity` velas). Así la ventana siempre es
+    contigua y `view()` / `frame()` no copian datos.
+
+    Las vistas son de solo lectura y válidas hasta el próximo update: quien
+    necesite conservarlas debe copiarlas.
+    """
+
+    def __init__(self, symbol: str, interval: str, capacity: int = 500, fetch=None):
+        """
+        Args:
+            symbol / interval: Mercado de las velas (ej. "BTCUSDT", "5m")
+            capacity: Velas que se conservan
+            fetch: fetch(symbol, interval, **params) -> filas crudas de GET /api/v3/klines
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.capacity = capacity
+        self._fetch = fetch
+        self._cols = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in KLINE_COLUMNS}
+        self._end = 0  # índice siguiente a la última vela
+        self._len = 0
+        self._frame = None  # DataFrame sobre el buffer completo (ver frame)
+
+        self.requests = 0
+        self.rows_fetched = 0
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def last_open_time(self):
+        return int(self._cols["open_time"][self._end - 1]) if self._len else None
+
+    @property
+    def last_close_time(self):
+        return int(self._cols["close_time"][self._end - 1]) if self._len else None
+
+    # -----------------------------
+    # ESCRITURA
+    # -----------------------------
+    def _write(self, idx, row):
+        for j, (name, dtype) in enumerate(KLINE_COLUMNS):
+            self._cols[name][idx] = int(row[j]) if dtype is np.int64 else float(row[j])
+
+    def _append(self, row):
+        if self._end == len(self._cols["open_time"]):
+            # compactar: mover las últimas capacity-1 velas al inicio
+            keep = self.capacity - 1
+            for arr in self._cols.values():
+                arr[:keep] = arr[self._end - keep:self._end]
+            self._end = keep
+            self._len = keep
+        self._write(self._end, row)
+        self._end += 1
+        self._len = min(self._len + 1, self.capacity)
+
+    def apply(self, rows):
+        """Aplica filas crudas de klines (o eventos convertidos al mismo formato)
+
+        - open_time igual a la última vela: la reemplaza (vela abierta que avanzó)
+        - open_time mayor: se agrega al final
+        - open_time menor: se ignora (ya la tenemos)
+
+        Returns:
+            Cantidad de velas nuevas agregadas
+        """
+        added = 0
+        for row in rows:
+            ot = int(row[0])
+            last = self.last_open_time
+            if last is None or ot > last:
+                self._append(row)
+                added += 1
+            elif ot == last:
+                self._write(self._end - 1, row)
+        return added
+
+    def reset(self):
+        self._end = 0
+        self._len = 0
+
+    # -----------------------------
+    # SINCRONIZACIÓN CON REST
+    # -----------------------------
+    def update(self):
+        """Backfill en la primera llamada; después solo velas nuevas.
+
+        Pide desde el open_time de la última vela guardada: la respuesta trae
+        esa vela (si seguía abierta, con sus valores actualizados) más las
+        posteriores. Si el hueco supera la capacidad se rehace el backfill.
+
+        Returns:
+            Cantidad de velas nuevas agregadas
+        """
+        return self.apply_update(*self.fetch_update())
+
+    def fetch_update(self):
+        """Parte REST de update, sin tocar el buffer (se puede correr en un thread
+        mientras otros leen vistas; después aplicar con apply_update en el suyo)
+
+        Returns:
+            (rows, full): filas crudas y si son un backfill que reemplaza el buffer
+        """
+        if not self._len:
+            return self._backfill_rows(), True
+
+        last = self.last_open_time
+        rows = []
+        new = 0
+        start = last
+        while True:
+            batch = self._request(startTime=start, limit=MAX_KLINES_LIMIT)
+            rows.extend(batch)
+            new += sum(1 for r in batch if int(r[0]) > last)
+            if new >= self.capacity:
+                # hueco más grande que el buffer: más simple rehacer el backfill
+                return self._backfill_rows(), True
+            if len(batch) < MAX_KLINES_LIMIT:
+                return rows, False
+            start = int(batch[-1][0]) + 1
+
+    def apply_update(self, rows, full=False):
+        """Aplica la salida de fetch_update (Returns: velas nuevas agregadas)"""
+        if full:
+            self.reset()
+        return self.apply(rows)
+
+    def _backfill_rows(self):
+        return self._request(limit=min(self.capacity, MAX_KLINES_LIMIT))
+
+    def _request(self, **params):
+        rows = self._fetch(self.symbol, self.interval, **params)
+        self.requests += 1
+        self.rows_fetched += len(rows)
+        return rows
+
+    # -----------------------------
+    # LECTURA (sin copia)
+    # -----------------------------
+    def _bounds(self, last, closed_only):
+        end = self._end
+        if closed_only and self._len and self._cols["close_time"][end - 1] >= time.time() * 1000:
+            end -= 1  # la última vela todavía no cerró
+        n = min(end - (self._end - self._len), last if last is not None else self.capacity)
+        return end - n, end
+
+    def view(self, last: int = None, closed_only: bool = False) -> dict:
+        """dict columna -> vista NumPy de solo lectura (open_time/close_time en ms)
+
+        Args:
+            last: Solo las últimas N velas (default: todas)
+            closed_only: Excluir la vela en curso
+        """
+        a, b = self._bounds(last, closed_only)
+        out = {}
+        for name, arr in self._cols.items():
+            v = arr[a:b]
+            v.flags.writeable = False
+            out[name] = v
+        return out
+
+    def frame(self, last: int = None, closed_only: bool = False):
+        """DataFrame sobre el buffer (mismas columnas que get_latest_klines;
+        open_time como datetime64[ms], índice 0..n-1)"""
+        import pandas as pd  # solo quien pide DataFrames paga el import
+
+        if self._frame is None:
+            # se crea una vez sobre el buffer completo; cada llamada solo lo rebana
+            full = dict(self._cols)
+            full["open_time"] = full["open_time"].view("datetime64[ms]")
+            self._frame = pd.DataFrame(full, copy=False)
+        a, b = self._bounds(last, closed_only)
+        return self._frame.iloc[a:b].set_axis(pd.RangeIndex(b - a), axis=0)
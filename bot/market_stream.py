@@ -0,0 +1,160 @@
+"""Feed de velas en tiempo real (<symbol>@kline_<interval>)
+Aplica cada evento del WebSocket sobre un KlineStore y emite un evento
+"closed" apenas cierra una vela (y opcionalmente "update" intra-bar), para
+que el runner reaccione al cierre en lugar de dormir un intervalo fijo.
+Al (re)conectar rellena el hueco con el backfill REST del store.
+"""
+
+import asyncio
+import json
+import os
+
+import aiohttp
+
+from bot.user_stream import MAINNET_WS_URL, TESTNET_WS_URL
+
+# Milisegundos por intervalo de Binance
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+
+def kline_event_to_row(event: dict) -> list:
+    """Evento kline del WebSocket -> fila con el formato de GET /api/v3/klines"""
+    k = event["k"]
+    return [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], "0"]
+
+
+class KlineStream:
+    def __init__(self, store, ws_url: str = None, intrabar: bool = False, reconnect_delay: float = 1.0):
+        """
+        Args:
+            store: KlineStore del símbolo/intervalo (su fetch se usa para gap-fill)
+            ws_url: Base del WebSocket (default testnet/mainnet según MODE)
+            intrabar: Emitir también eventos "update" de la vela en curso
+            reconnect_delay: Espera inicial entre reconexiones (backoff x2, máx 60 s)
+        """
+        self.store = store
+        if ws_url is None:
+            ws_url = TESTNET_WS_URL if os.getenv("MODE", "dev") == "dev" else MAINNET_WS_URL
+        self.ws_url = ws_url.rstrip("/")
+        self.stream_name = f"{store.symbol.lower()}@kline_{store.interval}"
+        self.intrabar = intrabar
+        self.reconnect_delay = reconnect_delay
+        self.interval_ms = INTERVAL_MS.get(store.interval)
+        self.connected = asyncio.Event()
+
+        self._events = asyncio.Queue()
+        self._update_pending = False  # los "update" se coalescen: como mucho uno en cola
+        self._last_closed = None  # open_time de la última vela cerrada emitida
+        self._task = None
+        self._session = None
+
+        self.messages = 0
+        self.reconnects = 0
+        self.gap_fills = 0
+
+    # -----------------------------
+    # CICLO DE VIDA
+    # -----------------------------
+    async def start(self):
+        self._session = aiohttp.ClientSession()
+        self._task = asyncio.create_task(self._read_loop())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _read_loop(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with self._session.ws_connect(f"{self.ws_url}/{self.stream_name}", heartbeat=30) as ws:
+                    self.connected.set()
+                    # lo que cerró mientras no estábamos conectados viene por REST
+                    await self._gap_fill()
+                    delay = self.reconnect_delay
+                    async for msg in ws:
+                        if msg.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        await self._on_message(json.loads(msg.data))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] KlineStream {self.stream_name}: desconectado ({e}), reintentando en {delay:.0f}s")
+            self.connected.clear()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+    # -----------------------------
+    # EVENTOS
+    # -----------------------------
+    async def _gap_fill(self):
+        """Backfill/update REST del store
+
+        Solo el fetch (sincrónico) va a un thread; las filas se aplican acá, en
+        el loop, porque el runner lee vistas sin copia del mismo buffer.
+        """
+        loop = asyncio.get_running_loop()
+        rows, full = await loop.run_in_executor(None, self.store.fetch_update)
+        self.store.apply_update(rows, full)
+        self.gap_fills += 1
+        self._emit_last_closed()
+
+    def _emit_last_closed(self):
+        """Emite "closed" si el store tiene una vela cerrada más nueva que la última emitida"""
+        view = self.store.view(last=1, closed_only=True)
+        if not len(view["open_time"]):
+            return
+        open_time = int(view["open_time"][-1])
+        if self._last_closed is None or open_time > self._last_closed:
+            self._last_closed = open_time
+            self._events.put_nowait({"type": "closed", "open_time": open_time, "close": float(view["close"][-1])})
+
+    async def _on_message(self, event: dict):
+        if event.get("e") != "kline":
+            return
+        self.messages += 1
+        row = kline_event_to_row(event)
+        last = self.store.last_open_time
+        if last is not None and self.interval_ms and row[0] > last + self.interval_ms:
+            # se saltearon velas (mensajes perdidos): completar por REST antes de aplicar
+            await self._gap_fill()
+        self.store.apply([row])
+
+        if event["k"]["x"]:
+            if self._last_closed is None or row[0] > self._last_closed:
+                self._last_closed = row[0]
+                self._events.put_nowait({"type": "closed", "open_time": row[0], "close": float(row[4])})
+        elif self.intrabar and not self._update_pending:
+            self._update_pending = True
+            self._events.put_nowait({"type": "update", "open_time": row[0], "close": float(row[4])})
+
+    async def next_event(self, timeout: float = None):
+        """Próximo evento {"type": "closed"|"update", "open_time", "close"} (o None por timeout)"""
+        try:
+            event = await asyncio.wait_for(self._events.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event["type"] == "update":
+            self._update_pending = False
+        return event
+
+    async def next_close(self, timeout: float = None):
+        """Espera el próximo cierre de vela (descarta updates intra-bar)"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            event = await self.next_event(remaining)
+            if event is None or event["type"] == "closed":
+                return event
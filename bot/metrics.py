@@ -0,0 +1,69 @@
+"""Instrumentación liviana de latencias del bot (sin dependencias externas)"""
+
+import time
+from collections import defaultdict, deque
+
+
+class LatencyStats:
+    """Últimas N muestras por métrica con percentiles para reportes"""
+
+    def __init__(self, window: int = 500):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, name: str, seconds: float):
+        self._samples[name].append(seconds)
+
+    def summary(self):
+        """dict métrica -> {count, p50_ms, p95_ms, max_ms}"""
+        out = {}
+        for name, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            n = len(ordered)
+            out[name] = {
+                "count": n,
+                "p50_ms": ordered[n // 2] * 1000,
+                "p95_ms": ordered[min(n - 1, int(n * 0.95))] * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return out
+
+
+class PhaseTimer:
+    """Mide la duración de cada fase de una operación (ej. una orden)
+
+    Uso:
+        timer = PhaseTimer("market_buy BTCUSDT", stats)
+        ...                 # fase 1
+        timer.mark("prepare")
+        ...                 # fase 2
+        timer.mark("place")
+        print(timer.report())
+    """
+
+    def __init__(self, label: str, stats: LatencyStats = None):
+        self.label = label
+        self.stats = stats
+        self.phases = []  # (fase, segundos)
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        """Cierra la fase actual con nombre `phase`"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self._start
+
+    def report(self) -> str:
+        """Registra las fases en stats y devuelve la línea de log"""
+        op = self.label.split()[0]
+        if self.stats is not None:
+            for phase, secs in self.phases:
+                self.stats.record(f"{op}.{phase}", secs)
+            self.stats.record(f"{op}.total", self.total)
+        parts = " | ".join(f"{phase}={secs * 1000:.1f}ms" for phase, secs in self.phases)
+        return f"[LATENCY] {self.label} | {parts} | total={self.total * 1000:.1f}ms"
@@ -1,41 +1,177 @@
+import asyncio
+import os
 import pickle
+import time
+from pathlib import Path
 import numpy as np
 import pandas as pd
+from bot.feature_schema import FeatureSchema, model_num_features
+from bot.metrics import LatencyStats
+from bot.model_registry import ModelRegistry
+from bot.tree_model import CompiledTrees
+
+# Cada cuántos segundos se verifica si hay un modelo nuevo (0 = sin recarga en caliente)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", 30))
+
+def load_model(path):
+    """Booster pickleado (.pkl, requiere lightgbm) o árboles compilados (.npz, solo NumPy)"""
+    if str(path).endswith('.npz'):
+        return CompiledTrees.load(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def resolve_model(model_path):
+    """MODEL_PATH -> (archivo, versión, metadata)
+
+    Acepta un archivo de modelo o un directorio de ModelRegistry (usa la versión activa).
+    """
+    path = Path(model_path)
+    if path.is_dir():
+        registry = ModelRegistry(path)
+        version = registry.current_version()
+        if version is None:
+            raise FileNotFoundError(f"Registro sin versión activa: {path}")
+        return registry.model_path(version), version, registry.meta(version)
+    return path, path.name, {}
+
+def model_signature(model_path):
+    """Cambia cuando hay un modelo nuevo: versión activa del registro o mtime/tamaño
+    del archivo y de su schema (un modelo rechazado se reintenta si llega el schema)"""
+    path = Path(model_path)
+    if path.is_dir():
+        return ModelRegistry(path).signature()
+    st = path.stat()
+    sidecar = FeatureSchema.sidecar_path(path)
+    schema_st = sidecar.stat() if sidecar.exists() else None
+    return (st.st_mtime_ns, st.st_size,
+            schema_st and (schema_st.st_mtime_ns, schema_st.st_size))
+
+def load_schema(file, meta, model):
+    """Schema del modelo: model.schema.json, features de la metadata o nombres del modelo"""
+    sidecar = FeatureSchema.sidecar_path(file)
+    if sidecar.exists():
+        schema = FeatureSchema.load(sidecar)
+    elif meta.get('features'):
+        schema = FeatureSchema(tuple(meta['features']))
+    else:
+        # modelos viejos sin schema: 13 features base (+ volume_ratio)
+        schema = FeatureSchema.from_model(model) or FeatureSchema.default(
+            with_volume=model_num_features(model) == FeatureSchema.default().n_features)
+    schema.validate(model)
+    return schema
+
+def load_and_warm(model_path):
+    """Carga el modelo, valida su schema y lo ejercita una vez antes de ponerlo en servicio (bloqueante)"""
+    file, version, meta = resolve_model(model_path)
+    model = load_model(file)
+    schema = load_schema(file, meta, model)
+    for rows in (1, 8):
+        proba = model.predict(np.zeros((rows, schema.n_features), dtype=schema.dtype))
+        if len(proba) != rows or not np.isfinite(proba).all():
+            raise ValueError(f"Warm-up inválido para {file}")
+    return model, version, meta, schema
 
 class MLScorer:
     def __init__(self, model_path=None):
         self.model_path = model_path
         self.model = None
+        self.schema = None
+        self.version = None
+        self.meta = {}
+        self.latency = LatencyStats()
+        self._buffers = {}  # (filas, columnas) -> matriz preasignada para inferencia live
+        self._signature = None
+        self.reloads = 0
+        self.reload_errors = 0
         if model_path:
             try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
+                self._signature = model_signature(model_path)
+                self.model, self.version, self.meta, self.schema = load_and_warm(model_path)
             except Exception as e:
                 print('MLScorer: could not load model', e)
 
+    # -----------------------------
+    # RECARGA EN CALIENTE
+    # -----------------------------
+    async def reload_if_changed(self) -> bool:
+        """Si cambió el modelo lo carga en un thread y recién ahí lo reemplaza;
+        ante un error sigue sirviendo la versión anterior"""
+        if not self.model_path:
+            return False
+        loop = asyncio.get_running_loop()
+        try:
+            signature = await loop.run_in_executor(None, model_signature, self.model_path)
+        except OSError:
+            return False
+        if signature == self._signature:
+            return False
+        self._signature = signature  # un archivo roto no se reintenta hasta que vuelva a cambiar
+        try:
+            model, version, meta, schema = await loop.run_in_executor(None, load_and_warm, self.model_path)
+        except Exception as e:
+            self.reload_errors += 1
+            print(f"MLScorer: recarga fallida ({e}), se mantiene {self.version}")
+            return False
+        # swap en el event loop: ningún predict ve un modelo a medio cargar
+        self.model, self.version, self.meta, self.schema = model, version, meta, schema
+        self.reloads += 1
+        print(f"MLScorer: modelo recargado -> {version}")
+        return True
+
+    async def watch(self, interval: float = MODEL_RELOAD_INTERVAL):
+        """Loop de fondo: verifica cada `interval` segundos si hay un modelo nuevo"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload_if_changed()
+
     def predict(self, feature_df):
         if self.model is None:
             return np.zeros(len(feature_df))
         
-        # Features expandidos (mismo orden que en features.py)
-        feature_cols = [
-            'ema_diff', 'rsi14', 'ret_1',
-            'volatility_5', 'volatility_20',
-            'roc_5', 'roc_10',
-            'price_to_ema9', 'price_to_ema21', 'price_to_sma50',
-            'rsi_change', 'ema_spread_pct',
-            'bb_position'
-        ]
-        
-        # Agregar volume_ratio si existe
-        if 'volume_ratio' in feature_df.columns:
-            feature_cols.append('volume_ratio')
-        
-        X = feature_df[feature_cols].fillna(0).values
-        
+        t0 = time.perf_counter()
         try:
+            X = self.schema.matrix(feature_df)
             proba = self.model.predict(X)
+            self.latency.record("ml.predict", time.perf_counter() - t0)
             return proba
         except Exception as e:
             print(f"MLScorer predict error: {e}")
             return np.zeros(len(feature_df))
+
+    def _buffer(self, rows):
+        key = (rows, self.schema.n_features, self.schema.dtype)
+        X = self._buffers.get(key)
+        if X is None:
+            X = self._buffers[key] = np.zeros((rows, self.schema.n_features), dtype=self.schema.dtype)
+        return X
+
+    def _predict_buffer(self, fill, metric):
+        """Arma la entrada en una matriz preasignada y predice"""
+        t0 = time.perf_counter()
+        try:
+            X = fill()
+            proba = self.model.predict(X)
+        except Exception as e:
+            print(f"MLScorer predict error: {e}")
+            return None
+        self.latency.record(metric, time.perf_counter() - t0)
+        return proba
+
+    def predict_last(self, feature_df, n=1):
+        """Score de las últimas n filas (modo live: el runner solo usa la última)
+
+        Copia las columnas del schema directamente a una matriz preasignada,
+        sin armar un DataFrame intermedio.
+        """
+        n = min(n, len(feature_df))
+        if self.model is None or n == 0:
+            return np.zeros(n)
+        proba = self._predict_buffer(lambda: self.schema.matrix(feature_df, last=n, out=self._buffer(n)), "ml.predict_last")
+        return np.zeros(n) if proba is None else proba
+
+    def score_row(self, row) -> float:
+        """Score de una sola fila (dict de IndicatorEngine.update o Series)"""
+        if self.model is None:
+            return 0.0
+        proba = self._predict_buffer(lambda: self.schema.row(row, out=self._buffer(1)), "ml.score_row")
+        return 0.0 if proba is None else float(proba[0])
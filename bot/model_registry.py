@@ -0,0 +1,99 @@
+"""Registro versionado de modelos ML
+Cada entrenamiento se guarda en su propia versión (models/registry/v0001/...)
+con metadata (ventana de entrenamiento, features, AUC) y un puntero CURRENT
+que se actualiza de forma atómica; MLScorer lo vigila para recargar en caliente.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+REGISTRY_DIR = "models/registry"
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+
+# Archivos de modelo dentro de una versión, en orden de preferencia
+# (.npz no necesita lightgbm, ver bot/tree_model.py)
+MODEL_FILES = ("model.npz", "model.pkl")
+
+
+def _canonical_name(path) -> str:
+    """Nombre dentro de la versión: model.pkl / model.npz / model.schema.json"""
+    name = Path(path).name
+    if name.endswith(".schema.json"):
+        return "model.schema.json"
+    suffix = Path(name).suffix
+    if suffix in (".pkl", ".npz"):
+        return f"model{suffix}"
+    return name
+
+
+def _atomic_write(path: Path, text: str):
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """Versiones de modelo bajo `root` (un directorio por versión + puntero CURRENT)"""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+
+    def versions(self) -> list:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and (p / META_FILE).exists())
+
+    def current_version(self):
+        try:
+            return (self.root / CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def meta(self, version: str) -> dict:
+        return json.loads((self.root / version / META_FILE).read_text())
+
+    def model_path(self, version: str) -> Path:
+        for name in MODEL_FILES:
+            path = self.root / version / name
+            if path.exists():
+                return path
+        raise FileNotFoundError(f"Versión {version} sin archivo de modelo")
+
+    def register(self, files, meta: dict, activate: bool = True) -> str:
+        """Copia los archivos del modelo a una versión nueva y (opcional) la activa
+
+        Args:
+            files: Archivos a guardar (modelo .pkl / .npz y su .schema.json)
+            meta: Metadata (train_start/train_end, features, auc, ...)
+            activate: Apuntar CURRENT a la versión nueva
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        existing = self.versions()
+        number = int(existing[-1][1:]) + 1 if existing else 1
+        version = f"v{number:04d}"
+        # se arma en un directorio temporal y se renombra: nunca hay versiones a medias
+        tmp = self.root / f".{version}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        for f in files:
+            shutil.copy2(f, tmp / _canonical_name(f))
+        meta = {"version": version, "created_at": time.strftime("%Y-%m-%d %H:%M:%S"), **meta}
+        (tmp / META_FILE).write_text(json.dumps(meta, indent=2, default=str))
+        os.replace(tmp, self.root / version)
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        """Cambia la versión en uso (rollback incluido) con un reemplazo atómico de CURRENT"""
+        if not (self.root / version / META_FILE).exists():
+            raise ValueError(f"Versión inexistente: {version}")
+        _atomic_write(self.root / CURRENT_FILE, version + "\n")
+
+    def signature(self):
+        """Cambia cuando cambia la versión activa (para el watcher de MLScorer)"""
+        return self.current_version()
@@ -1,22 +1,38 @@
 """Monitor de balances periódico del exchange"""
 
 import asyncio
-from bot.logger import log_balance, log_error, get_test_mode
+from bot.logger import log_balance, log_error, log_info, get_test_mode
+from bot.rate_limit import LIMITER
 
 
 async def print_balances_periodic(exchange, interval=60):
     """Monitorea y registra el balance del exchange cada X segundos
-    
+
+    Lee del cache compartido de balances: acepta snapshots de hasta `interval`
+    segundos, así no agrega requests a la cuenta si el runner ya consultó.
+
     Args:
         exchange: Instancia del Exchange
         interval: Segundos entre chequeos (default 60)
     """
     while True:
         try:
-            b = await exchange.get_balances()
+            b = await exchange.get_balances(max_age=interval)
             usdt = b.get('USDT', 0.0)
             btc = b.get('BTC', 0.0)
             log_balance(usdt, btc, source="periodic_monitor")
+            st = exchange.balances.stats()
+            log_info(
+                f"Balance cache: edad={st['age_s']:.1f}s stream={st['streaming']} "
+                f"fetches={st['fetches']} hits={st['hits']} eventos={st['events']}",
+                context="balance_monitor"
+            )
+            rl = LIMITER.stats()
+            log_info(
+                f"Rate limit: peso_usado={rl['used_weight']} cola={rl['queue_depth']} "
+                f"(max {rl['max_queue_depth']}) 429={rl['throttled']} 418={rl['bans']}",
+                context="rate_limit"
+            )
         except Exception as e:
             log_error(f"Failed to fetch balances: {str(e)}", context="balance_monitor")
         await asyncio.sleep(interval)
@@ -0,0 +1,139 @@
+"""Cuantizador de órdenes por símbolo
+Ajusta cantidades/precios a stepSize/tickSize con aritmética entera escalada:
+una cantidad se representa como un entero de "unidades" (qty * 10^step_decimals)
+y se formatea al wire sin pasar por Decimal ni rstrip de strings.
+"""
+
+import math
+from decimal import Decimal, ROUND_UP
+
+# Distancia relativa a un entero por debajo de la cual el resultado en float
+# es ambiguo y se recalcula exacto con Decimal (mismo resultado que el path viejo)
+_AMBIGUOUS_EPS = 1e-12
+
+
+def _dec(x) -> Decimal:
+    return Decimal(str(x))
+
+
+def _steps(n: float, ceil, exact, *args) -> int:
+    """Redondea n (cantidad de steps en float) a entero, usando `exact(*args)` si
+    está demasiado cerca de un entero como para confiar en el float"""
+    r = round(n)
+    if abs(n - r) <= _AMBIGUOUS_EPS * (n if n > 1.0 else 1.0):
+        return int(exact(*args))
+    return math.ceil(n) if ceil else math.floor(n)
+
+
+def _render(units: int, decimals: int) -> str:
+    """Entero escalado -> string decimal sin ceros sobrantes ("1230", 5 -> "0.0123")"""
+    if decimals == 0:
+        return str(units)
+    sign = "-" if units < 0 else ""
+    whole, frac = divmod(abs(units), 10 ** decimals)
+    frac_str = f"{frac:0{decimals}d}".rstrip("0")
+    return f"{sign}{whole}.{frac_str}" if frac_str else f"{sign}{whole}"
+
+
+class OrderQuantizer:
+    """Cuantizador precalculado a partir de SymbolFilters
+
+    Cantidades en unidades de 10^-step_decimals y precios en unidades de
+    10^-tick_decimals. Todos los métodos `*_qty` devuelven unidades enteras
+    ya múltiplo del stepSize.
+    """
+
+    __slots__ = (
+        "filters", "qty_decimals", "qty_scale", "step_units", "step_size",
+        "price_decimals", "price_scale", "tick_units", "tick_size", "min_notional",
+    )
+
+    def __init__(self, filters):
+        self.filters = filters
+        self.qty_decimals = filters.step_decimals
+        self.qty_scale = 10 ** self.qty_decimals
+        self.step_units = int(filters.step_size * self.qty_scale)
+        self.step_size = filters.step_size
+        self.price_decimals = filters.tick_decimals
+        self.price_scale = 10 ** self.price_decimals
+        self.tick_units = int(filters.tick_size * self.price_scale)
+        self.tick_size = filters.tick_size
+        self.min_notional = filters.min_notional
+
+        # tickSize/stepSize = 0 significa filtro deshabilitado: usar 8 decimales
+        if self.step_units <= 0:
+            self.qty_decimals, self.qty_scale, self.step_units = 8, 10 ** 8, 1
+            self.step_size = Decimal(1).scaleb(-8)
+        if self.tick_units <= 0:
+            self.price_decimals, self.price_scale, self.tick_units = 8, 10 ** 8, 1
+            self.tick_size = Decimal(1).scaleb(-8)
+
+    # -----------------------------
+    # PATH EXACTO (Decimal, solo cerca de un múltiplo del step)
+    # -----------------------------
+    @staticmethod
+    def _exact_floor(value, step):
+        return _dec(value) // step
+
+    def _exact_quote(self, quote, price, margin, cap):
+        spend_d = _dec(quote) * _dec(margin)
+        if cap is not None:
+            spend_d = min(spend_d, _dec(cap))
+        return (spend_d / _dec(price)) // self.step_size
+
+    def _exact_min_notional(self, price):
+        min_qty = _dec(self.min_notional) / _dec(price)
+        return (min_qty / self.step_size).to_integral_value(rounding=ROUND_UP)
+
+    # -----------------------------
+    # CANTIDADES
+    # -----------------------------
+    def floor_qty(self, qty: float) -> int:
+        """Floor de qty al múltiplo de stepSize"""
+        n = qty * self.qty_scale / self.step_units
+        return _steps(n, False, self._exact_floor, qty, self.step_size) * self.step_units
+
+    def floor_qty_for_quote(self, quote: float, price: float, margin: float = 1.0, cap: float = None) -> int:
+        """Floor de (min(quote * margin, cap) / price) al stepSize"""
+        spend = quote * margin
+        if cap is not None and cap < spend:
+            spend = cap
+        n = spend * self.qty_scale / price / self.step_units
+        return _steps(n, False, self._exact_quote, quote, price, margin, cap) * self.step_units
+
+    def min_notional_qty(self, price: float) -> int:
+        """Menor qty múltiplo de stepSize cuyo valor alcanza minNotional (ceil)"""
+        n = self.min_notional * self.qty_scale / price / self.step_units
+        return _steps(n, True, self._exact_min_notional, price) * self.step_units
+
+    def bump_to_min_notional(self, units: int, price: float) -> int:
+        """Eleva la qty al mínimo que cumple minNotional si no lo alcanza"""
+        if self.notional(units, price) < self.min_notional:
+            return self.min_notional_qty(price)
+        return units
+
+    def qty_float(self, units: int) -> float:
+        return units / self.qty_scale
+
+    def render_qty(self, units: int) -> str:
+        """Formato wire de la cantidad ("0.00016", "12")"""
+        return _render(units, self.qty_decimals)
+
+    def notional(self, units: int, price: float) -> float:
+        """Valor en quote de una qty en unidades"""
+        return units * price / self.qty_scale
+
+    # -----------------------------
+    # PRECIOS
+    # -----------------------------
+    def floor_price(self, price: float) -> int:
+        """Floor del precio al múltiplo de tickSize (en unidades de precio)"""
+        n = price * self.price_scale / self.tick_units
+        return _steps(n, False, self._exact_floor, price, self.tick_size) * self.tick_units
+
+    def price_float(self, units: int) -> float:
+        return units / self.price_scale
+
+    def render_price(self, units: int) -> str:
+        """Formato wire del precio ("63091.88")"""
+        return _render(units, self.price_decimals)
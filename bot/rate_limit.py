@@ -0,0 +1,265 @@
+"""Rate limiter por peso de request para todo el tráfico REST a Binance
+Token bucket de peso (REQUEST_WEIGHT por minuto) + bucket de órdenes (ORDERS
+por 10 s), sincronizado con los headers X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S
+que devuelve el servidor. Las órdenes tienen prioridad sobre la market data
+y ante un 429/418 se pausa todo el tráfico hasta el Retry-After.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from bot.metrics import LatencyStats
+
+# Límites de Binance Spot (se usa SAFETY del total para dejar margen)
+WEIGHT_LIMIT_1M = int(os.getenv("BINANCE_WEIGHT_LIMIT", 6000))
+ORDER_LIMIT_10S = int(os.getenv("BINANCE_ORDER_LIMIT_10S", 100))
+RATE_LIMIT_SAFETY = float(os.getenv("RATE_LIMIT_SAFETY", 0.9))
+
+# Prioridades (menor = se despacha primero)
+PRIORITY_ORDER = 0  # colocar / cancelar órdenes
+PRIORITY_ACCOUNT = 1  # cuenta, estado de órdenes, listenKey
+PRIORITY_MARKET = 2  # klines, ticker, exchangeInfo
+PRIORITY_NAMES = {PRIORITY_ORDER: "order", PRIORITY_ACCOUNT: "account", PRIORITY_MARKET: "market"}
+
+# (método, path) -> peso (REQUEST_WEIGHT de la documentación de Spot)
+ENDPOINT_WEIGHTS = {
+    ("GET", "/api/v3/ping"): 1,
+    ("GET", "/api/v3/time"): 1,
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/klines"): 2,
+    ("GET", "/api/v3/ticker/price"): 2,  # 4 con varios símbolos (ver endpoint_weight)
+    ("GET", "/api/v3/account"): 20,
+    ("POST", "/api/v3/order"): 1,
+    ("GET", "/api/v3/order"): 4,
+    ("DELETE", "/api/v3/order"): 1,
+    ("POST", "/api/v3/userDataStream"): 2,
+    ("PUT", "/api/v3/userDataStream"): 2,
+    ("DELETE", "/api/v3/userDataStream"): 2,
+}
+
+# métodos de binance.spot.Spot -> endpoint (backend sdk)
+SDK_METHOD_ENDPOINTS = {
+    "ping": ("GET", "/api/v3/ping"),
+    "time": ("GET", "/api/v3/time"),
+    "exchange_info": ("GET", "/api/v3/exchangeInfo"),
+    "klines": ("GET", "/api/v3/klines"),
+    "ticker_price": ("GET", "/api/v3/ticker/price"),
+    "account": ("GET", "/api/v3/account"),
+    "new_order": ("POST", "/api/v3/order"),
+    "get_order": ("GET", "/api/v3/order"),
+    "cancel_order": ("DELETE", "/api/v3/order"),
+    "new_listen_key": ("POST", "/api/v3/userDataStream"),
+    "renew_listen_key": ("PUT", "/api/v3/userDataStream"),
+    "close_listen_key": ("DELETE", "/api/v3/userDataStream"),
+}
+
+
+def endpoint_weight(method: str, path: str, params: dict = None) -> int:
+    """Peso de un request; desconocidos cuentan 1"""
+    weight = ENDPOINT_WEIGHTS.get((method, path), 1)
+    if path == "/api/v3/ticker/price" and params and "symbol" not in params:
+        weight = 4
+    return weight
+
+
+def endpoint_priority(method: str, path: str) -> int:
+    if path == "/api/v3/order" and method in ("POST", "DELETE"):
+        return PRIORITY_ORDER
+    if path in ("/api/v3/account", "/api/v3/order", "/api/v3/userDataStream"):
+        return PRIORITY_ACCOUNT
+    return PRIORITY_MARKET
+
+
+def _header(headers, name):
+    """Lookup case-insensitive (aiohttp, requests y dicts planos)"""
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        lname = name.lower()
+        for k, v in headers.items():
+            if k.lower() == lname:
+                return v
+    return value
+
+
+class RateLimiter:
+    """Scheduler de requests con token buckets y cola por prioridad
+
+    - `acquire(weight, priority, orders)`: espera turno (async).
+    - `wait_sync(weight, orders)`: versión bloqueante para código sincrónico.
+    - `update(headers)`: sincroniza con el peso usado que informa el servidor.
+    - `penalize(status, retry_after)`: pausa todo tras un 429 / 418.
+    - `stats()`: profundidad de cola, peso usado y tiempos de espera.
+    """
+
+    def __init__(
+        self,
+        weight_limit: int = WEIGHT_LIMIT_1M,
+        order_limit: int = ORDER_LIMIT_10S,
+        safety: float = RATE_LIMIT_SAFETY,
+    ):
+        self.weight_capacity = weight_limit * safety
+        self.weight_rate = self.weight_capacity / 60.0  # tokens por segundo
+        self.order_capacity = order_limit * safety
+        self.order_rate = self.order_capacity / 10.0
+        self._weight_tokens = self.weight_capacity
+        self._order_tokens = self.order_capacity
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+
+        self._lock = threading.Lock()  # el estado se comparte con threads (SDK / scripts)
+        self._queue = []  # heap (priority, seq, weight, orders, future)
+        self._seq = itertools.count()
+        self._timer = None
+
+        self.latency = LatencyStats()
+        self.max_queue_depth = 0
+        self.used_weight = None  # último X-MBX-USED-WEIGHT-1M recibido
+        self.order_count = None  # último X-MBX-ORDER-COUNT-10S recibido
+        self.throttled = 0  # respuestas 429
+        self.bans = 0  # respuestas 418
+
+    # -----------------------------
+    # BUCKETS
+    # -----------------------------
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._weight_tokens = min(self.weight_capacity, self._weight_tokens + elapsed * self.weight_rate)
+            self._order_tokens = min(self.order_capacity, self._order_tokens + elapsed * self.order_rate)
+            self._refilled_at = now
+
+    def _delay(self, weight, orders, now):
+        """Segundos hasta poder despachar (0 = ya); llamar con el lock tomado"""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        weight = min(weight, self.weight_capacity)
+        orders = min(orders, self.order_capacity)
+        delay = 0.0
+        if self._weight_tokens < weight:
+            delay = (weight - self._weight_tokens) / self.weight_rate
+        if orders and self._order_tokens < orders:
+            delay = max(delay, (orders - self._order_tokens) / self.order_rate)
+        return delay
+
+    def _consume(self, weight, orders):
+        self._weight_tokens -= weight
+        self._order_tokens -= orders
+
+    # -----------------------------
+    # ADQUISICIÓN
+    # -----------------------------
+    async def acquire(self, weight: int = 1, priority: int = PRIORITY_MARKET, orders: int = 0):
+        """Espera hasta que el request pueda enviarse sin exceder los límites
+
+        Args:
+            weight: Peso del request (ver endpoint_weight)
+            priority: PRIORITY_ORDER / PRIORITY_ACCOUNT / PRIORITY_MARKET
+            orders: Órdenes que consume (1 para POST /api/v3/order)
+        """
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        fut = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), weight, orders, fut))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # la entrada cancelada se descarta en el próximo _dispatch
+            self._dispatch()
+            raise
+        self.latency.record(f"ratelimit.wait.{PRIORITY_NAMES.get(priority, priority)}", loop.time() - t0)
+
+    def _dispatch(self):
+        """Libera en orden de prioridad todo lo que entra en los buckets"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        with self._lock:
+            while self._queue:
+                _, _, weight, orders, fut = self._queue[0]
+                if fut.done():
+                    heapq.heappop(self._queue)
+                    continue
+                delay = self._delay(weight, orders, time.monotonic())
+                if delay > 0:
+                    # la cabeza bloquea al resto: así una orden nunca espera detrás de market data
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                    return
+                heapq.heappop(self._queue)
+                self._consume(weight, orders)
+                fut.set_result(None)
+
+    def wait_sync(self, weight: int = 1, orders: int = 0):
+        """Versión bloqueante de acquire (sin cola de prioridad): scripts y SDK sincrónico"""
+        t0 = time.monotonic()
+        while True:
+            with self._lock:
+                delay = self._delay(weight, orders, time.monotonic())
+                if delay <= 0:
+                    self._consume(weight, orders)
+                    break
+            time.sleep(delay)
+        self.latency.record("ratelimit.wait.sync", time.monotonic() - t0)
+
+    # -----------------------------
+    # FEEDBACK DEL SERVIDOR
+    # -----------------------------
+    def update(self, headers):
+        """Ajusta los buckets al peso/órdenes que el servidor dice que ya usamos
+        (incluye tráfico de otros procesos con la misma IP / API key)"""
+        used = _header(headers, "X-MBX-USED-WEIGHT-1M")
+        count = _header(headers, "X-MBX-ORDER-COUNT-10S")
+        with self._lock:
+            self._refill(time.monotonic())
+            if used is not None:
+                self.used_weight = int(used)
+                self._weight_tokens = min(self._weight_tokens, self.weight_capacity - self.used_weight)
+            if count is not None:
+                self.order_count = int(count)
+                self._order_tokens = min(self._order_tokens, self.order_capacity - self.order_count)
+
+    def penalize(self, status: int, retry_after=None):
+        """429 (rate limit) / 418 (IP baneada): pausar todo hasta Retry-After"""
+        if status == 418:
+            self.bans += 1
+            default = 120.0
+        else:
+            self.throttled += 1
+            default = 60.0
+        seconds = float(retry_after) if retry_after is not None else default
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._weight_tokens = min(self._weight_tokens, 0.0)
+        print(f"[WARN] RateLimiter: HTTP {status}, pausando requests {seconds:.0f}s")
+
+    def observe(self, status: int, headers):
+        """Procesa status + headers de cualquier respuesta"""
+        self.update(headers)
+        if status in (418, 429):
+            self.penalize(status, _header(headers, "Retry-After"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "weight_tokens": self._weight_tokens,
+                "used_weight": self.used_weight,
+                "order_count": self.order_count,
+                "paused_s": max(0.0, self._paused_until - time.monotonic()),
+                "throttled": self.throttled,
+                "bans": self.bans,
+                "wait": self.latency.summary(),
+            }
+
+
+# Limiter compartido por todo el proceso (Exchange, data_source, transport)
+LIMITER = RateLimiter()
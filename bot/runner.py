@@ -6,11 +6,12 @@ Maneja la ejecución del loop estratégico en modo TEST/PROD
 import argparse
 import asyncio
 import os
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from bot.exchange import Exchange
-from bot.strategy import build_signals, compute_features
-from bot.ml_scorer import MLScorer
+from bot.strategy import build_signals, FeaturePipeline
+from bot.ml_scorer import MLScorer, MODEL_RELOAD_INTERVAL
 from bot.monitor import print_balances_periodic
 from bot.simulator import Simulator
 from bot.logger import (
@@ -18,7 +19,9 @@ from bot.logger import (
     get_test_mode, get_log_filepath
 )
 from datetime import datetime
-from bot.data_source import get_latest_klines
+from bot.data_source import get_latest_klines, get_kline_store
+from bot.market_stream import KlineStream
+from bot.candle_store import STORE_DIR
 
 load_dotenv()
 
@@ -33,33 +36,113 @@ async def strategy_loop(args):
     sim = Simulator(start_usdt=1000.0) if args.dry == "sim" else None
     monitor = asyncio.create_task(print_balances_periodic(ex, interval=60))
     ml = MLScorer(os.getenv("MODEL_PATH"))
+    features = FeaturePipeline()  # una sola pasada de features por ventana de velas
+    # modelo nuevo (reentrenado / versión activada en el registro) sin reiniciar el bot
+    ml_watch = asyncio.create_task(ml.watch()) if ml.model_path and MODEL_RELOAD_INTERVAL > 0 else None
     
     test_mode = get_test_mode()
     log_info(
         f"Bot iniciado en modo {test_mode} | Enviroment: {args.mode} | Dry: {args.dry}",
         context="startup"
     )
-    
+
+    if ml.version:
+        log_info(f"Modelo ML {ml.version} cargado desde {ml.model_path}", context="startup")
+
+    # Precargar filtros del símbolo (un solo exchangeInfo para toda la sesión)
+    try:
+        await ex.load_symbols([os.getenv("SYMBOL", "BTCUSDT")])
+    except Exception as e:
+        log_error(f"No se pudieron precargar filtros: {str(e)}", context="startup")
+
+    # En producción las órdenes LIMIT esperan el fill por WebSocket (fallback: polling REST)
+    if args.dry == "none":
+        try:
+            await ex.start_user_stream()
+        except Exception as e:
+            log_error(f"User data stream no disponible, se usará polling: {str(e)}", context="startup")
+
+    # Feed de velas: WebSocket (señales al cierre de cada vela, stop loss intra-bar)
+    # o polling REST cada 60 s
+    kline_stream = None
+    if args.feed == "stream":
+        try:
+            store = get_kline_store(os.getenv("SYMBOL", "BTCUSDT"), "5m")
+            kline_stream = await KlineStream(store, intrabar=True).start()
+        except Exception as e:
+            log_error(f"Kline stream no disponible, se usará polling: {str(e)}", context="startup")
+
+    async def wait_next_tick():
+        # con stream el próximo tick lo marca next_event() al inicio del loop
+        if kline_stream is None:
+            await asyncio.sleep(60)
+
+    async def check_stop_loss(symbol, price):
+        """Stop loss real; True si se ejecutó la venta"""
+        if not ex.check_stop_loss(symbol, price):
+            return False
+        bals = await ex.get_balances()
+        btc_bal = bals.get("BTC", 0.0)
+        if btc_bal <= 0:
+            return False
+        log_info(
+            f"Stop loss activado en {symbol} a ${price:.2f}",
+            context="stop_loss"
+        )
+        await ex.market_sell(symbol, btc_bal)
+        log_trade(
+            trade_type="SELL",
+            symbol=symbol,
+            quantity=str(btc_bal),
+            price=price,
+            amount_usdt=btc_bal * price,
+            status="EXECUTED_STOP_LOSS"
+        )
+        return True
+
     try:
         data_path = "data/raw/klines.csv"
         while True:
-            if not os.path.exists(data_path):
-                log_info(f"Esperando datos en {data_path}", context="data_source")
+            if not os.path.exists(data_path) and not os.path.isdir(STORE_DIR):
+                log_info(f"Esperando datos en {data_path} o {STORE_DIR}", context="data_source")
                 await asyncio.sleep(5)
                 continue
-            
-            df = get_latest_klines(symbol=os.getenv("SYMBOL", "BTCUSDT"), interval="5m")
+
+            if kline_stream is not None:
+                event = await kline_stream.next_event()
+                if event["type"] == "update":
+                    # vela en curso: solo stop loss con el último precio
+                    if args.dry == "sim":
+                        if sim.btc > 0 and sim.check_stop_loss(event["close"]):
+                            r = sim.sell_market(event["close"], sim.btc)
+                            log_trade(
+                                trade_type="SELL",
+                                symbol=os.getenv("SYMBOL", "BTCUSDT"),
+                                quantity=str(r.get('qty', 0)),
+                                price=event["close"],
+                                amount_usdt=r.get('usdt', 0),
+                                status="SIMULATED_STOP_LOSS"
+                            )
+                    elif args.dry != "log":
+                        await check_stop_loss(os.getenv("SYMBOL", "BTCUSDT"), event["close"])
+                    continue
+                # vela cerrada: evaluar solo sobre velas cerradas
+                df = kline_stream.store.frame(closed_only=True)
+            else:
+                df = get_latest_klines(symbol=os.getenv("SYMBOL", "BTCUSDT"), interval="5m")
             if df.empty:
                 await asyncio.sleep(5)
                 continue
             
-            feats = compute_features(df)
+            feats = features(df)
             if len(feats) == 0:
                 await asyncio.sleep(5)
                 continue
             
-            ml_scores = ml.predict(feats)
-            sig_df = build_signals(df, ml_scores=ml_scores)
+            # solo se usa la última fila: se puntúa únicamente esa
+            ml_scores = np.zeros(len(feats))
+            ml_scores[-1:] = ml.predict_last(feats)
+            sig_df = build_signals(df, ml_scores=ml_scores, features=feats)
             last = sig_df.iloc[-1]
             sig = int(last["final"])
             price = float(last["close"])
@@ -90,28 +173,12 @@ async def strategy_loop(args):
                         amount_usdt=r.get('usdt', 0),
                         status="SIMULATED_STOP_LOSS"
                     )
-                    await asyncio.sleep(60)
+                    await wait_next_tick()
                     continue
             elif args.dry != "log":
                 # Verificar stop loss en modo real
-                bals = await ex.get_balances()
-                has_position = bals.get("BTC", 0.0) > 0
-                if has_position and ex.check_stop_loss(symbol, price):
-                    log_info(
-                        f"Stop loss activado en {symbol} a ${price:.2f}",
-                        context="stop_loss"
-                    )
-                    btc_bal = bals.get("BTC", 0.0)
-                    await ex.market_sell(symbol, btc_bal)
-                    log_trade(
-                        trade_type="SELL",
-                        symbol=symbol,
-                        quantity=str(btc_bal),
-                        price=price,
-                        amount_usdt=btc_bal * price,
-                        status="EXECUTED_STOP_LOSS"
-                    )
-                    await asyncio.sleep(60)
+                if await check_stop_loss(symbol, price):
+                    await wait_next_tick()
                     continue
             
             # Log de señal (después de verificar stop loss)
@@ -127,7 +194,7 @@ async def strategy_loop(args):
                         f"Signal={sig} Price={price:.2f} [NO EXECUTION]",
                         context="test_log_only"
                     )
-                await asyncio.sleep(60)
+                await wait_next_tick()
                 continue  # saltar ejecución
 
             # ---------------------------
@@ -205,11 +272,17 @@ async def strategy_loop(args):
                         except Exception as e:
                             log_error(f"Sell execution failed: {str(e)}", context="prod_sell")
 
-            await asyncio.sleep(60)
+            await wait_next_tick()
     finally:
         # cancelar el monitor al terminar
         monitor.cancel()
         await asyncio.gather(monitor, return_exceptions=True)
+        if ml_watch is not None:
+            ml_watch.cancel()
+            await asyncio.gather(ml_watch, return_exceptions=True)
+        if kline_stream is not None:
+            await kline_stream.stop()
+        await ex.close()
 
 
 if __name__ == "__main__":
@@ -228,6 +301,12 @@ if __name__ == "__main__":
         default=os.getenv("DRY", "log"),
         help="Modo dry-run: none=real, log=solo logs, sim=simulador"
     )
+    p.add_argument(
+        "--feed",
+        choices=["stream", "poll"],
+        default=os.getenv("MARKET_FEED", "stream"),
+        help="Velas: stream=WebSocket (evalúa al cierre de vela), poll=REST cada 60 s"
+    )
     args = p.parse_args()
 
     # Log de inicialización
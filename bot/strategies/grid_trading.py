@@ -4,6 +4,7 @@ Coloca órdenes de compra/venta en una grilla de precios
 """
 
 import os
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -75,6 +76,26 @@ class GridStrategy:
         
         return 0, None, "No action - waiting for grid level"
     
+    def touches(self, prices):
+        """Parte de precio de get_signal, vectorizada sobre un array de precios
+
+        Para cada precio, índice en grid_levels del nivel más cercano si está
+        dentro del rango y a menos de 0.1% del step (mismo criterio que
+        get_signal, empates al nivel inferior como min()); -1 si no toca ninguno.
+        """
+        prices = np.asarray(prices, dtype=float)
+        levels = np.asarray(self.grid_levels, dtype=float)
+        j = np.clip(np.searchsorted(levels, prices), 1, len(levels) - 1)
+        use_upper = np.abs(levels[j] - prices) < np.abs(levels[j - 1] - prices)
+        closest = np.where(use_upper, j, j - 1)
+        distance = np.abs(prices - levels[closest])
+        hit = (prices >= self.lower_price) & (prices <= self.upper_price) & (distance < self.grid_step * 0.001)
+        return np.where(hit, closest, -1)
+
+    def sellable_levels(self):
+        """Por nivel: si get_signal puede vender ahí (next_level_up está en la grilla, comparación exacta)"""
+        return [level + self.grid_step in self.grid_levels for level in self.grid_levels]
+
     def execute_buy(self, level: float):
         """Marca nivel como comprado"""
         if level in self.positions:
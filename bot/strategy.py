@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 import os
+from collections import OrderedDict
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -60,7 +62,70 @@ def compute_features(df: pd.DataFrame):
     df = df.dropna().reset_index(drop=True)
     return df
 
-def rule_signal(row):
+def _window_key(df: pd.DataFrame):
+    """Identidad barata de una ventana de velas: tamaño, columnas, extremos y suma de close"""
+    if df.empty:
+        return (0, tuple(df.columns))
+    first, last = df.iloc[0], df.iloc[-1]
+    return (
+        len(df),
+        tuple(df.columns),
+        str(first.get('open_time', first['close'])),
+        str(last.get('open_time', '')),
+        float(last['close']),
+        float(last['volume']) if 'volume' in df.columns else None,
+        float(df['close'].astype(float).sum()),
+    )
+
+class FeaturePipeline:
+    """compute_features con memo por ventana de entrada
+
+    Llamarlo dos veces con la misma ventana (mismo tramo de velas) devuelve el
+    mismo DataFrame sin recalcular. El resultado es compartido: quien lo
+    modifique debe trabajar sobre una copia (build_signals ya lo hace).
+    """
+
+    def __init__(self, maxsize: int = 4):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        key = _window_key(df)
+        feats = self._cache.get(key)
+        if feats is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return feats
+        self.misses += 1
+        feats = compute_features(df)
+        self._cache[key] = feats
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return feats
+
+@dataclass(frozen=True)
+class RuleConfig:
+    """Umbrales de rule_signal resueltos una sola vez (no por fila)"""
+
+    use_trend_filter: bool = True
+    use_ml_filter: bool = False
+    ml_threshold: float = 0.5
+    rsi2_buy_level: float = 10.0
+    rsi2_sell_level: float = 90.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            use_trend_filter=os.getenv("USE_TREND_FILTER", "true").lower() == "true",
+            use_ml_filter=os.getenv("USE_ML_FILTER", "false").lower() == "true",
+            ml_threshold=float(os.getenv("ML_THRESHOLD", "0.5")),
+            rsi2_buy_level=float(os.getenv("RSI2_BUY_LEVEL", "10")),
+            rsi2_sell_level=float(os.getenv("RSI2_SELL_LEVEL", "90")),
+        )
+
+def rule_signal(row, config=None):
     """RSI(2) Mean Reversion Strategy
     
     BUY: RSI(2) < 10 (extreme oversold)
@@ -70,40 +135,70 @@ def rule_signal(row):
     - Trend: Only buy if price > SMA200 (long-term uptrend)
     - ML: Optional ML filter
     """
-    use_trend_filter = os.getenv("USE_TREND_FILTER", "true").lower() == "true"
-    use_ml_filter = os.getenv("USE_ML_FILTER", "false").lower() == "true"
-    ml_threshold = float(os.getenv("ML_THRESHOLD", "0.5"))
-    
-    rsi2_buy_level = float(os.getenv("RSI2_BUY_LEVEL", "10"))
-    rsi2_sell_level = float(os.getenv("RSI2_SELL_LEVEL", "90"))
+    cfg = config or RuleConfig.from_env()
     
     # BUY: RSI(2) oversold
-    if row['rsi2'] < rsi2_buy_level:
+    if row['rsi2'] < cfg.rsi2_buy_level:
         # Trend filter: only buy in long-term uptrend
-        if use_trend_filter and row['close'] <= row['sma200']:
+        if cfg.use_trend_filter and row['close'] <= row['sma200']:
             return 0
         
         # ML filter
-        if use_ml_filter and row['ml_score'] < ml_threshold:
+        if cfg.use_ml_filter and row['ml_score'] < cfg.ml_threshold:
             return 0
         
         return 1
     
     # SELL: RSI(2) overbought
-    if row['rsi2'] > rsi2_sell_level:
+    if row['rsi2'] > cfg.rsi2_sell_level:
         return -1
     
     return 0
 
-def build_signals(df, ml_scores=None, ml_thresh=0.5):
-    df2 = compute_features(df)
+def rule_signals(df, config=None):
+    """rule_signal vectorizado: mismas reglas sobre columnas completas
+
+    Args:
+        df: DataFrame o dict de arrays con rsi2, close, sma200 (y ml_score si se filtra por ML)
+
+    Returns:
+        np.ndarray int64 con 1 / -1 / 0 por fila (igual que df.apply(rule_signal, axis=1))
+    """
+    cfg = config or RuleConfig.from_env()
+    rsi2 = np.asarray(df['rsi2'], dtype=float)
+    
+    buy = rsi2 < cfg.rsi2_buy_level
+    if cfg.use_trend_filter:
+        buy &= ~(np.asarray(df['close'], dtype=float) <= np.asarray(df['sma200'], dtype=float))
+    if cfg.use_ml_filter:
+        buy &= ~(np.asarray(df['ml_score'], dtype=float) < cfg.ml_threshold)
+    # la venta solo se evalúa si no hubo sobreventa (aunque un filtro haya bloqueado la compra)
+    sell = ~(rsi2 < cfg.rsi2_buy_level) & (rsi2 > cfg.rsi2_sell_level)
+    
+    out = np.zeros(len(rsi2), dtype=np.int64)
+    out[buy] = 1
+    out[sell] = -1
+    return out
+
+def build_signals(df, ml_scores=None, ml_thresh=0.5, features=None, config=None):
+    """Señales sobre las velas de df
+
+    Args:
+        features: Salida de compute_features / FeaturePipeline para el mismo df
+            (evita recalcularla si ya se usó para el ML scorer)
+        config: RuleConfig (default: umbrales del entorno)
+    """
+    if features is None:
+        df2 = compute_features(df)
+    else:
+        df2 = features.copy(deep=False)  # solo se agregan columnas: el original no cambia
     
     if ml_scores is not None and len(ml_scores) == len(df2):
         df2['ml_score'] = ml_scores
     else:
         df2['ml_score'] = 0.0
     
-    df2['rule'] = df2.apply(rule_signal, axis=1)
+    df2['rule'] = rule_signals(df2, config)
     df2['final'] = df2['rule']
     
     return df2
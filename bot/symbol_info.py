@@ -0,0 +1,160 @@
+"""Registro de metadata de símbolos (filtros de exchangeInfo)
+Parsea LOT_SIZE / PRICE_FILTER / NOTIONAL una sola vez y los comparte
+entre todos los métodos de Exchange, con TTL y refresh ante errores de filtro.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from bot.quantizer import OrderQuantizer
+
+# Segundos que una entrada se considera fresca (exchangeInfo cambia muy poco)
+SYMBOL_INFO_TTL = float(os.getenv("SYMBOL_INFO_TTL", 3600))
+
+# Código de Binance para "Filter failure: ..." (LOT_SIZE, PRICE_FILTER, NOTIONAL)
+FILTER_FAILURE_CODE = -1013
+
+
+def _decimals(step_str: str) -> int:
+    """Cantidad de decimales significativos de un step/tick ("0.00010000" -> 4)"""
+    if "." not in step_str:
+        return 0
+    return len(step_str.rstrip("0").split(".")[1])
+
+
+@dataclass(frozen=True)
+class SymbolFilters:
+    """Filtros de un símbolo ya convertidos a Decimal/float listos para usar"""
+
+    symbol: str
+    step_size_str: str
+    step_size: Decimal
+    step_decimals: int
+    min_qty: Decimal
+    tick_size_str: str
+    tick_size: Decimal
+    tick_decimals: int
+    min_notional: float
+
+    @classmethod
+    def from_symbol_info(cls, info: dict):
+        """Construye los filtros desde una entrada de exchangeInfo()["symbols"]"""
+        filters = {f["filterType"]: f for f in info["filters"]}
+        lot = filters["LOT_SIZE"]
+        price = filters["PRICE_FILTER"]
+        # Símbolos viejos usan MIN_NOTIONAL en lugar de NOTIONAL
+        notional = filters.get("NOTIONAL") or filters.get("MIN_NOTIONAL") or {}
+
+        step_size_str = lot["stepSize"]
+        tick_size_str = price["tickSize"]
+        return cls(
+            symbol=info["symbol"],
+            step_size_str=step_size_str,
+            step_size=Decimal(step_size_str),
+            step_decimals=_decimals(step_size_str),
+            min_qty=Decimal(lot.get("minQty", "0")),
+            tick_size_str=tick_size_str,
+            tick_size=Decimal(tick_size_str),
+            tick_decimals=_decimals(tick_size_str),
+            min_notional=float(notional.get("minNotional", 0.0)),
+        )
+
+
+def is_filter_error(exc: Exception) -> bool:
+    """True si la excepción indica que los filtros cacheados pueden estar desactualizados"""
+    if getattr(exc, "error_code", None) == FILTER_FAILURE_CODE:
+        return True
+    return "Filter failure" in str(exc)
+
+
+class SymbolRegistry:
+    """Cache de SymbolFilters por símbolo con TTL
+
+    - `load(symbols)` hace un único exchangeInfo para todos los símbolos (startup).
+    - `get(symbol)` devuelve la entrada cacheada; si venció, la refresca.
+    - Si el refresh falla y hay una entrada vieja, se sigue usando la vieja.
+    - `invalidate(symbol)` fuerza el refresh en el próximo `get` (ej. tras -1013).
+    - `quantizer(symbol)` devuelve el OrderQuantizer construido sobre esos filtros.
+    """
+
+    def __init__(self, fetch, ttl: float = SYMBOL_INFO_TTL):
+        """
+        Args:
+            fetch: coroutine fetch(symbols: list[str]) -> respuesta de exchangeInfo
+            ttl: Segundos de validez de cada entrada
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self._entries = {}  # symbol -> (SymbolFilters, loaded_at)
+        self._quantizers = {}  # symbol -> OrderQuantizer
+        self._lock = asyncio.Lock()
+        self.fetches = 0
+
+    def _fresh(self, symbol):
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None
+        filters, loaded_at = entry
+        if time.monotonic() - loaded_at > self.ttl:
+            return None
+        return filters
+
+    async def load(self, symbols):
+        """Carga (o recarga) los filtros de varios símbolos con un solo request"""
+        symbols = [s.upper() for s in symbols]
+        info = await self._fetch(symbols)
+        self.fetches += 1
+        now = time.monotonic()
+        loaded = {}
+        for sym_info in info.get("symbols", []):
+            filters = SymbolFilters.from_symbol_info(sym_info)
+            self._entries[filters.symbol] = (filters, now)
+            loaded[filters.symbol] = filters
+        missing = [s for s in symbols if s not in loaded]
+        if missing:
+            raise KeyError(f"exchangeInfo sin datos para: {', '.join(missing)}")
+        return loaded
+
+    async def get(self, symbol) -> SymbolFilters:
+        """Filtros del símbolo, refrescando solo si la entrada venció o fue invalidada"""
+        symbol = symbol.upper()
+        filters = self._fresh(symbol)
+        if filters is not None:
+            return filters
+
+        async with self._lock:
+            # otro caller pudo haberlo refrescado mientras esperábamos el lock
+            filters = self._fresh(symbol)
+            if filters is not None:
+                return filters
+            try:
+                return (await self.load([symbol]))[symbol]
+            except Exception as e:
+                stale = self._entries.get(symbol)
+                if stale is None:
+                    raise
+                print(f"[WARN] SymbolRegistry: refresh de {symbol} falló ({e}), usando filtros cacheados")
+                # reintentar recién después de otro TTL completo
+                self._entries[symbol] = (stale[0], time.monotonic())
+                return stale[0]
+
+    async def quantizer(self, symbol) -> OrderQuantizer:
+        """Cuantizador del símbolo; se reconstruye solo si cambiaron los filtros"""
+        filters = await self.get(symbol)
+        q = self._quantizers.get(filters.symbol)
+        if q is None or q.filters is not filters:
+            q = OrderQuantizer(filters)
+            self._quantizers[filters.symbol] = q
+        return q
+
+    def invalidate(self, symbol=None):
+        """Marca como vencida la entrada de un símbolo (o todas si symbol es None)"""
+        if symbol is None:
+            for sym, (filters, _) in list(self._entries.items()):
+                self._entries[sym] = (filters, float("-inf"))
+            return
+        entry = self._entries.get(symbol.upper())
+        if entry is not None:
+            self._entries[symbol.upper()] = (entry[0], float("-inf"))
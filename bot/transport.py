@@ -0,0 +1,179 @@
+"""Transporte REST asíncrono para Binance Spot (aiohttp)
+Cliente firmado con una sesión keep-alive compartida. Expone los mismos
+nombres/argumentos que binance.spot.Spot para los métodos que usa el bot,
+así Exchange lo usa como backend sin cambiar el resto del código.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import aiohttp
+from yarl import URL
+from bot.rate_limit import LIMITER, endpoint_priority, endpoint_weight
+
+MAINNET_URL = "https://api.binance.com"
+TESTNET_URL = "https://testnet.binance.vision"
+
+
+class BinanceAPIError(Exception):
+    """Error devuelto por la API (mismos atributos que binance.error.ClientError)"""
+
+    def __init__(self, status_code, error_code, error_message, header=None):
+        super().__init__(status_code, error_code, error_message)
+        self.status_code = status_code
+        self.error_code = error_code
+        self.error_message = error_message
+        self.header = header or {}
+
+    def __str__(self):
+        return f"({self.status_code}, {self.error_code}, {self.error_message!r})"
+
+
+class AsyncSpotClient:
+    def __init__(
+        self,
+        api_key=None,
+        api_secret=None,
+        base_url=MAINNET_URL,
+        timeout=10,
+        pool_size=20,
+        recv_window=5000,
+        limiter=None,
+    ):
+        """
+        Args:
+            api_key / api_secret: Credenciales (solo requeridas para endpoints firmados)
+            base_url: URL base REST (mainnet, testnet o un stub local)
+            timeout: Timeout total por request en segundos
+            pool_size: Máximo de conexiones keep-alive simultáneas
+            recv_window: recvWindow en ms para requests firmados
+            limiter: RateLimiter (default: el compartido por el proceso)
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.recv_window = recv_window
+        self.limiter = limiter if limiter is not None else LIMITER
+        self._session = None
+
+    # -----------------------------
+    # SESIÓN
+    # -----------------------------
+    def _get_session(self):
+        # se crea dentro del event loop que la usa (no en __init__)
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            headers = {"X-MBX-APIKEY": self.api_key} if self.api_key else {}
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        """Cierra la sesión y sus conexiones"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _sign(self, query: str) -> str:
+        return hmac.new(
+            self.api_secret.encode(), query.encode(), hashlib.sha256
+        ).hexdigest()
+
+    async def _request(self, method, path, params=None, signed=False):
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        # turno en el rate limiter antes de firmar (el timestamp debe ser fresco)
+        await self.limiter.acquire(
+            endpoint_weight(method, path, params),
+            endpoint_priority(method, path),
+            orders=1 if (method, path) == ("POST", "/api/v3/order") else 0,
+        )
+        if signed:
+            if not self.api_key or not self.api_secret:
+                raise BinanceAPIError(None, None, "API key/secret requeridos para endpoint firmado")
+            params.setdefault("recvWindow", self.recv_window)
+            params["timestamp"] = int(time.time() * 1000)
+        query = urlencode(params, doseq=True)
+        if signed:
+            query = f"{query}&signature={self._sign(query)}"
+
+        url = f"{self.base_url}{path}"
+        if query:
+            url = f"{url}?{query}"
+
+        # encoded=True: enviar la query tal cual fue firmada, sin re-codificar
+        async with self._get_session().request(method, URL(url, encoded=True)) as resp:
+            text = await resp.text()
+            self.limiter.observe(resp.status, resp.headers)
+            if resp.status >= 400:
+                try:
+                    err = json.loads(text)
+                    code, msg = err.get("code"), err.get("msg", text)
+                except ValueError:
+                    code, msg = None, text
+                raise BinanceAPIError(resp.status, code, msg, dict(resp.headers))
+            return json.loads(text)
+
+    # -----------------------------
+    # MARKET DATA (públicos)
+    # -----------------------------
+    async def ping(self):
+        return await self._request("GET", "/api/v3/ping")
+
+    async def time(self):
+        return await self._request("GET", "/api/v3/time")
+
+    async def exchange_info(self, symbol=None, symbols=None, permissions=None):
+        params = {"symbol": symbol}
+        if symbols:
+            params["symbols"] = json.dumps(symbols, separators=(",", ":"))
+        if permissions:
+            params["permissions"] = json.dumps(permissions, separators=(",", ":"))
+        return await self._request("GET", "/api/v3/exchangeInfo", params)
+
+    async def ticker_price(self, symbol=None, symbols=None):
+        params = {"symbol": symbol}
+        if symbols:
+            params["symbols"] = json.dumps(symbols, separators=(",", ":"))
+        return await self._request("GET", "/api/v3/ticker/price", params)
+
+    async def klines(self, symbol, interval, **kwargs):
+        params = {"symbol": symbol, "interval": interval, **kwargs}
+        return await self._request("GET", "/api/v3/klines", params)
+
+    # -----------------------------
+    # CUENTA / ÓRDENES (firmados)
+    # -----------------------------
+    async def account(self, **kwargs):
+        return await self._request("GET", "/api/v3/account", kwargs, signed=True)
+
+    async def new_order(self, symbol, side, type, **kwargs):
+        params = {"symbol": symbol, "side": side, "type": type, **kwargs}
+        return await self._request("POST", "/api/v3/order", params, signed=True)
+
+    async def get_order(self, symbol, **kwargs):
+        params = {"symbol": symbol, **kwargs}
+        return await self._request("GET", "/api/v3/order", params, signed=True)
+
+    async def cancel_order(self, symbol, **kwargs):
+        params = {"symbol": symbol, **kwargs}
+        return await self._request("DELETE", "/api/v3/order", params, signed=True)
+
+    # -----------------------------
+    # USER DATA STREAM (solo API key)
+    # -----------------------------
+    async def new_listen_key(self):
+        return await self._request("POST", "/api/v3/userDataStream")
+
+    async def renew_listen_key(self, listenKey):
+        return await self._request("PUT", "/api/v3/userDataStream", {"listenKey": listenKey})
+
+    async def close_listen_key(self, listenKey):
+        return await self._request("DELETE", "/api/v3/userDataStream", {"listenKey": listenKey})
@@ -0,0 +1,201 @@
+"""Inferencia compilada de ensambles de árboles (LightGBM) sin lightgbm
+Los árboles del Booster se exportan a arrays NumPy planos (feature, umbral,
+hijos, valor de hoja) en un .npz; la predicción recorre todos los árboles
+para todas las filas a la vez con operaciones vectorizadas.
+"""
+
+import numpy as np
+
+# missing_type de LightGBM
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+_MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+# |x| <= esto cuenta como cero (kZeroThreshold de LightGBM)
+ZERO_THRESHOLD = 1e-35
+
+# Filas por bloque al predecir: la matriz árboles x filas de cada bloque entra en cache
+CHUNK_ROWS = 512
+
+# Hasta esta cantidad de filas se recorre en Python puro (menos overhead que NumPy)
+SMALL_ROWS = 4
+
+
+def _flatten(tree_info):
+    """dump_model()["tree_info"] -> arrays de nodos (las hojas apuntan a sí mismas)"""
+    feature, threshold, left, right, default_left, missing, leaf = [], [], [], [], [], [], []
+    roots, max_depth = [], 0
+
+    def add(node, depth):
+        nonlocal max_depth
+        idx = len(feature)
+        feature.append(0)
+        threshold.append(0.0)
+        left.append(idx)
+        right.append(idx)
+        default_left.append(False)
+        missing.append(MISSING_NONE)
+        leaf.append(0.0)
+        if "leaf_value" in node:
+            leaf[idx] = node["leaf_value"]
+            max_depth = max(max_depth, depth)
+            return idx
+        if node["decision_type"] != "<=":
+            raise ValueError(f"Split no soportado: {node['decision_type']} (features categóricas)")
+        feature[idx] = node["split_feature"]
+        threshold[idx] = node["threshold"]
+        default_left[idx] = node["default_left"]
+        missing[idx] = _MISSING_TYPES[node["missing_type"]]
+        left[idx] = add(node["left_child"], depth + 1)
+        right[idx] = add(node["right_child"], depth + 1)
+        return idx
+
+    for info in tree_info:
+        roots.append(add(info["tree_structure"], 0))
+
+    return {
+        "feature": np.array(feature, dtype=np.int32),
+        "threshold": np.array(threshold, dtype=np.float64),
+        "left": np.array(left, dtype=np.int32),
+        "right": np.array(right, dtype=np.int32),
+        "default_left": np.array(default_left, dtype=bool),
+        "missing_type": np.array(missing, dtype=np.int8),
+        "leaf_value": np.array(leaf, dtype=np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+        "max_depth": np.array(max_depth),
+    }
+
+
+class CompiledTrees:
+    """Ensamble de árboles en arrays NumPy con la misma interfaz predict() que el Booster"""
+
+    def __init__(self, arrays: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.default_left = arrays["default_left"]
+        self.missing_type = arrays["missing_type"]
+        self.leaf_value = arrays["leaf_value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.objective = str(arrays["objective"])
+        self.sigmoid = float(arrays["sigmoid"])
+        self.feature_names = [str(n) for n in arrays["feature_names"]]
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Compila un lightgbm.Booster (usa best_iteration si existe, como predict)"""
+        dump = booster.dump_model()
+        if dump["num_tree_per_iteration"] != 1:
+            raise ValueError("Solo se soportan modelos de una salida (binary / regression)")
+        objective, *params = dump["objective"].split()
+        if objective not in ("binary", "regression"):
+            raise ValueError(f"Objetivo no soportado: {objective}")
+        options = dict(p.split(":", 1) for p in params if ":" in p)
+        arrays = _flatten(dump["tree_info"])
+        arrays["objective"] = np.array(objective)
+        arrays["sigmoid"] = np.array(float(options.get("sigmoid", 1.0)))
+        arrays["feature_names"] = np.array(dump["feature_names"])
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, missing_type=self.missing_type,
+            leaf_value=self.leaf_value, roots=self.roots, max_depth=np.array(self.max_depth),
+            objective=np.array(self.objective), sigmoid=np.array(self.sigmoid),
+            feature_names=np.array(self.feature_names),
+        )
+
+    @property
+    def num_trees(self) -> int:
+        return len(self.roots)
+
+    def _prepare(self):
+        """Tablas derivadas para predecir (se arman en el primer predict)"""
+        n = len(self.left)
+        # hijo = children[2 * nodo + (x > umbral)]
+        self._children = np.empty(2 * n, dtype=np.intp)
+        self._children[0::2] = self.left
+        self._children[1::2] = self.right
+        self._feature = self.feature.astype(np.intp)
+        self._has_missing = bool((self.missing_type != MISSING_NONE).any())
+        self._lists = (
+            self.roots.tolist(), self.feature.tolist(), self.threshold.tolist(), self.left.tolist(),
+            self.right.tolist(), self.default_left.tolist(), self.missing_type.tolist(), self.leaf_value.tolist(),
+        )
+
+    def _raw_row(self, row):
+        """Un árbol tras otro en Python: para 1-4 filas evita el overhead de NumPy"""
+        roots, feature, threshold, left, right, default_left, missing_type, leaf_value = self._lists
+        total = 0.0
+        if not self._has_missing:
+            row = [0.0 if x != x else x for x in row]
+            for node in roots:
+                while left[node] != node:
+                    node = right[node] if row[feature[node]] > threshold[node] else left[node]
+                total += leaf_value[node]
+            return total
+        for node in roots:
+            while left[node] != node:
+                x = row[feature[node]]
+                mt = missing_type[node]
+                if x != x and mt != MISSING_NAN:
+                    x = 0.0  # NaN sin missing_type NaN se trata como 0 (igual que LightGBM)
+                if (mt == MISSING_ZERO and abs(x) <= ZERO_THRESHOLD) or (mt == MISSING_NAN and x != x):
+                    go_left = default_left[node]
+                else:
+                    go_left = x <= threshold[node]
+                node = left[node] if go_left else right[node]
+            total += leaf_value[node]
+        return total
+
+    def _raw_chunk(self, Xflat, start, stop, n_features):
+        """Todos los árboles para las filas [start, stop), nivel por nivel (árboles x filas)"""
+        base = np.arange(start, stop, dtype=np.intp) * n_features
+        node = np.repeat(self.roots.astype(np.intp)[:, None], stop - start, axis=1)
+        for _ in range(self.max_depth):
+            x = Xflat[self._feature[node] + base]
+            if self._has_missing:
+                mt = self.missing_type[node]
+                nan = np.isnan(x)
+                x = np.where(nan & (mt != MISSING_NAN), 0.0, x)
+                is_missing = ((mt == MISSING_ZERO) & (np.abs(x) <= ZERO_THRESHOLD)) | ((mt == MISSING_NAN) & nan)
+                go_right = np.where(is_missing, ~self.default_left[node], x > self.threshold[node])
+            else:
+                go_right = x > self.threshold[node]
+            node = self._children[2 * node + go_right]
+        # suma árbol por árbol (mismo orden que LightGBM)
+        return self.leaf_value[node].sum(axis=0)
+
+    def predict_raw(self, X):
+        if not hasattr(self, "_children"):
+            self._prepare()
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if len(X) <= SMALL_ROWS:
+            return np.array([self._raw_row(row) for row in X.tolist()])
+        if not self._has_missing:
+            # sin nodos con missing_type: NaN equivale a 0 en todos los splits
+            X = np.where(np.isnan(X), 0.0, X)
+        X = np.ascontiguousarray(X)
+        Xflat, n, n_features = X.ravel(), len(X), X.shape[1]
+        return np.concatenate([
+            self._raw_chunk(Xflat, i, min(i + CHUNK_ROWS, n), n_features) for i in range(0, n, CHUNK_ROWS)
+        ])
+
+    def predict(self, X):
+        """Probabilidad (binary) o valor (regression), como Booster.predict"""
+        raw = self.predict_raw(X)
+        if self.objective == "binary":
+            return 1.0 / (1.0 + np.exp(-self.sigmoid * raw))
+        return raw
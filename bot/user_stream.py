@@ -0,0 +1,196 @@
+"""User Data Stream de Binance (executionReport / outboundAccountPosition)
+Mantiene el listenKey vivo, reconecta el WebSocket y resuelve la espera de
+cada orden apenas llega su fill, en lugar de dormir y consultar por REST.
+"""
+
+import asyncio
+import json
+import os
+from collections import OrderedDict
+
+import aiohttp
+
+TESTNET_WS_URL = "wss://stream.testnet.binance.vision/ws"
+MAINNET_WS_URL = "wss://stream.binance.com:9443/ws"
+
+# Binance expira el listenKey a los 60 min sin keepalive
+LISTEN_KEY_KEEPALIVE = float(os.getenv("LISTEN_KEY_KEEPALIVE", 30 * 60))
+
+# Estados finales de una orden (no habrá más executionReport)
+FINAL_STATUSES = {"FILLED", "CANCELED", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH"}
+
+
+def execution_to_order(event: dict) -> dict:
+    """executionReport -> dict con las mismas claves que GET /api/v3/order"""
+    return {
+        "symbol": event["s"],
+        "orderId": event["i"],
+        "side": event.get("S"),
+        "type": event.get("o"),
+        "status": event["X"],
+        "origQty": event.get("q", "0"),
+        "executedQty": event.get("z", "0"),
+        "cummulativeQuoteQty": event.get("Z", "0"),
+        "price": event.get("p", "0"),
+        "lastPrice": event.get("L", "0"),
+        "updateTime": event.get("T", event.get("E")),  # hora de la transacción (= u del evento de cuenta)
+    }
+
+
+class UserDataStream:
+    def __init__(self, exchange, ws_url: str = None, keepalive: float = LISTEN_KEY_KEEPALIVE):
+        """
+        Args:
+            exchange: Exchange cuyo cliente REST gestiona el listenKey
+            ws_url: Base del WebSocket (default testnet/mainnet según MODE)
+            keepalive: Segundos entre renovaciones del listenKey
+        """
+        self.exchange = exchange
+        if ws_url is None:
+            ws_url = TESTNET_WS_URL if os.getenv("MODE", "dev") == "dev" else MAINNET_WS_URL
+        self.ws_url = ws_url.rstrip("/")
+        self.keepalive = keepalive
+        self.listen_key = None
+        self.connected = asyncio.Event()
+        self.connections = 0  # conexiones exitosas (cambia en cada reconexión)
+
+        # orderId -> último estado conocido (acotado: órdenes recientes)
+        self._orders = OrderedDict()
+        self._waiters = {}  # orderId -> asyncio.Event
+        self._callbacks = []  # callback(event) para cualquier evento del stream
+        self._tasks = []
+        self._session = None
+
+    # -----------------------------
+    # CICLO DE VIDA
+    # -----------------------------
+    async def start(self):
+        """Crea el listenKey y arranca lectura + keepalive en background"""
+        await self._new_listen_key()
+        self._session = aiohttp.ClientSession()
+        self._tasks = [
+            asyncio.create_task(self._read_loop()),
+            asyncio.create_task(self._keepalive_loop()),
+        ]
+        return self
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.listen_key:
+            try:
+                await self.exchange._run(self.exchange.client.close_listen_key, self.listen_key)
+            except Exception as e:
+                print(f"[WARN] UserDataStream: no se pudo cerrar listenKey: {e}")
+            self.listen_key = None
+
+    async def _new_listen_key(self):
+        resp = await self.exchange._run(self.exchange.client.new_listen_key)
+        self.listen_key = resp["listenKey"]
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            try:
+                await self.exchange._run(self.exchange.client.renew_listen_key, self.listen_key)
+            except Exception as e:
+                # listenKey perdido: crear uno nuevo y forzar reconexión
+                print(f"[WARN] UserDataStream: keepalive falló ({e}), renovando listenKey")
+                try:
+                    await self._new_listen_key()
+                except Exception as e2:
+                    print(f"[ERROR] UserDataStream: no se pudo crear listenKey: {e2}")
+
+    async def _read_loop(self):
+        backoff = 1.0
+        while True:
+            key = self.listen_key
+            try:
+                async with self._session.ws_connect(f"{self.ws_url}/{key}", heartbeat=30) as ws:
+                    self.connections += 1
+                    self.connected.set()
+                    backoff = 1.0
+                    async for msg in ws:
+                        if msg.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        self._dispatch(json.loads(msg.data))
+                        if self.listen_key != key:
+                            break  # listenKey renovado: reconectar con el nuevo
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARN] UserDataStream: desconectado ({e}), reintentando en {backoff:.0f}s")
+            self.connected.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    # -----------------------------
+    # EVENTOS
+    # -----------------------------
+    def subscribe(self, callback):
+        """Registra callback(event) para todos los eventos del stream"""
+        self._callbacks.append(callback)
+
+    def _dispatch(self, event: dict):
+        etype = event.get("e")
+        if etype == "executionReport":
+            order = execution_to_order(event)
+            oid = order["orderId"]
+            self._orders[oid] = order
+            self._orders.move_to_end(oid)
+            while len(self._orders) > 1000:
+                self._orders.popitem(last=False)
+            waiter = self._waiters.get(oid)
+            if waiter is not None:
+                waiter.set()
+        elif etype == "listenKeyExpired":
+            asyncio.ensure_future(self._new_listen_key())
+
+        for cb in self._callbacks:
+            try:
+                cb(event)
+            except Exception as e:
+                print(f"[ERROR] UserDataStream callback: {e}")
+
+    def order_status(self, order_id):
+        """Último estado recibido de una orden (o None)"""
+        return self._orders.get(order_id)
+
+    async def wait_for_fill(self, order_id, timeout: float, partial: bool = False):
+        """Espera hasta que la orden quede FILLED (o en estado final).
+
+        Args:
+            order_id: orderId devuelto por new_order
+            timeout: Máximo de segundos a esperar
+            partial: Si True, también retorna ante el primer PARTIALLY_FILLED
+
+        Returns:
+            dict estilo GET /api/v3/order con el último estado recibido,
+            o None si no llegó ningún evento de la orden antes del timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter = self._waiters.setdefault(order_id, asyncio.Event())
+        try:
+            while True:
+                order = self._orders.get(order_id)
+                if order is not None:
+                    if order["status"] in FINAL_STATUSES:
+                        return order
+                    if partial and order["status"] == "PARTIALLY_FILLED":
+                        return order
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return order
+                waiter.clear()
+                try:
+                    await asyncio.wait_for(waiter.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return self._orders.get(order_id)
+        finally:
+            self._waiters.pop(order_id, None)
@@ -1,8 +1,14 @@
 import pandas as pd
+from bot.candle_store import CandleStore, is_store_path
+from bot.feature_schema import FeatureSchema
 from bot.strategy import compute_features
 
-def make_features_from_raw(raw_csv, out_csv=None):
-    df = pd.read_csv(raw_csv)
+def make_features_from_raw(raw_csv, out_csv=None, symbol="BTCUSDT", interval="5m", start=None, end=None):
+    """Features desde el CSV crudo o desde el CandleStore (raw_csv = directorio del store)"""
+    if is_store_path(raw_csv):
+        df = CandleStore(raw_csv).read(symbol, interval, start, end)
+    else:
+        df = pd.read_csv(raw_csv)
     df2 = compute_features(df)
     
     # Agregar features adicionales
@@ -13,8 +19,14 @@ def make_features_from_raw(raw_csv, out_csv=None):
     return df2
 
 def add_advanced_features(df):
-    """Agregar features avanzados para ML"""
+    """Agregar features avanzados para ML
+
+    compute_features ya calcula todas estas columnas (sobre la serie completa,
+    igual que en inferencia): solo se recalculan si el frame no las trae.
+    """
     df = df.copy()
+    if 'bb_position' in df.columns:
+        return df.fillna(0)
     
     # Volatilidad
     df['volatility_5'] = df['close'].rolling(5).std()
@@ -47,27 +59,20 @@ def add_advanced_features(df):
     
     return df.fillna(0)
 
-def make_X_y(df, horizon=3, ret_thresh=0.001):
+def make_X_y(df, horizon=3, ret_thresh=0.001, schema=None):
+    """X (columnas del schema, en orden) e y para entrenar
+
+    Args:
+        schema: FeatureSchema a usar (default: FeatureSchema.for_frame(df))
+    """
     df = df.copy().reset_index(drop=True)
     df['future'] = df['close'].shift(-horizon).astype(float)
     df['future_ret'] = (df['future'] - df['close'].astype(float)) / df['close'].astype(float)
     df['y'] = (df['future_ret'] > ret_thresh).astype(int)
     
-    # Features expandidos
-    feature_cols = [
-        'ema_diff', 'rsi14', 'ret_1',
-        'volatility_5', 'volatility_20',
-        'roc_5', 'roc_10',
-        'price_to_ema9', 'price_to_ema21', 'price_to_sma50',
-        'rsi_change', 'ema_spread_pct',
-        'bb_position'
-    ]
-    
-    # Agregar volume si existe
-    if 'volume_ratio' in df.columns:
-        feature_cols.append('volume_ratio')
-    
-    X = df[feature_cols].fillna(0)
+    if schema is None:
+        schema = FeatureSchema.for_frame(df)
+    X = pd.DataFrame(schema.matrix(df), columns=list(schema.columns), index=df.index)
     y = df['y'].fillna(0).astype(int)
     valid = ~df['future'].isna()
     
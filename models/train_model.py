@@ -1,23 +1,47 @@
 import argparse
+import os
 import pickle
 import lightgbm as lgb
 from sklearn.model_selection import train_test_split
 from models.features import make_features_from_raw, make_X_y
 from lightgbm import early_stopping, log_evaluation
+from bot.feature_schema import FeatureSchema
+from bot.model_registry import ModelRegistry, REGISTRY_DIR
+from bot.tree_model import CompiledTrees
+
+# Parámetros mejorados (también los usa backtester/walk_forward.py en cada fold)
+LGB_PARAMS = {
+    "objective": "binary",
+    "metric": "auc",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "feature_fraction": 0.8,
+    "bagging_fraction": 0.8,
+    "bagging_freq": 5,
+    "verbosity": -1,
+    "max_depth": 6
+}
+NUM_BOOST_ROUND = 500
+EARLY_STOPPING_ROUNDS = 30
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
-    p.add_argument("--data", default="data/raw/klines.csv")
+    p.add_argument("--data", default="data/raw/klines.csv", help="CSV crudo o directorio del store (data/store)")
+    p.add_argument("--symbol", default="BTCUSDT", help="Símbolo (solo con store)")
+    p.add_argument("--interval", default="5m", help="Intervalo (solo con store)")
     p.add_argument("--out", default="models/model.pkl")
+    p.add_argument("--compiled-out", default="models/model.npz", help="Árboles compilados para inferencia sin lightgbm ('' = no exportar)")
+    p.add_argument("--registry", default=REGISTRY_DIR, help="Registro de versiones donde publicar el modelo ('' = no registrar)")
     p.add_argument("--horizon", type=int, default=5, help="Períodos a futuro para predicción")
     p.add_argument("--thresh", type=float, default=0.002, help="Threshold de retorno (0.002 = 0.2%)")
     args = p.parse_args()
 
     print("Building features...")
-    df = make_features_from_raw(args.data)
+    df = make_features_from_raw(args.data, symbol=args.symbol, interval=args.interval)
     print(f"Features shape: {df.shape}")
     
-    X, y = make_X_y(df, horizon=args.horizon, ret_thresh=args.thresh)
+    schema = FeatureSchema.for_frame(df)
+    X, y = make_X_y(df, horizon=args.horizon, ret_thresh=args.thresh, schema=schema)
     print(f"Training samples: {X.shape}")
     print(f"Positive samples: {y.sum()} ({y.mean()*100:.1f}%)")
     
@@ -28,26 +52,15 @@ if __name__ == "__main__":
     dtrain = lgb.Dataset(X_train, label=y_train)
     dval = lgb.Dataset(X_val, label=y_val)
     
-    # Parámetros mejorados
-    params = {
-        "objective": "binary",
-        "metric": "auc",
-        "learning_rate": 0.05,
-        "num_leaves": 31,
-        "feature_fraction": 0.8,
-        "bagging_fraction": 0.8,
-        "bagging_freq": 5,
-        "verbosity": -1,
-        "max_depth": 6
-    }
+    params = dict(LGB_PARAMS)
     
     print("\nTraining model...")
     model = lgb.train(
         params,
         dtrain,
         valid_sets=[dval],
-        num_boost_round=500,
-        callbacks=[early_stopping(stopping_rounds=30), log_evaluation(20)],
+        num_boost_round=NUM_BOOST_ROUND,
+        callbacks=[early_stopping(stopping_rounds=EARLY_STOPPING_ROUNDS), log_evaluation(20)],
     )
     
     # Feature importance
@@ -56,6 +69,40 @@ if __name__ == "__main__":
     for feat, imp in importance[:10]:
         print(f"  {feat}: {imp}")
     
-    with open(args.out, "wb") as f:
+    # contrato de columnas: lo valida MLScorer al cargar (pkl y npz comparten el schema).
+    # Va antes que el modelo: un MLScorer que vigila el archivo nunca ve el modelo nuevo con el schema viejo
+    schema_path = FeatureSchema.sidecar_path(args.out)
+    schema.save(schema_path)
+    print(f"\n✅ Saved feature schema to {schema_path}")
+    
+    # escritura atómica: un MLScorer que vigila el archivo nunca lee un pickle a medias
+    tmp = f"{args.out}.tmp"
+    with open(tmp, "wb") as f:
         pickle.dump(model, f)
-    print(f"\n✅ Saved model to {args.out}")
+    os.replace(tmp, args.out)
+    print(f"✅ Saved model to {args.out}")
+    
+    if args.compiled_out:
+        tmp = f"{args.compiled_out}.tmp.npz"
+        CompiledTrees.from_booster(model).save(tmp)
+        os.replace(tmp, args.compiled_out)
+        print(f"✅ Saved compiled trees to {args.compiled_out}")
+    
+    if args.registry:
+        train_times = df.loc[X_train.index, "open_time"] if "open_time" in df.columns else None
+        meta = {
+            "data": args.data,
+            "train_start": train_times.iloc[0] if train_times is not None else None,
+            "train_end": train_times.iloc[-1] if train_times is not None else None,
+            "train_rows": len(X_train),
+            "val_rows": len(X_val),
+            "features": list(schema.columns),
+            "auc": model.best_score.get("valid_0", {}).get("auc"),
+            "best_iteration": model.best_iteration,
+            "horizon": args.horizon,
+            "thresh": args.thresh,
+            "params": params,
+        }
+        files = [args.out, schema_path] + ([args.compiled_out] if args.compiled_out else [])
+        version = ModelRegistry(args.registry).register(files, meta)
+        print(f"✅ Registered {version} in {args.registry} (MODEL_PATH={args.registry} para recarga en caliente)")
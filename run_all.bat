@@ -25,17 +25,19 @@ mkdir models 2>nul
 mkdir db 2>nul
 mkdir logs 2>nul
 
-REM Descargar datos historicos solo si no existen
-if not exist "data\raw\klines.csv" (
-    echo Descargando datos historicos...
-    python scripts/download_klines.py --symbol BTCUSDT --interval 5m --start 2024-01-01 --out data/raw/klines.csv
-) else (
-    echo Datos historicos ya existen en data\raw\klines.csv, omitiendo descarga.
+REM CSV de versiones anteriores: se migra una sola vez al store columnar
+if exist "data\raw\klines.csv" if not exist "data\store\BTCUSDT\5m" (
+    echo Migrando data\raw\klines.csv a data\store...
+    python scripts/migrate_csv_to_store.py --csv data/raw/klines.csv --store data/store --symbol BTCUSDT --interval 5m
 )
 
+REM Actualizar datos historicos (solo velas nuevas + reparacion de huecos)
+echo Actualizando datos historicos...
+python scripts/download_klines.py --symbol BTCUSDT --interval 5m --start 2024-01-01 --store data/store --update
+
 REM Entrenar modelo
 echo Entrenando modelo ML...
-python -m models.train_model --data data/raw/klines.csv --out models/model.pkl --horizon 5 --thresh 0.002
+python -m models.train_model --data data/store --symbol BTCUSDT --interval 5m --out models/model.pkl --horizon 5 --thresh 0.002
 
 REM Preguntar por el modo
 echo.
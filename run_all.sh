@@ -63,17 +63,19 @@ echo -e "${GREEN}✅ Carpetas creadas/verificadas${NC}"
 echo ""
 echo -e "${BLUE}[3/6] Verificando datos históricos...${NC}"
 
-if [ ! -f "data/raw/klines.csv" ]; then
-    echo -e "${YELLOW}⏳ Descargando datos históricos (esto puede tomar varios minutos)...${NC}"
-    
-    if python scripts/download_klines.py --symbol BTCUSDT --interval 5m --start 2024-01-01 --out data/raw/klines.csv; then
-        echo -e "${GREEN}✅ Datos históricos descargados${NC}"
-    else
-        echo -e "${YELLOW}⚠️  Advertencia: Error al descargar datos históricos${NC}"
-        echo "Continuando de todas formas..."
-    fi
+# CSV de versiones anteriores: se migra una sola vez al store columnar
+if [ -f "data/raw/klines.csv" ] && [ ! -d "data/store/BTCUSDT/5m" ]; then
+    echo -e "${YELLOW}⏳ Migrando data/raw/klines.csv a data/store...${NC}"
+    python scripts/migrate_csv_to_store.py --csv data/raw/klines.csv --store data/store --symbol BTCUSDT --interval 5m
+fi
+
+# --update: si el store ya tiene datos solo baja las velas nuevas y repara huecos
+echo -e "${YELLOW}⏳ Actualizando datos históricos (la primera vez puede tomar unos minutos)...${NC}"
+if python scripts/download_klines.py --symbol BTCUSDT --interval 5m --start 2024-01-01 --store data/store --update; then
+    echo -e "${GREEN}✅ Datos históricos actualizados (data/store)${NC}"
 else
-    echo -e "${GREEN}✅ Datos históricos ya existen (data/raw/klines.csv)${NC}"
+    echo -e "${YELLOW}⚠️  Advertencia: Error al actualizar datos históricos${NC}"
+    echo "Continuando de todas formas..."
 fi
 
 # =========================================================================
@@ -82,8 +84,8 @@ fi
 echo ""
 echo -e "${BLUE}[4/6] Entrenando modelo Machine Learning...${NC}"
 
-if [ -f "data/raw/klines.csv" ]; then
-    if python -m models.train_model --data data/raw/klines.csv --out models/model.pkl; then
+if [ -d "data/store/BTCUSDT/5m" ]; then
+    if python -m models.train_model --data data/store --symbol BTCUSDT --interval 5m --out models/model.pkl; then
         echo -e "${GREEN}✅ Modelo ML entrenado${NC}"
     else
         echo -e "${YELLOW}⚠️  Advertencia: Error al entrenar el modelo${NC}"
@@ -1,51 +1,76 @@
-"""Descarga klines/candles desde Binance y guarda CSV.
+"""Descarga klines/candles desde Binance al store columnar (data/store).
+Pide el rango en chunks en paralelo dentro del presupuesto de peso y guarda
+cada chunk apenas llega: si se corta, volver a correrlo retoma desde la última
+vela guardada. Acepta varios símbolos e intervalos en una sola corrida.
+Con --update baja solo las velas nuevas desde la última guardada, verifica que
+no haya huecos ni open_time duplicados y repara los huecos (refresh diario).
 Uso:
-  python scripts/download_klines.py --symbol BTCUSDT --interval 5m --start 2024-01-01 --out data/raw/btcusdt_5m.csv
+  python scripts/download_klines.py --symbol BTCUSDT ETHUSDT --interval 5m 1h --start 2024-01-01
+  python scripts/download_klines.py --symbol BTCUSDT --start 2024-01-01 --out data/raw/klines.csv
+  python scripts/download_klines.py --symbol BTCUSDT --interval 5m --update
 """
 import argparse
+import asyncio
+import sys
 import time
-import requests
-import pandas as pd
-from datetime import datetime
-
-BASE = 'https://api.binance.com/api/v3/klines'
-
-def iso_to_ms(s):
-    dt = datetime.fromisoformat(s)
-    return int(dt.timestamp() * 1000)
-
-def download(symbol, interval, start_str, limit=1000):
-    start = iso_to_ms(start_str)
-    rows = []
-    while True:
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'startTime': start,
-            'limit': limit
-        }
-        r = requests.get(BASE, params=params, timeout=30)
-        r.raise_for_status()
-        data = r.json()
-        if not data:
-            break
-        rows.extend(data)
-        start = data[-1][0] + 1
-        if len(data) < limit:
-            break
-        time.sleep(0.2)
-    cols = ['open_time','open','high','low','close','volume','close_time','qav','num_trades','taker_base_vol','taker_quote_vol','ignore']
-    df = pd.DataFrame(rows, columns=cols)
-    return df
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.candle_store import CandleStore, CSV_COLUMNS, STORE_DIR, to_ms
+from bot.kline_downloader import DEFAULT_CONCURRENCY, download_many, update_many
+from bot.rate_limit import LIMITER, RateLimiter
+from bot.transport import AsyncSpotClient, MAINNET_URL
+
+
+def export_csv(store, symbol, interval, path):
+    """Velas del store -> CSV con el formato anterior (open_time en ms)"""
+    df = store.read(symbol, interval)
+    df['open_time'] = df['open_time'].astype('int64')
+    df = df.rename(columns={v: k for k, v in CSV_COLUMNS.items()})
+    df['ignore'] = 0
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+async def main(args):
+    limiter = RateLimiter(weight_limit=args.weight_budget) if args.weight_budget else LIMITER
+    client = AsyncSpotClient(base_url=args.base_url, pool_size=args.concurrency, timeout=30, limiter=limiter)
+    store = CandleStore(args.store)
+    start = to_ms(args.start)
+    end = to_ms(args.end) if args.end else int(time.time() * 1000)
+    try:
+        if args.update:
+            return await update_many(client, store, args.symbol, args.interval, end, start, args.concurrency)
+        return await download_many(client, store, args.symbol, args.interval, start, end, args.concurrency)
+    finally:
+        await client.close()
+
 
 if __name__ == '__main__':
     p = argparse.ArgumentParser()
-    p.add_argument('--symbol', required=True)
-    p.add_argument('--interval', default='5m')
-    p.add_argument('--start', default='2024-01-01')
-    p.add_argument('--out', default='data/raw/klines.csv')
+    p.add_argument('--symbol', nargs='+', required=True)
+    p.add_argument('--interval', nargs='+', default=['5m'])
+    p.add_argument('--start', default='2024-01-01', help='Fecha inicio UTC (YYYY-MM-DD; con --update solo si no hay datos)')
+    p.add_argument('--end', help='Fecha fin UTC (default: ahora)')
+    p.add_argument('--store', default=STORE_DIR, help='Directorio del store columnar')
+    p.add_argument('--out', help='Además exportar a CSV (un solo símbolo/intervalo)')
+    p.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Requests en vuelo a la vez')
+    p.add_argument('--weight-budget', type=int, help='Peso por minuto a usar (default: BINANCE_WEIGHT_LIMIT)')
+    p.add_argument('--update', action='store_true', help='Solo velas nuevas + verificación y reparación de huecos')
+    p.add_argument('--base-url', default=MAINNET_URL)
     args = p.parse_args()
+    if args.out and len(args.symbol) * len(args.interval) != 1:
+        p.error('--out requiere un solo símbolo y un solo intervalo')
 
-    df = download(args.symbol, args.interval, args.start)
-    df.to_csv(args.out, index=False)
-    print('Saved', args.out, 'rows=', len(df))
+    t0 = time.monotonic()
+    results = asyncio.run(main(args))
+    for (symbol, interval), n in results.items():
+        if args.update:
+            n = n['appended']
+        print(f'Saved {args.store}/{symbol}/{interval} rows= {n}')
+    print(f'Listo en {time.monotonic() - t0:.1f}s')
+    if args.out:
+        n = export_csv(CandleStore(args.store), args.symbol[0].upper(), args.interval[0], args.out)
+        print('Saved', args.out, 'rows=', n)
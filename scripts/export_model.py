@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Exporta un Booster de LightGBM pickleado (models/model.pkl) a árboles
+compilados (.npz) para inferencia sin lightgbm (MODEL_PATH=./models/model.npz)
+"""
+
+import argparse
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.feature_schema import FeatureSchema
+from bot.tree_model import CompiledTrees
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Exportar modelo LightGBM a árboles compilados")
+    p.add_argument("--model", default="models/model.pkl", help="Booster pickleado")
+    p.add_argument("--out", default="models/model.npz", help="Archivo .npz de salida")
+    args = p.parse_args()
+
+    with open(args.model, "rb") as f:
+        booster = pickle.load(f)
+    compiled = CompiledTrees.from_booster(booster)
+    compiled.save(args.out)
+    schema = FeatureSchema.from_model(booster)
+    if schema is not None:
+        schema.save(FeatureSchema.sidecar_path(args.out))
+
+    # verificación rápida contra el Booster
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, booster.num_feature()))
+    diff = np.abs(compiled.predict(X) - booster.predict(X)).max()
+    print(f"✅ {compiled.num_trees} árboles -> {args.out} (diferencia máx vs Booster: {diff:.2e})")
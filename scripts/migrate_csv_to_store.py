@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Migra un CSV de velas (scripts/download_klines.py) al store columnar
+(data/store/<SYMBOL>/<interval>/<YYYY-MM>/*.npy). Se puede correr de nuevo:
+las velas repetidas se reemplazan por open_time.
+
+Uso:
+    python scripts/migrate_csv_to_store.py --csv data/raw/klines.csv --symbol BTCUSDT --interval 5m
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.candle_store import CandleStore, STORE_DIR, migrate_csv
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Migrar CSV de klines al store columnar")
+    p.add_argument("--csv", default="data/raw/klines.csv")
+    p.add_argument("--store", default=STORE_DIR)
+    p.add_argument("--symbol", default="BTCUSDT")
+    p.add_argument("--interval", default="5m")
+    args = p.parse_args()
+
+    store = CandleStore(args.store)
+    t0 = time.perf_counter()
+    n = migrate_csv(args.csv, store, args.symbol, args.interval)
+    parts = store.partitions(args.symbol, args.interval)
+    print(f"Migradas {n} velas a {args.store} ({len(parts)} meses: {parts[0]} .. {parts[-1]}) "
+          f"en {time.perf_counter() - t0:.2f}s" if parts else "CSV vacío, nada que migrar")
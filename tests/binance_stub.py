@@ -0,0 +1,247 @@
+"""Servidor HTTP local que imita los endpoints REST de testnet.binance.vision
+usados por el bot. Valida firma HMAC y registra cada request recibido.
+También sirve el WebSocket del user data stream en /ws/<listenKey>.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from aiohttp import web
+
+API_KEY = 'stub-key'
+API_SECRET = 'stub-secret'
+
+SYMBOL_INFO = {'symbol': 'BTCUSDT', 'filters': [
+    {'filterType': 'PRICE_FILTER', 'tickSize': '0.01000000'},
+    {'filterType': 'LOT_SIZE', 'stepSize': '0.00001000', 'minQty': '0.00001000'},
+    {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'},
+]}
+
+
+class StubBinance:
+    def __init__(self, price='63123.45', balances=None):
+        self.price = price
+        self.balances = balances or {'USDT': '1000.0', 'BTC': '0.01'}
+        self.requests = []  # (method, path, params)
+        self.peers = set()  # conexiones TCP distintas usadas por el cliente
+        self.orders = {}
+        self.next_order_id = 1
+        self.fail_next = None  # (status, body, headers) para el próximo request
+        self.headers = {}  # headers extra en cada respuesta (ej. X-MBX-USED-WEIGHT-1M)
+        self.delay = 0.0  # latencia simulada por request (segundos)
+        self.fill_after = None  # segundos hasta el fill de órdenes LIMIT (None = nunca)
+        self.partial_fill = None  # fracción llenada (PARTIALLY_FILLED) en lugar de fill total
+        self.listen_key = 'stub-listen-key'
+        self.websockets = []
+        self.base_url = None
+        self._runner = None
+
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/api/v3/ping', self._ping)
+        app.router.add_get('/api/v3/ticker/price', self._ticker)
+        app.router.add_get('/api/v3/exchangeInfo', self._exchange_info)
+        app.router.add_get('/api/v3/klines', self._klines)
+        app.router.add_get('/api/v3/account', self._account)
+        app.router.add_post('/api/v3/order', self._new_order)
+        app.router.add_get('/api/v3/order', self._get_order)
+        app.router.add_delete('/api/v3/order', self._cancel_order)
+        app.router.add_post('/api/v3/userDataStream', self._listen_key)
+        app.router.add_put('/api/v3/userDataStream', self._listen_key)
+        app.router.add_delete('/api/v3/userDataStream', self._listen_key)
+        app.router.add_get('/ws/{listen_key}', self._ws)
+        self.app = app
+        self.klines = []
+        self.kline_sets = {}  # (symbol, interval) -> velas; si no está se usa self.klines
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f'http://127.0.0.1:{port}'
+        return self
+
+    async def stop(self):
+        for ws in list(self.websockets):
+            await ws.close()
+        await self._runner.cleanup()
+
+    @property
+    def ws_url(self):
+        return self.base_url.replace('http://', 'ws://') + '/ws'
+
+    async def push(self, event):
+        """Envía un evento a todos los clientes del user data stream"""
+        for ws in list(self.websockets):
+            await ws.send_json(event)
+
+    async def _listen_key(self, request):
+        if request.headers.get('X-MBX-APIKEY') != API_KEY:
+            raise web.HTTPUnauthorized()
+        return self._json({'listenKey': self.listen_key} if request.method == 'POST' else {})
+
+    async def _ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        if request.match_info['listen_key'] != self.listen_key:
+            await ws.close()
+            return ws
+        self.websockets.append(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self.websockets.remove(ws)
+        return ws
+
+    def execution_report(self, order):
+        return {
+            'e': 'executionReport', 'E': int(time.time() * 1000), 's': order['symbol'],
+            'S': order['side'], 'o': order['type'], 'i': order['orderId'], 'X': order['status'],
+            'q': order['origQty'], 'p': order['price'], 'z': order['executedQty'],
+            'Z': order['cummulativeQuoteQty'], 'L': order['price'], 'T': order['updateTime'],
+        }
+
+    async def _fill_later(self, order):
+        await asyncio.sleep(self.fill_after)
+        frac = self.partial_fill if self.partial_fill is not None else 1.0
+        qty = float(order['origQty']) * frac
+        order['executedQty'] = f'{qty:.8f}'
+        order['cummulativeQuoteQty'] = f"{qty * float(order['price']):.8f}"
+        order['status'] = 'FILLED' if frac >= 1.0 else 'PARTIALLY_FILLED'
+        order['updateTime'] = int(time.time() * 1000)
+        await self.push(self.execution_report(order))
+
+    def _json(self, data, status=200):
+        return web.json_response(data, status=status, headers=self.headers)
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.peers.add(request.transport.get_extra_info('peername'))
+        self.requests.append((request.method, request.path, dict(request.query)))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_next is not None:
+            status, body, headers = self.fail_next
+            self.fail_next = None
+            return web.json_response(body, status=status, headers={**self.headers, **headers})
+        return await handler(request)
+
+    def _check_signature(self, request):
+        raw = request.query_string
+        query, _, signature = raw.rpartition('&signature=')
+        expected = hmac.new(API_SECRET.encode(), query.encode(), hashlib.sha256).hexdigest()
+        if request.headers.get('X-MBX-APIKEY') != API_KEY or signature != expected:
+            raise web.HTTPUnauthorized(
+                text=json.dumps({'code': -1022, 'msg': 'Signature for this request is not valid.'}),
+                content_type='application/json',
+            )
+
+    async def _ping(self, request):
+        return self._json({})
+
+    async def _ticker(self, request):
+        return self._json({'symbol': request.query.get('symbol'), 'price': self.price})
+
+    async def _exchange_info(self, request):
+        symbols = json.loads(request.query['symbols']) if 'symbols' in request.query else [request.query['symbol']]
+        return self._json({'symbols': [{**SYMBOL_INFO, 'symbol': s} for s in symbols]})
+
+    async def _klines(self, request):
+        limit = int(request.query.get('limit', 500))
+        start = request.query.get('startTime')
+        end = request.query.get('endTime')
+        rows = self.kline_sets.get((request.query.get('symbol'), request.query.get('interval')), self.klines)
+        if start is not None:
+            rows = [k for k in rows if k[0] >= int(start)]
+        if end is not None:
+            rows = [k for k in rows if k[0] <= int(end)]
+        return self._json(rows[:limit] if start is not None else rows[-limit:])
+
+    async def _account(self, request):
+        self._check_signature(request)
+        return self._json({'balances': [
+            {'asset': a, 'free': f, 'locked': '0'} for a, f in self.balances.items()
+        ]})
+
+    async def _new_order(self, request):
+        self._check_signature(request)
+        q = request.query
+        order = {
+            'symbol': q['symbol'], 'orderId': self.next_order_id, 'side': q['side'],
+            'type': q['type'], 'origQty': q['quantity'], 'price': q.get('price', '0'),
+            'status': 'FILLED' if q['type'] == 'MARKET' else 'NEW',
+            'executedQty': '0', 'cummulativeQuoteQty': '0', 'updateTime': int(time.time() * 1000),
+        }
+        self.orders[order['orderId']] = order
+        self.next_order_id += 1
+        if q['type'] == 'LIMIT' and self.fill_after is not None:
+            asyncio.ensure_future(self._fill_later(order))
+        return self._json({**order, 'transactTime': order['updateTime']})
+
+    async def _get_order(self, request):
+        self._check_signature(request)
+        return self._json(self.orders[int(request.query['orderId'])])
+
+    async def _cancel_order(self, request):
+        self._check_signature(request)
+        order = self.orders[int(request.query['orderId'])]
+        if order['status'] == 'FILLED':
+            return self._json({'code': -2011, 'msg': 'Unknown order sent.'}, status=400)
+        order['status'] = 'CANCELED'
+        order['updateTime'] = int(time.time() * 1000)
+        return self._json({**order, 'transactTime': order['updateTime']})
+
+
+class KlineReplay:
+    """WebSocket local que reproduce eventos <symbol>@kline_<interval> guionados.
+
+    Cada conexión consume el próximo guion de `scripts` (lista de eventos);
+    al terminar un guion cierra la conexión (simula una desconexión).
+    """
+
+    def __init__(self, scripts):
+        self.scripts = list(scripts)
+        self.connections = 0
+        self.base_url = None
+        self._runner = None
+        app = web.Application()
+        app.router.add_get('/ws/{stream}', self._ws)
+        self.app = app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f'ws://127.0.0.1:{port}/ws'
+        return self
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    async def _ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        events = self.scripts.pop(0) if self.scripts else []
+        for event in events:
+            await asyncio.sleep(0.01)
+            await ws.send_json(event)
+        if not self.scripts:
+            # último guion: mantener abierta hasta que el cliente cierre
+            async for _ in ws:
+                pass
+        await ws.close()
+        return ws
+
+
+def kline_event(open_time, close, closed, interval_ms=300_000, symbol='BTCUSDT'):
+    return {'e': 'kline', 'E': open_time + interval_ms // 2, 's': symbol, 'k': {
+        't': open_time, 'T': open_time + interval_ms - 1, 's': symbol, 'i': '5m',
+        'o': str(close), 'c': str(close), 'h': str(close), 'l': str(close), 'v': '1.0',
+        'n': 10, 'x': closed, 'q': str(close), 'V': '0.5', 'Q': str(close / 2),
+    }}
@@ -0,0 +1,46 @@
+import numpy as np
+from backtester.backtest import Backtester
+
+def _reference(close, signal, stop_loss_pct=None):
+    """Loop vela por vela del backtester anterior (+ stop loss con la misma regla)"""
+    bt = Backtester()
+    equity = []
+    for i, (price, sig) in enumerate(zip(close, signal)):
+        price = float(price)
+        if stop_loss_pct is not None and bt.btc > 0 and bt.trades[-1]['timestamp'] < i \
+                and price <= bt.entry_price * (1 - stop_loss_pct):
+            bt.execute_sell(price, i)
+        elif sig == 1:
+            bt.execute_buy(price, i)
+        elif sig == -1:
+            bt.execute_sell(price, i)
+        equity.append(bt.get_equity(price))
+    bt.equity_curve = [{'equity': e} for e in equity]
+    if bt.btc > 0:
+        bt.execute_sell(float(close[-1]), len(close) - 1)
+    return bt, np.array(equity)
+
+def _data(n=20_000, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    signal = rng.choice([0, 1, -1], size=n, p=[0.96, 0.02, 0.02])
+    return close, signal
+
+def test_vectorized_engine_matches_per_candle_loop():
+    close, signal = _data()
+    for stop in (None, 0.01):
+        ref, ref_equity = _reference(close, signal, stop)
+        bt = Backtester()
+        curve = bt.simulate(close, signal, np.arange(len(close)), stop_loss_pct=stop)
+        assert len(bt.trades) == len(ref.trades) > 50
+        assert bt.trades == ref.trades
+        assert np.array_equal(curve['equity'], ref_equity)
+        assert bt.usdt == ref.usdt
+        assert bt.calculate_metrics() == ref.calculate_metrics()
+
+def test_min_notional_stops_new_entries():
+    close = np.full(10, 100.0)
+    signal = np.array([1, -1, 1, -1, 0, 0, 0, 0, 0, 0])
+    bt = Backtester(initial_capital=400.0)  # 1% = 4 USDT < 5 de mínimo
+    curve = bt.simulate(close, signal, np.arange(10))
+    assert bt.trades == [] and (curve['equity'] == 400.0).all()
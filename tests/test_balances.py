@@ -0,0 +1,100 @@
+import asyncio
+from bot.balances import BalanceCache
+
+class FakeStream:
+    def __init__(self):
+        self.connected = asyncio.Event()
+        self.connections = 0
+        self.callbacks = []
+
+    def subscribe(self, cb):
+        self.callbacks.append(cb)
+
+    def connect(self):
+        self.connections += 1
+        self.connected.set()
+
+    def push(self, event):
+        for cb in self.callbacks:
+            cb(event)
+
+def _account(usdt, btc):
+    return {'balances': [{'asset': 'USDT', 'free': usdt, 'locked': '0'},
+                         {'asset': 'BTC', 'free': btc, 'locked': '0'}]}
+
+def test_concurrent_readers_share_one_fetch_until_invalidated():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _account('100.0', '0.5')
+
+    async def scenario():
+        cache = BalanceCache(fetch, ttl=60)
+        results = await asyncio.gather(*[cache.get() for _ in range(5)])
+        assert len(calls) == 1 and all(r['USDT'] == 100.0 for r in results)
+        results[0]['USDT'] = 0.0  # las copias no alteran el cache
+        assert (await cache.get())['USDT'] == 100.0
+        cache.invalidate()
+        await cache.get()
+        assert len(calls) == 2
+        assert (await cache.get(max_age=0))['BTC'] == 0.5 and len(calls) == 3
+
+    asyncio.run(scenario())
+
+def test_stream_events_keep_cache_fresh_without_rest():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return _account('100.0', '0.5')
+
+    async def scenario():
+        stream = FakeStream()
+        stream.connect()
+        cache = BalanceCache(fetch, ttl=0)
+        cache.attach(stream)
+        await cache.get()
+        # fill propio: invalidado hasta que llega el evento de cuenta
+        cache.invalidate(after=1000)
+        stream.push({'e': 'outboundAccountPosition', 'u': 1000, 'B': [{'a': 'USDT', 'f': '90.0', 'l': '0'}]})
+        bals = await cache.get()
+        assert bals == {'USDT': 90.0, 'BTC': 0.5} and len(calls) == 1
+        stream.push({'e': 'balanceUpdate', 'a': 'USDT', 'd': '10.0'})
+        assert (await cache.get())['USDT'] == 100.0 and len(calls) == 1
+        # reconexión: pudieron perderse eventos -> un fetch REST
+        stream.connect()
+        await cache.get()
+        assert len(calls) == 2 and cache.stats()['streaming']
+
+    asyncio.run(scenario())
+
+def test_event_older_than_fill_does_not_revalidate():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return _account('100.0', '0.5')
+
+    async def scenario():
+        stream = FakeStream()
+        stream.connect()
+        cache = BalanceCache(fetch, ttl=60)
+        cache.attach(stream)
+        await cache.get()
+        # fill propio a las 2000; llega tarde el evento de un fill anterior
+        cache.invalidate(after=2000)
+        stream.push({'e': 'outboundAccountPosition', 'u': 1500, 'B': [{'a': 'USDT', 'f': '50.0', 'l': '0'}]})
+        assert not cache.stats()['valid']
+        assert (await cache.get())['USDT'] == 100.0 and len(calls) == 2
+        cache.invalidate(after=3000)
+        stream.push({'e': 'outboundAccountPosition', 'u': 3000, 'B': [{'a': 'USDT', 'f': '90.0', 'l': '0'}]})
+        assert (await cache.get())['USDT'] == 90.0 and len(calls) == 2
+        # orden fallida sin transactTime: solo REST revalida
+        cache.invalidate()
+        stream.push({'e': 'outboundAccountPosition', 'u': 4000, 'B': [{'a': 'USDT', 'f': '80.0', 'l': '0'}]})
+        await cache.get()
+        assert len(calls) == 3
+
+    asyncio.run(scenario())
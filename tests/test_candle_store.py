@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from bot.candle_store import CandleStore, load_candles, migrate_csv
+
+STEP = 300_000  # 5m en ms
+START = 1704067200000  # 2024-01-01 00:00 UTC
+
+def _csv(path, n, start=START):
+    ot = start + np.arange(n) * STEP
+    close = 100.0 + np.arange(n) * 0.01
+    pd.DataFrame({
+        'open_time': ot, 'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': 1.5, 'close_time': ot + STEP - 1, 'qav': 10.0, 'num_trades': 7,
+        'taker_base_vol': 0.5, 'taker_quote_vol': 5.0, 'ignore': 0,
+    }).to_csv(path, index=False)
+
+def test_migrated_store_matches_csv_filtering(tmp_path):
+    csv = tmp_path / 'klines.csv'
+    _csv(csv, 20_000)  # ~69 días: ene..mar
+    store = CandleStore(tmp_path / 'store')
+    assert migrate_csv(csv, store, 'BTCUSDT', '5m') == 20_000
+    assert store.partitions('BTCUSDT', '5m') == ['2024-01', '2024-02', '2024-03']
+
+    for start, end in [(None, None), ('2024-01-15', '2024-02-10'), ('2024-02-01', None), ('2024-03-09', '2024-12-31')]:
+        expected = load_candles(csv, 'BTCUSDT', '5m', start, end).reset_index(drop=True)
+        got = load_candles(tmp_path / 'store', 'BTCUSDT', '5m', start, end)
+        assert (got['open_time'].values == expected['open_time'].values).all()
+        assert np.array_equal(got['close'].values, expected['close'].values)
+        assert np.array_equal(got['quote_asset_volume'].values, expected['qav'].values)
+
+def test_write_merges_and_replaces_by_open_time(tmp_path):
+    store = CandleStore(tmp_path)
+    rows = [[START + i * STEP, '1', '2', '0.5', str(100 + i), '3', START + (i + 1) * STEP - 1,
+             '4', 5, '6', '7', '0'] for i in range(10)]
+    store.write('btcusdt', '5m', rows[:6])
+    rows[5][4] = '42.0'  # la última vela guardada estaba abierta
+    store.write('BTCUSDT', '5m', rows[5:])
+    arrays = store.read_arrays('BTCUSDT', '5m', columns=['open_time', 'close'])
+    assert np.array_equal(arrays['open_time'], START + np.arange(10) * STEP)
+    assert arrays['close'][5] == 42.0 and arrays['close'][-1] == 109.0
+    assert store.last_open_time('BTCUSDT', '5m') == START + 9 * STEP
+    assert store.read('BTCUSDT', '5m', start='2030-01-01').empty
@@ -0,0 +1,86 @@
+import asyncio
+from binance_stub import StubBinance, API_KEY, API_SECRET
+from bot.exchange import Exchange
+from bot.transport import AsyncSpotClient
+
+def test_order_preparation_fans_out_concurrently():
+    async def scenario():
+        stub = await StubBinance().start()
+        client = AsyncSpotClient(API_KEY, API_SECRET, base_url=stub.base_url)
+        ex = Exchange(dry='log', client=client)
+        try:
+            await ex.load_symbols(['BTCUSDT'])
+            stub.delay = 0.2
+            await ex.market_buy('BTCUSDT')
+            await ex.limit_buy('BTCUSDT', 10.0)
+        finally:
+            await client.close()
+            await stub.stop()
+        stats = ex.latency.summary()
+        # balances + ticker en paralelo (filtros ya cacheados): ~1 RTT, no 2
+        assert stats['market_buy.prepare']['max_ms'] < 350
+        assert stats['limit_buy.prepare']['max_ms'] < 350
+        assert 'limit_buy.quantize' in stats
+    asyncio.run(scenario())
+
+def _run(scenario, stream=True):
+    async def wrapper():
+        stub = await StubBinance().start()
+        client = AsyncSpotClient(API_KEY, API_SECRET, base_url=stub.base_url)
+        ex = Exchange(dry='off', client=client)
+        try:
+            if stream:
+                await ex.start_user_stream(ws_url=stub.ws_url)
+                await asyncio.wait_for(ex.user_stream.connected.wait(), 2)
+            await scenario(stub, ex)
+        finally:
+            await ex.close()
+            await stub.stop()
+    asyncio.run(wrapper())
+
+def test_limit_buy_returns_as_soon_as_stream_reports_fill():
+    async def scenario(stub, ex):
+        stub.fill_after = 0.1
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        order = await ex.limit_buy('BTCUSDT', 10.0)
+        assert loop.time() - t0 < 1.0  # MAKER_WAIT_SECONDS = 5
+        assert order['type'] == 'LIMIT'
+        assert ex.entry_prices['BTCUSDT'] == 63091.88
+        assert not any(m == 'DELETE' for m, _, _ in stub.requests)
+    _run(scenario)
+
+def test_partial_fill_cancels_and_buys_only_the_remainder(monkeypatch):
+    monkeypatch.setattr('bot.exchange.MAKER_WAIT_SECONDS', 0.3)
+
+    async def scenario(stub, ex):
+        stub.fill_after, stub.partial_fill = 0.05, 0.5
+        await ex.limit_buy('BTCUSDT', 20.0)
+        market = [p for m, path, p in stub.requests if m == 'POST' and path == '/api/v3/order' and p['type'] == 'MARKET']
+        assert len(market) == 1
+        # la mitad (~10 USDT) ya se llenó como maker: la orden MARKET cubre el resto
+        assert float(market[0]['quantity']) * 63123.45 < 12.0
+    _run(scenario)
+
+def test_partial_sell_does_not_market_sell_dust_remainder(monkeypatch):
+    monkeypatch.setattr('bot.exchange.MAKER_WAIT_SECONDS', 0.3)
+
+    async def scenario(stub, ex):
+        stub.fill_after, stub.partial_fill = 0.05, 0.9
+        status = await ex.limit_sell('BTCUSDT', 0.0003)
+        # quedan 0.00003 BTC (~1.9 USDT < minNotional 5): no se sube a min_notional con otro saldo
+        assert float(status['executedQty']) == 0.00027
+        market = [p for m, path, p in stub.requests if m == 'POST' and path == '/api/v3/order' and p['type'] == 'MARKET']
+        assert market == []
+    _run(scenario)
+
+def test_balances_fetched_once_per_tick_and_refreshed_after_fill():
+    async def scenario(stub, ex):
+        await ex.get_balances()
+        await ex.get_balances()
+        await ex.market_buy('BTCUSDT', 10.0)
+        accounts = lambda: sum(1 for _, p, _ in stub.requests if p == '/api/v3/account')
+        assert accounts() == 1
+        await ex.get_balances()
+        assert accounts() == 2
+    _run(scenario, stream=False)
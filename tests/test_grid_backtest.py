@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from backtester.backtest_grid import GridBacktester
+from bot.strategies.grid_trading import create_grid_from_current_price
+
+def _reference(df, grid_range_pct, num_grids, invest):
+    """Loop vela por vela con grid.get_signal (GridBacktester.run anterior)"""
+    bt = GridBacktester()
+    grid = create_grid_from_current_price(float(df.iloc[0]['close']), grid_range_pct, num_grids)
+    for i, row in df.iterrows():
+        price = float(row['close'])
+        timestamp = row['open_time']
+        signal, level, _ = grid.get_signal(price)
+        if signal == 1 and bt.usdt >= invest:
+            qty = (invest * (1 - bt.fee_rate)) / price
+            bt.btc += qty
+            bt.usdt -= invest
+            grid.execute_buy(level)
+            bt.trades.append({'timestamp': timestamp, 'type': 'BUY', 'price': price, 'qty': qty,
+                              'usdt': invest, 'grid_level': level, 'fee': invest * bt.fee_rate})
+        elif signal == -1:
+            active = sum(1 for v in grid.positions.values() if v)
+            if active > 0 and bt.btc > 0:
+                qty = bt.btc / active
+                gain = qty * price * (1 - bt.fee_rate)
+                bt.usdt += gain
+                bt.btc -= qty
+                grid.execute_sell(level)
+                bt.trades.append({'timestamp': timestamp, 'type': 'SELL', 'price': price, 'qty': qty,
+                                  'usdt': gain, 'grid_level': level, 'fee': qty * price * bt.fee_rate})
+        bt.equity_curve.append({'timestamp': timestamp, 'price': price, 'equity': bt.usdt + bt.btc * price,
+                                'usdt': bt.usdt, 'btc': bt.btc})
+    bt.equity_curve = {k: [e[k] for e in bt.equity_curve] for k in bt.equity_curve[0]}
+    return bt, grid
+
+def _candles(n=8000, seed=11, grid_range_pct=0.05, num_grids=10):
+    """Random walk donde ~20% de los cierres caen justo sobre (o muy cerca de) un nivel"""
+    rng = np.random.default_rng(seed)
+    close = 100 * (1 + 0.8 * grid_range_pct * np.sin(np.cumsum(rng.normal(0, 0.05, n))))
+    levels = np.array(create_grid_from_current_price(close[0], grid_range_pct, num_grids).grid_levels)
+    snap = rng.random(n) < 0.2
+    snap[0] = False
+    nearest = levels[np.abs(close[:, None] - levels).argmin(axis=1)]
+    close[snap] = nearest[snap] * (1 + rng.choice([0.0, 1e-6, -1e-6], size=snap.sum()))
+    return pd.DataFrame({'open_time': pd.date_range('2024-01-01', periods=n, freq='5min'), 'close': close})
+
+def test_vectorized_grid_matches_get_signal_loop():
+    for range_pct, levels, invest in ((0.05, 10, 10.0), (0.1, 25, 150.0)):
+        df = _candles(grid_range_pct=range_pct, num_grids=levels)
+        ref, ref_grid = _reference(df, range_pct, levels, invest)
+        bt = GridBacktester()
+        metrics = bt.run(df, grid_range_pct=range_pct, num_grids=levels, investment_per_level=invest)
+        assert len(bt.trades) == len(ref.trades) > 50
+        assert bt.trades == ref.trades
+        assert np.array_equal(bt.equity_curve['equity'], ref.equity_curve['equity'])
+        assert (bt.usdt, bt.btc) == (ref.usdt, ref.btc)
+        assert metrics == ref.calculate_metrics(ref_grid)
+
+def test_touches_ignores_prices_outside_grid():
+    grid = create_grid_from_current_price(100.0, 0.05, 11)
+    prices = np.array([94.0, 95.0, 96.0, 96.0001, 100.0, 105.0, 105.01, np.nan])
+    assert grid.touches(prices).tolist() == [-1, 0, 1, 1, 5, 10, -1, -1]
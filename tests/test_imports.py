@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+PROBE = '''
+import os, sys
+sys.modules["binance"] = None  # SDK no instalado
+sys.modules["lightgbm"] = None  # inferencia con árboles compilados
+import bot.logger, bot.exchange, bot.data_source
+from bot.exchange import Exchange
+ex = Exchange(dry="sim")
+assert ex._client is None
+assert not os.path.exists("logs")
+bot.logger.log_info("primer log", context="test")
+assert os.path.isdir("logs")
+from bot.ml_scorer import MLScorer
+from bot.feature_schema import FeatureSchema
+row = dict.fromkeys(FeatureSchema.default().columns, 0.0)
+assert 0 < MLScorer(os.environ["MODEL_NPZ"]).score_row(row) < 1
+'''
+
+def test_imports_have_no_side_effects_and_do_not_need_the_sdk(tmp_path):
+    env = {**os.environ, 'PYTHONPATH': str(ROOT), 'MODEL_NPZ': str(ROOT / 'models' / 'model.npz')}
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from bot.indicators import IndicatorEngine, FEATURE_COLUMNS, VOLUME_COLUMNS
+from bot.strategy import compute_features
+
+def _candles(n=700, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 60000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    close[300:325] = close[300]  # tramo plano: mismo redondeo que pandas
+    return pd.DataFrame({
+        'open_time': pd.date_range('2024-01-01', periods=n, freq='5min'),
+        'close': close,
+        'volume': rng.uniform(1, 50, n),
+    })
+
+def test_engine_matches_batch_compute_features():
+    df = _candles()
+    batch = compute_features(df)
+
+    engine = IndicatorEngine()
+    rows = []
+    for rec in df.to_dict('records'):
+        row = engine.update(rec)
+        if engine.ready:
+            rows.append(row)
+    stream = pd.DataFrame(rows)
+
+    assert len(stream) == len(batch)
+    for col in FEATURE_COLUMNS + VOLUME_COLUMNS:
+        np.testing.assert_allclose(stream[col], batch[col], rtol=1e-12, atol=1e-12, err_msg=col)
@@ -6,3 +6,37 @@ def test_compute_features():
     out = compute_features(df)
     assert 'ema9' in out.columns
     assert 'rsi14' in out.columns
+
+def test_build_signals_reuses_precomputed_features(monkeypatch):
+    import numpy as np
+    from bot import strategy
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400))),
+                       'volume': rng.uniform(1, 5, 400)})
+    expected = strategy.build_signals(df)
+
+    calls = []
+    original = strategy.compute_features
+    monkeypatch.setattr(strategy, 'compute_features', lambda d: calls.append(1) or original(d))
+    pipeline = strategy.FeaturePipeline()
+    feats = pipeline(df)
+    assert pipeline(df.copy()) is feats
+    out = strategy.build_signals(df, features=feats)
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(out, expected)
+    assert 'rule' not in feats.columns
+
+def test_vectorized_rules_match_row_by_row():
+    import numpy as np
+    from bot.strategy import RuleConfig, rule_signal, rule_signals
+    rng = np.random.default_rng(5)
+    n = 2000
+    df = pd.DataFrame({'rsi2': rng.uniform(0, 100, n), 'close': rng.uniform(90, 110, n),
+                       'sma200': rng.uniform(90, 110, n), 'ml_score': rng.uniform(0, 1, n)})
+    df.loc[::97, 'ml_score'] = np.nan
+    df.loc[::13, 'close'] = df.loc[::13, 'sma200']
+    for cfg in [RuleConfig(), RuleConfig(use_trend_filter=False, use_ml_filter=True, ml_threshold=0.4),
+                RuleConfig(rsi2_buy_level=60, rsi2_sell_level=40, use_ml_filter=True)]:
+        expected = df.apply(lambda row: rule_signal(row, cfg), axis=1).to_numpy()
+        np.testing.assert_array_equal(rule_signals(df, cfg), expected)
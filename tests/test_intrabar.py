@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from backtester.backtest import Backtester
+from backtester.backtest_grid import GridBacktester
+from backtester.intrabar import align_subcandles, level_crossings
+from bot.strategies.grid_trading import GridStrategy
+
+def _bars(rows):
+    o, h, l, c = (np.array(col, dtype=float) for col in zip(*rows))
+    return {'open': o, 'high': h, 'low': l, 'close': c}
+
+def test_level_crossings_follow_ohlc_path():
+    levels = [90.0, 95.0, 100.0, 105.0, 110.0]
+    # alcista: 100 -> 94 -> 106 -> 104; bajista: 104 -> 111 -> 89 -> 92 (con gap 104 -> 104 sin cruces)
+    bars = _bars([(100, 106, 94, 104), (104, 111, 89, 92)])
+    owner, idx, fill = level_crossings(levels, bars)
+    assert idx.tolist() == [1, 1, 2, 3, 3, 3, 4, 4, 3, 2, 1, 0, 0]
+    assert owner.tolist() == [0] * 5 + [1] * 8
+    assert fill.tolist() == [levels[i] for i in idx]
+
+    # gap: el open de la segunda vela salta 95 y 100 -> se llenan al open
+    owner, idx, fill = level_crossings(levels, _bars([(101, 102, 100.5, 101), (93, 94, 92, 93)]))
+    assert idx.tolist() == [2, 1] and fill.tolist() == [93.0, 93.0]
+
+def test_subcandles_decide_order_inside_candle():
+    times = pd.date_range('2024-01-01', periods=2, freq='5min')
+    sub = pd.DataFrame({
+        'open_time': pd.date_range('2023-12-31 23:59', periods=12, freq='1min'),
+        'open': 100.0, 'close': 100.0,
+        'high': [100.0, 100, 106, 100, 100, 100, 100, 100, 100, 100, 100, 100],
+        'low': [100.0, 100, 100, 100, 94, 100, 100, 100, 100, 100, 100, 100],
+    })
+    sub_bars = align_subcandles(times, sub)
+    assert sub_bars['owner'].tolist() == [0] * 5 + [1] * 5  # la de antes y la de después quedan afuera
+
+    bars = _bars([(100, 106, 94, 100), (100, 100, 100, 100)])
+    # sin sub-velas (close == open) se asume open, low, high, close; las sub-velas tocan primero el máximo
+    _, idx, _ = level_crossings([95.0, 105.0], bars)
+    assert idx.tolist() == [0, 0, 1, 1]
+    _, idx, _ = level_crossings([95.0, 105.0], bars, sub_bars)
+    assert idx.tolist() == [1, 1, 0, 0]
+
+def test_rsi_backtester_stops_and_take_profits_intrabar():
+    close = np.array([100.0, 100, 100, 100, 100, 100])
+    signal = np.array([1, 0, 0, 0, 0, 0])
+    bars = _bars([(100, 100, 100, 100), (100, 101, 99.5, 100), (100, 103, 97, 100),
+                  (100, 100, 100, 100), (100, 100, 100, 100), (100, 100, 100, 100)])
+
+    bt = Backtester(initial_capital=1000.0)
+    bt.simulate(close, signal, np.arange(6), stop_loss_pct=0.02, take_profit_pct=0.02)
+    assert [t['type'] for t in bt.trades] == ['BUY', 'SELL'] and bt.trades[-1]['timestamp'] == 5  # solo close
+
+    # vela 2 toca 98 y 102: sin sub-velas se asume el stop primero
+    bt = Backtester(initial_capital=1000.0)
+    bt.simulate(close, signal, np.arange(6), stop_loss_pct=0.02, take_profit_pct=0.02, bars=bars)
+    assert bt.trades[-1]['timestamp'] == 2 and bt.trades[-1]['price'] == 98.0
+
+    sub_bars = {'open': np.full(2, 100.0), 'high': np.array([103.0, 100]), 'low': np.array([100.0, 97]),
+                'close': np.full(2, 100.0), 'owner': np.array([2, 2])}
+    bt = Backtester(initial_capital=1000.0)
+    bt.simulate(close, signal, np.arange(6), stop_loss_pct=0.02, take_profit_pct=0.02, bars=bars, sub_bars=sub_bars)
+    assert bt.trades[-1]['timestamp'] == 2 and bt.trades[-1]['price'] == 102.0
+
+def test_grid_intrabar_counts_cycles_missed_by_close():
+    # los close nunca tocan un nivel, las mechas sí
+    n = 200
+    close = np.full(n, 100.0)
+    df = pd.DataFrame({'open_time': pd.date_range('2024-01-01', periods=n, freq='5min'),
+                       'open': close, 'close': close,
+                       'high': np.where(np.arange(n) % 2, 100.6, 100.2), 'low': np.full(n, 99.4)})
+    bt = GridBacktester()
+    closes_only = bt.run(df, grid_range_pct=0.05, num_grids=10)
+    assert closes_only['total_trades'] == 0
+
+    bt = GridBacktester()
+    metrics = bt.run(df, grid_range_pct=0.05, num_grids=10, intrabar=True)
+    assert metrics['buy_orders'] > 50 and metrics['sell_orders'] > 50
+    levels = set(GridStrategy(95.0, 105.0, 10).grid_levels)
+    assert all(t['price'] in levels for t in bt.trades)
+    assert len(bt.equity_curve['equity']) == n
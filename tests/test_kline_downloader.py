@@ -0,0 +1,141 @@
+import asyncio
+import numpy as np
+import pytest
+from binance_stub import StubBinance
+from bot.candle_store import CandleStore
+from bot.kline_downloader import download_many, download_range, plan_chunks, update_range
+from bot.rate_limit import RateLimiter
+from bot.transport import AsyncSpotClient
+
+START = 1704067200000  # 2024-01-01 UTC
+
+def _rows(n, step):
+    return [[START + i * step, str(100.0 + i), str(101.0 + i), str(99.0 + i), str(100.5 + i), '1.5',
+             START + (i + 1) * step - 1, '10.0', 7, '0.5', '5.0', '0'] for i in range(n)]
+
+def _run(scenario):
+    async def wrapper():
+        stub = await StubBinance().start()
+        client = AsyncSpotClient(base_url=stub.base_url, limiter=RateLimiter(safety=1.0))
+        try:
+            await scenario(stub, client)
+        finally:
+            await client.close()
+            await stub.stop()
+    asyncio.run(wrapper())
+
+def test_plan_chunks_cover_range_without_overlap():
+    chunks = plan_chunks(START + 10, START + 2500 * 300_000, 300_000, limit=1000)
+    assert chunks[0][0] == START and chunks[-1][1] == START + 2500 * 300_000
+    assert all(b[0] == a[1] + 1 for a, b in zip(chunks, chunks[1:]))
+
+def test_downloads_several_symbols_in_parallel(tmp_path):
+    store = CandleStore(tmp_path)
+    async def scenario(stub, client):
+        stub.kline_sets = {('BTCUSDT', '5m'): _rows(4500, 300_000), ('ETHUSDT', '1h'): _rows(900, 3_600_000)}
+        stub.delay = 0.02
+        end = START + 4499 * 300_000
+        result = await download_many(client, store, ['btcusdt', 'ETHUSDT'], ['5m', '1h'], START, end, concurrency=4)
+        assert result[('BTCUSDT', '5m')] == 4500 and result[('ETHUSDT', '1h')] == 375  # solo hasta `end`
+        assert result[('BTCUSDT', '1h')] == 0  # sin datos en el stub para esa combinación
+        assert len(stub.peers) > 1  # hubo requests en paralelo
+    _run(scenario)
+    close = store.read_arrays('BTCUSDT', '5m', columns=['close'])['close']
+    assert np.array_equal(close, 100.5 + np.arange(4500))
+    assert store.last_open_time('ETHUSDT', '1h') == START + 374 * 3_600_000
+
+class FlakyClient:
+    """Corta la descarga (excepción no recuperable) en el request número `fail_at`"""
+
+    def __init__(self, client, fail_at):
+        self.client = client
+        self.fail_at = fail_at
+        self.starts = []
+
+    async def klines(self, symbol, interval, **params):
+        self.starts.append(params['startTime'])
+        if len(self.starts) == self.fail_at:
+            raise RuntimeError('conexión perdida')
+        return await self.client.klines(symbol, interval, **params)
+
+def test_interrupted_download_resumes_from_last_persisted_candle(tmp_path):
+    store = CandleStore(tmp_path)
+    async def scenario(stub, client):
+        stub.klines = _rows(3500, 300_000)
+        end = START + 3499 * 300_000
+        flaky = FlakyClient(client, fail_at=3)
+        with pytest.raises(RuntimeError):
+            await download_range(flaky, store, 'BTCUSDT', '5m', START, end, concurrency=1)
+        assert store.last_open_time('BTCUSDT', '5m') == START + 1999 * 300_000
+
+        again = FlakyClient(client, fail_at=None)
+        assert await download_range(again, store, 'BTCUSDT', '5m', START, end, concurrency=2) == 1501
+        assert again.starts[0] == START + 1999 * 300_000
+    _run(scenario)
+    ot = store.read_arrays('BTCUSDT', '5m', columns=['open_time'])['open_time']
+    assert np.array_equal(ot, START + np.arange(3500) * 300_000)
+
+def test_update_appends_tail_and_repairs_gaps(tmp_path):
+    store = CandleStore(tmp_path)
+    rows = _rows(1200, 300_000)
+    store.write('BTCUSDT', '5m', rows[:300] + rows[350:1000])  # hueco de 50 velas
+    async def scenario(stub, client):
+        stub.klines = rows
+        report = await update_range(client, store, 'BTCUSDT', '5m', end_ms=START + 1199 * 300_000)
+        assert report['appended'] == 201  # la última guardada se vuelve a pedir
+        assert report['gaps'] == 1 and report['recovered'] == 50 and report['remaining_gaps'] == []
+        assert stub.requests[0][2]['startTime'] == str(START + 999 * 300_000)
+    _run(scenario)
+    check = store.check('BTCUSDT', '5m', 300_000)
+    assert check == {'rows': 1200, 'duplicates': 0, 'gaps': []}
+
+def test_dedupe_repairs_corrupted_partition(tmp_path):
+    store = CandleStore(tmp_path)
+    store.write('BTCUSDT', '5m', _rows(10, 300_000))
+    cols = store.read_arrays('BTCUSDT', '5m')
+    store._write_partition('BTCUSDT', '5m', '2024-01', {k: np.concatenate([v, v[-3:]]) for k, v in cols.items()})
+    assert store.check('BTCUSDT', '5m', 300_000)['duplicates'] == 3
+    assert store.dedupe('BTCUSDT', '5m') == 3
+    assert store.check('BTCUSDT', '5m', 300_000) == {'rows': 10, 'duplicates': 0, 'gaps': []}
+
+def test_resume_also_downloads_head_before_first_stored_candle(tmp_path):
+    store = CandleStore(tmp_path)
+    rows = _rows(3000, 300_000)
+    store.write('BTCUSDT', '5m', rows[2000:2100])  # corrida previa con un --start posterior
+    async def scenario(stub, client):
+        stub.klines = rows
+        end = START + 2999 * 300_000
+        assert await download_range(client, store, 'BTCUSDT', '5m', START, end, concurrency=2) == 2000 + 901  # cabeza + cola (la última se vuelve a pedir)
+    _run(scenario)
+    ot = store.read_arrays('BTCUSDT', '5m', columns=['open_time'])['open_time']
+    assert np.array_equal(ot, START + np.arange(3000) * 300_000)
+    assert store.check('BTCUSDT', '5m', 300_000) == {'rows': 3000, 'duplicates': 0, 'gaps': []}
+
+def test_empty_head_is_requested_only_once(tmp_path):
+    store = CandleStore(tmp_path)
+    rows = _rows(3000, 300_000)
+    store.write('BTCUSDT', '5m', rows[2000:2100])
+    async def scenario(stub, client):
+        stub.klines = rows[2000:]  # el par no tiene velas antes de la primera guardada
+        end = START + 2999 * 300_000
+        assert await download_range(client, store, 'BTCUSDT', '5m', START, end, concurrency=2) == 901
+        assert store.head_checked_from('BTCUSDT', '5m') == START
+        stub.requests.clear()
+        assert await download_range(client, store, 'BTCUSDT', '5m', START, end, concurrency=2) == 1
+        assert [int(p['startTime']) for _, _, p in stub.requests] == [START + 2999 * 300_000]
+    _run(scenario)
+
+def test_update_skips_empty_head_after_first_run(tmp_path):
+    store = CandleStore(tmp_path)
+    rows = _rows(1200, 300_000)
+    store.write('BTCUSDT', '5m', rows[1000:1100])
+    async def scenario(stub, client):
+        stub.klines = rows[1000:]  # nada antes de la primera vela guardada
+        end = START + 1199 * 300_000
+        await update_range(client, store, 'BTCUSDT', '5m', end_ms=end, start_ms=START)
+        stub.requests.clear()
+        report = await update_range(client, store, 'BTCUSDT', '5m', end_ms=end, start_ms=START)
+        assert report['appended'] == 1 and report['remaining_gaps'] == []
+        # solo la cola: ningún request a la cabeza vacía
+        assert [int(p['startTime']) for _, _, p in stub.requests] == [START + 1199 * 300_000]
+    _run(scenario)
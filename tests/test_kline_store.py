@@ -0,0 +1,58 @@
+import numpy as np
+from bot.kline_store import KlineStore
+
+STEP = 300_000  # 5m en ms
+
+def _row(i, close):
+    ot = i * STEP
+    return [ot, str(close), str(close + 1), str(close - 1), str(close), '1.5', ot + STEP - 1,
+            '10.0', 7, '0.5', '5.0', '0']
+
+class FakeExchange:
+    def __init__(self, n):
+        self.rows = [_row(i, 100.0 + i) for i in range(n)]
+        self.calls = []
+
+    def fetch(self, symbol, interval, startTime=None, limit=500):
+        self.calls.append((startTime, limit))
+        rows = self.rows if startTime is None else [r for r in self.rows if r[0] >= startTime]
+        return rows[:limit] if startTime is not None else rows[-limit:]
+
+def test_store_fetches_only_new_candles_and_replaces_open_one():
+    ex = FakeExchange(600)
+    store = KlineStore('BTCUSDT', '5m', capacity=500, fetch=ex.fetch)
+    store.update()
+    assert len(store) == 500 and ex.calls == [(None, 500)]
+
+    ex.rows[-1] = _row(599, 42.0)  # la vela abierta avanzó
+    ex.rows.append(_row(600, 43.0))
+    assert store.update() == 1
+    assert ex.calls[-1] == (599 * STEP, 1000) and store.rows_fetched == 502
+    close = store.view()['close']
+    assert close[-2] == 42.0 and close[-1] == 43.0 and len(close) == 500
+
+def test_views_are_zero_copy_and_survive_compaction():
+    ex = FakeExchange(10)
+    store = KlineStore('BTCUSDT', '5m', capacity=4, fetch=ex.fetch)
+    store.update()
+    for i in range(10, 30):
+        ex.rows.append(_row(i, 100.0 + i))
+        store.update()
+    df = store.frame()
+    assert list(df['close']) == [126.0, 127.0, 128.0, 129.0]
+    assert np.shares_memory(df['close'].to_numpy(), store._cols['close'])
+    assert df['open_time'].iloc[-1].value // 1_000_000 == 29 * STEP
+    assert len(store.view(last=2)['close']) == 2
+
+def test_fetch_update_leaves_buffer_untouched_until_applied():
+    ex = FakeExchange(10)
+    store = KlineStore('BTCUSDT', '5m', capacity=4, fetch=ex.fetch)
+    store.update()
+    before = store.view()['close'].copy()
+    for gap, full in ((2, False), (6, True)):  # el segundo hueco supera la capacidad -> backfill
+        ex.rows += [_row(len(ex.rows) + i, 200.0 + i) for i in range(gap)]
+        rows, is_full = store.fetch_update()
+        assert is_full == full and np.array_equal(store.view()['close'], before)
+        store.apply_update(rows, is_full)
+        assert list(store.view()['close']) == [float(r[4]) for r in ex.rows[-4:]]
+        before = store.view()['close'].copy()
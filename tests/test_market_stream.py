@@ -0,0 +1,45 @@
+import asyncio
+import time
+from binance_stub import KlineReplay, kline_event
+from bot.kline_store import KlineStore
+from bot.market_stream import KlineStream
+
+STEP = 300_000
+
+def test_stream_emits_closes_and_gap_fills_after_reconnect():
+    base = (int(time.time() * 1000) - 86_400_000) // STEP * STEP
+    t = lambda i: base + i * STEP
+    rest_rows = [[r[k] for k in 'tohlcvTqnVQ'] + ['0'] for r in (kline_event(t(i), 100.0 + i, True)['k'] for i in range(14))]
+    calls = []
+
+    def fetch(symbol, interval, startTime=None, limit=500):
+        # primer backfill: velas 0..9; después del corte REST ya tiene hasta la 13
+        rows = rest_rows[:10] if not calls else rest_rows
+        calls.append(startTime)
+        return [r for r in rows if startTime is None or r[0] >= startTime][:limit]
+
+    async def scenario():
+        replay = await KlineReplay([
+            [kline_event(t(10), 109.5, False), kline_event(t(10), 110.0, True), kline_event(t(11), 111.0, False)],
+            [kline_event(t(14), 114.0, True)],
+        ]).start()
+        store = KlineStore('BTCUSDT', '5m', capacity=50, fetch=fetch)
+        stream = await KlineStream(store, ws_url=replay.base_url, intrabar=True, reconnect_delay=0.05).start()
+        try:
+            closes, updates = [], 0
+            while len(closes) < 4:
+                event = await asyncio.wait_for(stream.next_event(), 5)
+                if event['type'] == 'closed':
+                    closes.append((event['open_time'], event['close']))
+                else:
+                    updates += 1
+        finally:
+            await stream.stop()
+            await replay.stop()
+        assert closes == [(t(9), 109.0), (t(10), 110.0), (t(13), 113.0), (t(14), 114.0)]
+        assert updates >= 1 and stream.gap_fills == 2 and replay.connections == 2
+        # el reconnect pidió solo desde la última vela conocida
+        assert calls == [None, t(11)]
+        assert list(store.view()['close'][-5:]) == [110.0, 111.0, 112.0, 113.0, 114.0]
+
+    asyncio.run(scenario())
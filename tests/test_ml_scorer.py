@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from bot.indicators import IndicatorEngine
+from bot.ml_scorer import MLScorer
+from bot.strategy import compute_features
+
+def _features(n=400, seed=11):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'close': 60000 * np.exp(np.cumsum(rng.normal(0, 0.002, n))),
+                       'volume': rng.uniform(1, 50, n)})
+    return df, compute_features(df)
+
+def test_live_scoring_matches_full_frame():
+    df, feats = _features()
+    ml = MLScorer('models/model.pkl')
+    full = ml.predict(feats)
+
+    np.testing.assert_allclose(ml.predict_last(feats), full[-1:])
+    np.testing.assert_allclose(ml.predict_last(feats, n=5), full[-5:])
+    engine = IndicatorEngine()
+    row = engine.warmup(df)
+    assert abs(ml.score_row(row) - full[-1]) < 1e-9
+    assert {'ml.predict', 'ml.predict_last', 'ml.score_row'} <= set(ml.latency.summary())
+
+def test_compiled_trees_match_booster():
+    import lightgbm as lgb
+    from bot.tree_model import CompiledTrees
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(3000, 4))
+    X[rng.random(X.shape) < 0.1] = np.nan
+    X[rng.random(X.shape) < 0.1] = 0.0
+    y = (np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) ** 2 > 0.5).astype(int)
+    for params in ({}, {'zero_as_missing': True}, {'use_missing': False}):
+        booster = lgb.train({'objective': 'binary', 'num_leaves': 15, 'verbosity': -1, **params},
+                            lgb.Dataset(X, label=y), num_boost_round=30)
+        compiled = CompiledTrees.from_booster(booster)
+        np.testing.assert_allclose(compiled.predict(X), booster.predict(X), rtol=0, atol=1e-12)
+        np.testing.assert_allclose(compiled.predict(X[:3]), booster.predict(X[:3]), rtol=0, atol=1e-12)
+
+    real = MLScorer('models/model.pkl').model
+    _, feats = _features()
+    X = feats[real.feature_name()].to_numpy()
+    np.testing.assert_allclose(CompiledTrees.from_booster(real).predict(X), real.predict(X), rtol=0, atol=1e-12)
+
+def test_feature_schema_is_validated_at_load(tmp_path):
+    import shutil
+    import pytest
+    from bot.feature_schema import FeatureSchema
+    from bot.ml_scorer import load_and_warm
+    model = tmp_path / 'model.npz'
+    shutil.copy('models/model.npz', model)
+    schema = FeatureSchema.load('models/model.schema.json')
+
+    schema.save(FeatureSchema.sidecar_path(model))
+    assert load_and_warm(model)[3] == schema
+    FeatureSchema(tuple(reversed(schema.columns))).save(FeatureSchema.sidecar_path(model))
+    with pytest.raises(ValueError):
+        load_and_warm(model)
+    FeatureSchema(schema.columns[:-1]).save(FeatureSchema.sidecar_path(model))
+    assert MLScorer(str(model)).model is None
+
+def test_reload_retries_when_schema_sidecar_arrives(tmp_path):
+    import asyncio
+    import shutil
+    from bot.feature_schema import FeatureSchema
+    model = tmp_path / 'model.npz'
+    shutil.copy('models/model.npz', model)
+    schema = FeatureSchema.load('models/model.schema.json')
+    FeatureSchema(schema.columns[:-1]).save(FeatureSchema.sidecar_path(model))  # schema viejo
+
+    async def scenario():
+        ml = MLScorer(str(model))
+        assert ml.model is None
+        assert not await ml.reload_if_changed()  # mismo par roto: no se reintenta
+        schema.save(FeatureSchema.sidecar_path(model))
+        assert await ml.reload_if_changed() and ml.schema == schema
+    asyncio.run(scenario())
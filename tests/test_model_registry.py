@@ -0,0 +1,47 @@
+import asyncio
+import numpy as np
+from bot.ml_scorer import MLScorer
+from bot.model_registry import ModelRegistry
+from bot.tree_model import CompiledTrees
+
+def _compiled(tmp_path, name, seed):
+    import lightgbm as lgb
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(500, 3))
+    booster = lgb.train({'objective': 'binary', 'verbosity': -1, 'num_leaves': 7},
+                        lgb.Dataset(X, label=(X[:, seed % 3] > 0).astype(int)), num_boost_round=10)
+    path = tmp_path / name / 'model.npz'
+    path.parent.mkdir()
+    CompiledTrees.from_booster(booster).save(path)
+    return path, booster
+
+def test_hot_reload_swaps_versions_and_survives_a_broken_model(tmp_path):
+    registry = ModelRegistry(tmp_path / 'registry')
+    first, _ = _compiled(tmp_path, 'a', 0)
+    second, booster = _compiled(tmp_path, 'b', 1)
+    broken = tmp_path / 'broken' / 'model.npz'
+    broken.parent.mkdir()
+    broken.write_bytes(b'no es un npz')
+    features = {'features': ['f0', 'f1', 'f2'], 'auc': 0.61}
+    X = np.random.default_rng(9).normal(size=(20, 3))
+
+    async def scenario():
+        registry.register([first], features)
+        ml = MLScorer(str(registry.root))
+        assert ml.version == 'v0001' and ml.meta['auc'] == 0.61
+        assert not await ml.reload_if_changed()
+
+        registry.register([broken], features)
+        assert not await ml.reload_if_changed()
+        assert ml.version == 'v0001' and ml.reload_errors == 1
+        assert ml.model.predict(X).shape == (20,)
+
+        registry.register([second], features)
+        assert await ml.reload_if_changed()
+        assert ml.version == 'v0003'
+        np.testing.assert_allclose(ml.model.predict(X), booster.predict(X), atol=1e-12)
+
+        registry.activate('v0001')  # rollback
+        assert await ml.reload_if_changed() and ml.version == 'v0001'
+    asyncio.run(scenario())
+    assert registry.versions() == ['v0001', 'v0002', 'v0003']
@@ -0,0 +1,49 @@
+import random
+from decimal import Decimal, ROUND_UP
+from bot.quantizer import OrderQuantizer
+from bot.symbol_info import SymbolFilters
+
+def _filters(step, tick, notional='5.00000000'):
+    return SymbolFilters.from_symbol_info({'symbol': 'BTCUSDT', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'tickSize': tick},
+        {'filterType': 'LOT_SIZE', 'stepSize': step, 'minQty': step},
+        {'filterType': 'NOTIONAL', 'minNotional': notional},
+    ]})
+
+def _legacy_str(qty_adjusted, step_str):
+    # formato que usaba exchange.py antes del cuantizador
+    decimals = len(step_str.rstrip('0').split('.')[1]) if '.' in step_str else 0
+    s = format(qty_adjusted.quantize(Decimal(1).scaleb(-decimals)), 'f')
+    return s.rstrip('0').rstrip('.') if '.' in s else s
+
+def test_quantizer_matches_legacy_decimal_path():
+    rng = random.Random(7)
+    for step, tick in [('0.00001000', '0.01000000'), ('1.00000000', '0.00010000'), ('0.50000000', '0.05000000')]:
+        sf = _filters(step, tick)
+        q = OrderQuantizer(sf)
+        for _ in range(2000):
+            price = round(rng.uniform(0.05, 90000), rng.randint(0, 4))
+            usdt = round(rng.uniform(1, 500), rng.randint(0, 6))
+            qty = round(rng.uniform(0, 3), rng.randint(0, 8))
+
+            legacy = (Decimal(str(qty)) // sf.step_size) * sf.step_size
+            assert q.render_qty(q.floor_qty(qty)) == _legacy_str(legacy, step)
+
+            spend = min(Decimal(str(usdt)) * Decimal('1.02'), Decimal('400'))
+            legacy = ((spend / Decimal(str(price))) // sf.step_size) * sf.step_size
+            units = q.floor_qty_for_quote(usdt, price, margin=1.02, cap=400.0)
+            assert q.render_qty(units) == _legacy_str(legacy, step)
+
+            times = ((Decimal('5.0') / Decimal(str(price))) / sf.step_size).to_integral_value(rounding=ROUND_UP)
+            assert q.render_qty(q.min_notional_qty(price)) == _legacy_str(times * sf.step_size, step)
+
+            legacy = (Decimal(str(price)) // sf.tick_size) * sf.tick_size
+            assert q.price_float(q.floor_price(price)) == float(legacy)
+
+def test_render_wire_format():
+    q = OrderQuantizer(_filters('0.00001000', '0.01000000'))
+    assert q.render_qty(16) == '0.00016'
+    assert q.render_qty(100000) == '1'
+    assert q.render_qty(0) == '0'
+    assert q.render_price(6309188) == '63091.88'
+    assert q.render_price(6309100) == '63091'
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import pytest
+from binance_stub import StubBinance, API_KEY, API_SECRET
+from bot.rate_limit import RateLimiter, PRIORITY_ORDER, PRIORITY_MARKET
+from bot.transport import AsyncSpotClient, BinanceAPIError
+
+def _run(scenario, **limits):
+    async def wrapper():
+        stub = await StubBinance().start()
+        limiter = RateLimiter(safety=1.0, **limits)
+        client = AsyncSpotClient(API_KEY, API_SECRET, base_url=stub.base_url, limiter=limiter)
+        try:
+            await scenario(stub, client, limiter)
+        finally:
+            await client.close()
+            await stub.stop()
+    asyncio.run(wrapper())
+
+def test_used_weight_header_throttles_next_request():
+    async def scenario(stub, client, limiter):
+        stub.headers = {'X-MBX-USED-WEIGHT-1M': '119'}
+        await client.klines('BTCUSDT', '5m')
+        assert limiter.used_weight == 119
+        # queda 1 de 120 por minuto (2/s): el próximo klines (peso 2) espera ~0.5 s
+        t0 = time.monotonic()
+        await client.klines('BTCUSDT', '5m')
+        assert time.monotonic() - t0 >= 0.4
+        assert limiter.stats()['wait']['ratelimit.wait.market']['max_ms'] >= 400
+    _run(scenario, weight_limit=120)
+
+def test_429_pauses_traffic_until_retry_after():
+    async def scenario(stub, client, limiter):
+        stub.fail_next = (429, {'code': -1003, 'msg': 'Too many requests'}, {'Retry-After': '1'})
+        with pytest.raises(BinanceAPIError) as err:
+            await client.ticker_price('BTCUSDT')
+        assert err.value.status_code == 429 and limiter.throttled == 1
+        t0 = time.monotonic()
+        await client.ticker_price('BTCUSDT')
+        assert time.monotonic() - t0 >= 0.9
+    _run(scenario)
+
+def test_orders_jump_ahead_of_queued_market_data():
+    async def scenario():
+        limiter = RateLimiter(safety=1.0)
+        limiter.penalize(429, 0.2)
+        served = []
+
+        async def request(name, priority):
+            await limiter.acquire(2, priority)
+            served.append(name)
+
+        tasks = [asyncio.ensure_future(request(f'klines{i}', PRIORITY_MARKET)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        tasks.append(asyncio.ensure_future(request('order', PRIORITY_ORDER)))
+        await asyncio.sleep(0.05)
+        assert limiter.stats()['queue_depth'] == 4
+        await asyncio.gather(*tasks)
+        assert served[0] == 'order' and limiter.max_queue_depth == 4
+    asyncio.run(scenario())
+
+def test_sdk_backend_syncs_used_weight_on_successful_calls(monkeypatch):
+    limiter = RateLimiter(safety=1.0)
+    monkeypatch.setattr('bot.exchange.LIMITER', limiter)
+    from bot.exchange import Exchange
+
+    class FakeSpot:
+        """SDK sincrónico creado con show_limit_usage=True"""
+        def ticker_price(self, symbol):
+            return {'limit_usage': {'x-mbx-used-weight-1m': '57'}, 'data': {'symbol': symbol, 'price': '100.5'}}
+
+    ex = Exchange(dry='log', client=FakeSpot())
+    assert asyncio.run(ex._ticker_price('BTCUSDT')) == 100.5
+    assert limiter.used_weight == 57
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from backtester.backtest import Backtester
+from backtester.sweep import evaluate, param_grid, rank, run_sweep, sweep_inputs
+from bot.strategy import RuleConfig, build_signals
+
+def _candles(n=6000, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0001, 0.004, n)))
+    return pd.DataFrame({'open': close, 'high': close * 1.001, 'low': close * 0.999,
+                         'close': close, 'volume': rng.uniform(1, 10, n)})
+
+def test_parallel_sweep_matches_single_backtests():
+    df = _candles()
+    columns = sweep_inputs(df)
+    grid = param_grid([5.0, 15.0], [85.0, 95.0], [True, False], stop_loss=[None, 0.01])
+    results = run_sweep(columns, grid, workers=2, batch_size=3)
+    assert len(results) == len(grid)
+
+    key = lambda r: (r['rsi2_buy_level'], r['rsi2_sell_level'], r['use_trend_filter'], r['stop_loss_pct'] or 0)
+    assert sorted(results, key=key) == sorted((evaluate(columns, p) for p in grid), key=key)
+
+    # misma combinación por el camino de siempre: build_signals + Backtester
+    params = grid[0]
+    config = RuleConfig(use_trend_filter=True, rsi2_buy_level=5.0, rsi2_sell_level=85.0)
+    sig = build_signals(df, config=config)
+    bt = Backtester()
+    bt.simulate(sig['close'].to_numpy(), sig['final'].to_numpy(), np.arange(len(sig)))
+    direct = bt.calculate_metrics()
+    got = next(r for r in results if key(r) == key(params))
+    assert got['total_return'] == direct['total_return'] and got['total_trades'] == direct['total_trades']
+
+    table = rank(results)
+    assert table['total_return'].is_monotonic_decreasing
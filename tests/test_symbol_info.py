@@ -0,0 +1,48 @@
+import asyncio
+from decimal import Decimal
+from bot.symbol_info import SymbolRegistry
+
+def _info(symbol, step="0.00001000", tick="0.01000000", notional="5.00000000"):
+    return {'symbol': symbol, 'filters': [
+        {'filterType': 'PRICE_FILTER', 'tickSize': tick},
+        {'filterType': 'LOT_SIZE', 'stepSize': step, 'minQty': step},
+        {'filterType': 'NOTIONAL', 'minNotional': notional},
+    ]}
+
+def test_registry_caches_and_refreshes_on_invalidate():
+    calls = []
+
+    async def fetch(symbols):
+        calls.append(symbols)
+        return {'symbols': [_info(s) for s in symbols]}
+
+    async def scenario():
+        reg = SymbolRegistry(fetch, ttl=60)
+        await reg.load(['BTCUSDT', 'ETHUSDT'])
+        sf = await reg.get('BTCUSDT')
+        await reg.get('ETHUSDT')
+        assert len(calls) == 1
+        assert sf.step_size == Decimal('0.00001') and sf.step_decimals == 5
+        assert sf.tick_size == Decimal('0.01') and sf.min_notional == 5.0
+        reg.invalidate('BTCUSDT')
+        await reg.get('BTCUSDT')
+        assert calls[-1] == ['BTCUSDT']
+
+    asyncio.run(scenario())
+
+def test_registry_serves_stale_entry_when_refresh_fails():
+    state = {'fail': False}
+
+    async def fetch(symbols):
+        if state['fail']:
+            raise ConnectionError('boom')
+        return {'symbols': [_info(s) for s in symbols]}
+
+    async def scenario():
+        reg = SymbolRegistry(fetch, ttl=0)
+        await reg.load(['BTCUSDT'])
+        state['fail'] = True
+        sf = await reg.get('BTCUSDT')
+        assert sf.symbol == 'BTCUSDT'
+
+    asyncio.run(scenario())
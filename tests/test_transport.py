@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from binance_stub import StubBinance, API_KEY, API_SECRET
+from bot.exchange import Exchange
+from bot.transport import AsyncSpotClient, BinanceAPIError
+
+def _run(scenario):
+    async def wrapper():
+        stub = await StubBinance().start()
+        client = AsyncSpotClient(API_KEY, API_SECRET, base_url=stub.base_url)
+        try:
+            await scenario(stub, client)
+        finally:
+            await client.close()
+            await stub.stop()
+    asyncio.run(wrapper())
+
+def test_signed_requests_reuse_keepalive_connections():
+    async def scenario(stub, client):
+        ex = Exchange(dry='off', client=client)
+        bals = await ex.get_balances()
+        assert bals['USDT'] == 1000.0 and bals['BTC'] == 0.01
+        order = await ex.market_buy('BTCUSDT', 10.0)
+        assert order['status'] == 'FILLED' and order['origQty'] == '0.00016'
+        assert ex.entry_prices['BTCUSDT'] == 63123.45
+        # la preparación de la orden abre a lo sumo 3 conexiones en paralelo
+        peers = set(stub.peers)
+        assert len(peers) <= 3
+        await ex.market_buy('BTCUSDT', 10.0)
+        assert stub.peers == peers
+        paths = [p for _, p, _ in stub.requests]
+        assert paths.count('/api/v3/exchangeInfo') == 1
+    _run(scenario)
+
+def test_api_errors_are_raised_with_binance_code():
+    async def scenario(stub, client):
+        stub.fail_next = (400, {'code': -1013, 'msg': 'Filter failure: LOT_SIZE'}, {})
+        with pytest.raises(BinanceAPIError) as err:
+            await client.new_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity='0.1')
+        assert err.value.status_code == 400 and err.value.error_code == -1013
+
+        bad = AsyncSpotClient(API_KEY, 'wrong-secret', base_url=stub.base_url)
+        with pytest.raises(BinanceAPIError) as err:
+            await bad.account()
+        assert err.value.error_code == -1022
+        await bad.close()
+    _run(scenario)
+
+def test_concurrent_requests_do_not_block_each_other():
+    async def scenario(stub, client):
+        results = await asyncio.gather(*[client.ticker_price('BTCUSDT') for _ in range(50)])
+        assert all(r['price'] == '63123.45' for r in results)
+        assert len(stub.peers) <= client.pool_size
+    _run(scenario)
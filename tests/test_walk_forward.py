@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from backtester.sweep import param_grid
+from backtester.walk_forward import build_dataset, load_dataset, make_folds, walk_forward
+
+def _candles(n=5000, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0001, 0.004, n)))
+    return pd.DataFrame({'open_time': pd.date_range('2024-01-01', periods=n, freq='5min'),
+                         'open': close, 'high': close * 1.001, 'low': close * 0.999,
+                         'close': close, 'volume': rng.uniform(1, 10, n)})
+
+def test_folds_slide_without_overlapping_tests():
+    folds = make_folds(1000, 400, 200)
+    assert folds == [(0, 400, 600), (200, 600, 800), (400, 800, 1000)]
+
+def test_walk_forward_stitches_out_of_sample_folds(tmp_path, monkeypatch):
+    df = _candles()
+    path = build_dataset(df, horizon=3, thresh=0.001, cache_dir=tmp_path)
+    assert build_dataset(df, horizon=3, thresh=0.001, cache_dir=tmp_path) == path  # cacheado
+    data = load_dataset(path)
+    assert data['X'].shape[0] == len(data['close']) and (np.asarray(data['y'][-3:]) == -1).all()
+
+    folds = make_folds(len(data['close']), 2000, 1000)
+    grid = param_grid([5.0, 15.0], [90.0], [True, False], [None, 0.5])
+    folds_df, equity, summary = walk_forward(path, folds, grid, workers=2, initial_capital=1000.0)
+
+    assert len(folds_df) == len(folds) and len(equity) == sum(c - b for _, b, c in folds)
+    assert (folds_df['capital_start'].iloc[1:].values == folds_df['capital_end'].iloc[:-1].values).all()
+    assert summary['final_capital'] == folds_df['capital_end'].iloc[-1]
+    assert equity['timestamp'].is_monotonic_increasing
+
+    # segunda corrida: resultados por fold leídos del cache, mismo resultado
+    again, _, _ = walk_forward(path, folds, grid, workers=2, initial_capital=1000.0)
+    assert len(list((path / 'folds').glob('*.json'))) == len(folds)
+    pd.testing.assert_frame_equal(folds_df, again)
+
+    # otros parámetros de entrenamiento -> otra clave, el fold se reentrena
+    import backtester.walk_forward as wf
+    monkeypatch.setattr(wf, 'NUM_BOOST_ROUND', 20)
+    wf.run_fold(path, folds[0], grid, bt_kwargs={'initial_capital': 1000.0})
+    assert len(list((path / 'folds').glob('*.json'))) == len(folds) + 1